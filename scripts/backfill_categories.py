@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+"""
+Fill Listing.category for existing rows that have none, in streamed chunks.
+
+Usage:
+  python scripts/backfill_categories.py [--chunk-size 5000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.category_classifier import backfill_categories, get_category_classifier  # noqa: E402
+from src.core.database import session_scope  # noqa: E402
+
+# Register the models Listing's relationships refer to
+from src.models import alert as _alert  # noqa: F401,E402
+from src.models import deal as _deal  # noqa: F401,E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        counts = backfill_categories(db, get_category_classifier(), chunk_size=args.chunk_size)
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+"""
+Replay historical listings through the sniper thresholds for a grid of
+threshold and composite-weight settings, and report alert volume, precision
+proxies and score distributions per setting.
+
+Usage:
+  python scripts/backtest.py [--window-days 90] [--min-margin 5:40:5] [--demand-weight 0.4,0.6]
+                             [--top 20] [--min-alerts 5] [--sort precision] [--csv out.csv]
+
+Grid values default to backtest.grid in config; each grid option takes a
+comma-separated list or an inclusive start:stop:step range.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.database import session_scope  # noqa: E402
+from src.evaluators.backtest import BacktestGrid, default_grid, load_backtest_data, run_backtest  # noqa: E402
+from src.evaluators.sniper_bot import SniperBot  # noqa: E402
+
+# Register the models Listing's relationships refer to
+from src.models import alert as _alert  # noqa: F401,E402
+from src.models import deal as _deal  # noqa: F401,E402
+
+_GRID_OPTIONS = ("min_demand", "min_margin", "min_composite", "min_discount", "demand_weight")
+
+
+def parse_values(spec: str) -> list[float]:
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return [round(float(v), 6) for v in np.arange(start, stop + step / 2, step)]
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window-days", type=float, default=None)
+    parser.add_argument("--sold-within-hours", type=float, default=None)
+    for name in _GRID_OPTIONS:
+        parser.add_argument("--" + name.replace("_", "-"), default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-alerts", type=int, default=5)
+    parser.add_argument("--sort", choices=["precision", "recall", "alerts"], default="precision")
+    parser.add_argument("--csv", default=None, help="write every setting to this CSV file")
+    args = parser.parse_args()
+
+    bot = SniperBot()
+    grid = default_grid(bot)
+    overrides = {name: parse_values(getattr(args, name)) for name in _GRID_OPTIONS if getattr(args, name)}
+    grid = BacktestGrid(**{**grid.__dict__, **overrides})
+
+    t0 = time.perf_counter()
+    with session_scope() as db:
+        data = load_backtest_data(db, bot, window_days=args.window_days, sold_within_hours=args.sold_within_hours)
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    report = run_backtest(data, grid, bot)
+    t_run = time.perf_counter() - t0
+
+    print(f"listings: {report.listings}  sold fast: {report.sold_fast}  settings: {len(report)}")
+    print(f"load: {t_load:.2f}s  sweep: {t_run:.2f}s")
+    header = f"{'demand':>6} {'margin':>6} {'comp':>5} {'disc':>5} {'w_dem':>5} {'alerts':>7} {'prec':>6} {'recall':>6} {'avg_comp':>8} {'avg_margin':>10}"
+    print(header)
+    for r in report.top(args.top, min_alerts=args.min_alerts, key=args.sort):
+        print(
+            f"{r['min_demand']:6.2f} {r['min_margin']:6.1f} {r['min_composite']:5.2f} {r['min_discount']:5.1f} "
+            f"{r['demand_weight']:5.2f} {r['alerts']:7d} {r['precision']:6.3f} {r['recall']:6.3f} "
+            f"{r['mean_composite']:8.3f} {r['mean_margin']:10.1f}"
+        )
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            rows = [report.row(i) for i in range(len(report))]
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["min_demand"])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"wrote {len(report)} settings to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+"""
+Benchmark the sync (psycopg2, threadpool) and async (asyncpg) database paths
+under concurrent load: the same listings page query behind a `def` route
+using get_db and an `async def` route using get_async_db, driven in-process
+over ASGI at several concurrency levels. --db-ms adds pg_sleep to each query
+to stand in for a slower or remote database.
+
+Usage:
+  python scripts/bench_async_db.py [--requests 2000] [--concurrency 1,8,32] [--db-ms 0]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from src.core.database import dispose_async_engine, get_async_db, get_db  # noqa: E402
+from src.models.alert import Alert  # noqa: E402,F401
+from src.models.deal import Deal  # noqa: E402,F401
+from src.models.listing import Listing  # noqa: E402
+
+
+def build_app(db_ms: float) -> FastAPI:
+    t = Listing.__table__
+    stmt = select(t.c.id, t.c.title, t.c.price, t.c.created_at).order_by(t.c.created_at.desc(), t.c.id.desc()).limit(50)
+    if db_ms > 0:
+        # Uncorrelated subquery: Postgres runs it once per query, not per row
+        stmt = stmt.where(select(func.pg_sleep(db_ms / 1000.0)).scalar_subquery().is_not(None))
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_page(db: Session = Depends(get_db)) -> int:
+        return len(db.execute(stmt).all())
+
+    @app.get("/async")
+    async def async_page(db: AsyncSession = Depends(get_async_db)) -> int:
+        return len((await db.execute(stmt)).all())
+
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> tuple[float, int]:
+    """
+    (successful requests per second, failed requests).
+    """
+    remaining = iter(range(requests))
+    failed = 0
+
+    async def worker() -> None:
+        nonlocal failed
+        for _ in remaining:
+            try:
+                (await client.get(path)).raise_for_status()
+            except Exception:
+                # e.g. pool timeouts once concurrency outgrows the sync pool and threadpool
+                failed += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (requests - failed) / (time.perf_counter() - t0), failed
+
+
+async def run(args: argparse.Namespace) -> None:
+    app = build_app(args.db_ms)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm both pools
+        await drive(client, "/sync", 20, 4)
+        await drive(client, "/async", 20, 4)
+        print(f"{'concurrency':>11}  {'sync req/s':>10}  {'async req/s':>11}  {'ratio':>6}  failed sync/async")
+        for c in args.concurrency:
+            sync_rps, sync_failed = await drive(client, "/sync", args.requests, c)
+            async_rps, async_failed = await drive(client, "/async", args.requests, c)
+            ratio = async_rps / sync_rps if sync_rps else float("inf")
+            print(f"{c:>11}  {sync_rps:>10.0f}  {async_rps:>11.0f}  {ratio:>5.2f}x  {sync_failed}/{async_failed}")
+    await dispose_async_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async DB routes under concurrency")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per route and concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--db-ms", type=float, default=0.0, help="simulated query latency (pg_sleep)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
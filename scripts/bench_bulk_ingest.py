@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+"""
+Benchmark listing ingest through the API: POST /listings/ one item at a time
+against POST /listings/bulk (JSON and NDJSON), then re-send the bulk batch to
+time the update path. Rows are written under a dedicated source and deleted
+afterwards.
+
+Usage:
+  python scripts/bench_bulk_ingest.py [--items 10000] [--singles 1000] [--source bench-bulk]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from src.api.main import app  # noqa: E402
+from src.core.database import session_scope  # noqa: E402
+from src.models.alert import Alert  # noqa: E402,F401
+from src.models.deal import Deal  # noqa: E402,F401
+from src.models.listing import Listing  # noqa: E402
+
+_WORDS = ["iphone", "ps5", "switch", "bike", "drill", "sofa", "lego", "camera", "tv", "desk", "pro", "mini", "used"]
+
+
+def make_items(n: int, source: str, prefix: str, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "source": source,
+            "external_id": f"{prefix}{i}",
+            "title": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6))),
+            "description": "bench listing",
+            "price": round(rng.uniform(5, 1500), 2),
+            "currency": "USD",
+            "url": f"https://example.com/{prefix}{i}",
+            "location": "Austin, TX",
+        }
+        for i in range(n)
+    ]
+
+
+def cleanup(source: str) -> None:
+    with session_scope() as db:
+        db.execute(delete(Listing).where(Listing.source == source))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-item vs bulk listing ingest")
+    parser.add_argument("--items", type=int, default=10000, help="listings per bulk request")
+    parser.add_argument("--singles", type=int, default=1000, help="listings posted one at a time")
+    parser.add_argument("--source", default="bench-bulk")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    client = TestClient(app)
+    cleanup(args.source)
+    try:
+        singles = make_items(args.singles, args.source, "s", rng)
+        t0 = time.perf_counter()
+        for item in singles:
+            r = client.post("/listings/", json=item)
+            r.raise_for_status()
+        single_s = time.perf_counter() - t0
+        print(f"single POST /listings/:  {args.singles:>6} items  {single_s:7.2f}s  {args.singles / single_s:9.0f} items/s")
+
+        batch = make_items(args.items, args.source, "b", rng)
+        runs = [
+            ("bulk JSON (create)", "application/json", json.dumps(batch).encode(), "created"),
+            ("bulk JSON (update)", "application/json", json.dumps(batch).encode(), "updated"),
+        ]
+        ndjson_batch = make_items(args.items, args.source, "n", rng)
+        runs.append(
+            (
+                "bulk NDJSON (create)",
+                "application/x-ndjson",
+                "\n".join(json.dumps(item) for item in ndjson_batch).encode(),
+                "created",
+            )
+        )
+        for label, content_type, body, expected in runs:
+            t0 = time.perf_counter()
+            r = client.post("/listings/bulk", content=body, headers={"Content-Type": content_type})
+            elapsed = time.perf_counter() - t0
+            r.raise_for_status()
+            out = r.json()
+            ok = out[expected] == args.items and out["errors"] == 0
+            print(
+                f"{label + ':':<25}{args.items:>6} items  {elapsed:7.2f}s  {args.items / elapsed:9.0f} items/s"
+                f"  (x{(args.items / elapsed) / (args.singles / single_s):.0f})  all {expected}: {ok}"
+            )
+    finally:
+        cleanup(args.source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+"""
+Benchmark the catalog matcher: compile a synthetic catalog and map titles to
+canonical product keys.
+
+Usage:
+  python scripts/bench_catalog_matcher.py [--titles 1000000] [--products 5000] [--seed 7]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.catalog_matcher import CatalogMatcher, catalog_phrases  # noqa: E402
+
+_BRANDS = ["apple", "sony", "nintendo", "dyson", "dewalt", "lego", "samsung", "msi", "canon", "bose"]
+_NOISE = ["like", "new", "128gb", "used", "mint", "bundle", "with", "box", "cheap", "pickup", "black", "pro", "2021"]
+
+
+def make_catalog(n: int, rng: random.Random) -> dict:
+    catalog = {}
+    for i in range(n):
+        key = f"{rng.choice(_BRANDS)} model{i}"
+        catalog[key] = [f"m{i} {rng.choice(_BRANDS)}", f"model {i}"]
+    return catalog
+
+
+def make_titles(n: int, catalog: dict, rng: random.Random) -> list[str]:
+    names = [name for key, aliases in catalog.items() for name in [key, *aliases]]
+    titles = []
+    for _ in range(n):
+        words = [rng.choice(_NOISE) for _ in range(rng.randint(2, 6))]
+        if rng.random() < 0.7:
+            words.insert(rng.randint(0, len(words)), rng.choice(names))
+        titles.append(" ".join(words).title())
+    return titles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = make_catalog(args.products, rng)
+    phrases = catalog_phrases({"catalog": catalog})
+    titles = make_titles(args.titles, catalog, rng)
+
+    t0 = time.perf_counter()
+    matcher = CatalogMatcher(phrases)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matched = sum(1 for t in titles if matcher.best_key(t) is not None)
+    t_match = time.perf_counter() - t0
+
+    print(f"phrases:   {matcher.size}")
+    print(f"compile:   {t_build:8.3f}s")
+    print(f"titles:    {args.titles}")
+    print(f"best_key:  {t_match:8.3f}s  ({args.titles / t_match:,.0f}/s)")
+    print(f"matched:   {matched} ({matched / max(1, args.titles):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+"""
+Benchmark the category classifier on synthetic titles: train the n-gram model on
+rule-labelled titles, then time batch prediction against one-title-at-a-time
+prediction, artifact loading, and accuracy on titles no rule matches.
+
+Usage:
+  python scripts/bench_category_classifier.py [--titles 200000] [--seed 7]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.category_classifier import (  # noqa: E402
+    CategoryClassifier,
+    CategoryModel,
+    category_rules,
+    classifier_text,
+)
+
+# Words that co-occur with each category but are not rule keywords
+_CONTEXT = {
+    "electronics": ["charger", "retina", "bluetooth", "4k", "battery", "screen", "hdmi", "wireless", "128gb"],
+    "gaming": ["controller", "console", "games", "joycons", "dualsense", "disc", "edition", "gamepad"],
+    "furniture": ["wood", "oak", "cushions", "drawers", "upholstered", "leather", "shelves", "nightstand"],
+    "tools": ["cordless", "battery", "brushless", "20v", "bits", "chuck", "blade", "torque"],
+    "appliances": ["stainless", "whirlpool", "samsung", "frost", "cubic", "energy", "kenmore", "load"],
+    "sports": ["helmet", "carbon", "frame", "gears", "paddle", "fitness", "wheels", "weights"],
+}
+_NOISE = ["like", "new", "used", "great", "condition", "pickup", "only", "works", "must", "go", "obo"]
+
+
+def make_titles(n: int, rules: dict, rng: random.Random, keyword_share: float):
+    by_cat: dict = {}
+    for phrase, cat in rules.items():
+        by_cat.setdefault(cat, []).append(phrase)
+    cats = sorted(set(by_cat) & set(_CONTEXT))
+    out = []
+    for _ in range(n):
+        cat = rng.choice(cats)
+        words = rng.sample(_CONTEXT[cat], 3) + rng.sample(_NOISE, rng.randint(1, 3))
+        if rng.random() < keyword_share:
+            words.append(rng.choice(by_cat[cat]))
+        rng.shuffle(words)
+        out.append((" ".join(words).title(), cat))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=200_000)
+    parser.add_argument("--train", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = category_rules()
+    rule_only = CategoryClassifier(rules)
+
+    # Train on what the rules can label, as scripts/train_category_model.py does
+    train = make_titles(args.train, rules, rng, keyword_share=0.6)
+    texts, labels = [], []
+    for title, _ in train:
+        label = rule_only.rule_category(title)
+        if label:
+            texts.append(classifier_text(title, None))
+            labels.append(label)
+    t0 = time.perf_counter()
+    model = CategoryModel.train(texts, labels)
+    t_train = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.npz"
+        model.save(path)
+        t0 = time.perf_counter()
+        model = CategoryModel.load(path)
+        t_load = time.perf_counter() - t0
+
+    classifier = CategoryClassifier(rules, model=model)
+    test = make_titles(args.titles, rules, rng, keyword_share=0.3)
+    titles = [t for t, _ in test]
+
+    t0 = time.perf_counter()
+    batch = [p for i in range(0, len(titles), 1000) for p in classifier.predict_many(titles[i : i + 1000])]
+    t_batch = time.perf_counter() - t0
+
+    sample = titles[: max(1, len(titles) // 20)]
+    t0 = time.perf_counter()
+    single = [classifier.predict_many([t])[0] for t in sample]
+    t_single = (time.perf_counter() - t0) * len(titles) / len(sample)
+
+    no_rule = [(p, cat) for (title, cat), p in zip(test, batch) if rule_only.rule_category(title) is None]
+    covered = sum(1 for p, _ in no_rule if p is not None)
+    correct = sum(1 for p, cat in no_rule if p == cat)
+    overall = sum(1 for p, (_, cat) in zip(batch, test) if p == cat)
+
+    print(f"train:            {len(texts)} examples in {t_train:6.2f}s")
+    print(f"artifact load:    {t_load * 1000:6.1f}ms")
+    print(f"titles:           {len(titles)}")
+    print(f"batch predict:    {t_batch:6.2f}s  ({len(titles) / t_batch:,.0f}/s, batches of 1000)")
+    print(f"single (est.):    {t_single:6.2f}s  ({t_single / t_batch:.1f}x slower)")
+    print(f"no-rule titles:   {len(no_rule)}, model filled {covered}, correct {correct} ({correct / max(1, covered):.1%})")
+    print(f"overall accuracy: {overall / len(test):.1%}")
+    print(f"identical:        {batch[: len(single)] == single}")
+
+
+if __name__ == "__main__":
+    main()
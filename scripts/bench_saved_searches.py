@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+"""
+Benchmark saved-search matching: the inverted-index percolator against checking
+every listing against every saved search, and verify both agree.
+
+Usage:
+  python scripts/bench_saved_searches.py [--searches 10000] [--listings 20000] [--seed 7]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.catalog_matcher import tokenize  # noqa: E402
+from src.analyzers.saved_search_index import CompiledSearch, SavedSearchIndex  # noqa: E402
+
+_COMMON = ["iphone", "ps5", "switch", "bike", "drill", "sofa", "lego", "camera", "tv", "desk"]
+_CATEGORIES = ["electronics", "furniture", "tools", "sports", None]
+
+
+def vocabulary(size: int = 5000) -> list[str]:
+    return _COMMON + [f"w{i}" for i in range(size)]
+
+
+def make_searches(n: int, vocab: list[str], rng: random.Random) -> list[CompiledSearch]:
+    out = []
+    for i in range(n):
+        # A product word plus one or two qualifiers ("iphone 13 pro")
+        words = [rng.choice(_COMMON)] + [rng.choice(vocab) for _ in range(rng.randint(1, 2))]
+        if rng.random() < 0.01:
+            words = []  # category/price-only watchlist
+        lo = rng.choice([None, rng.uniform(0, 200)])
+        hi = rng.choice([None, (lo or 0) + rng.uniform(50, 800)])
+        out.append(CompiledSearch.build(i + 1, " ".join(words), rng.choice(_CATEGORIES), lo, hi))
+    return out
+
+
+def make_listings(n: int, vocab: list[str], rng: random.Random) -> list[tuple]:
+    out = []
+    for _ in range(n):
+        title = " ".join(rng.choice(vocab if rng.random() < 0.7 else _COMMON) for _ in range(rng.randint(3, 8)))
+        price = None if rng.random() < 0.05 else rng.uniform(5, 1000)
+        out.append((title, price, rng.choice(_CATEGORIES)))
+    return out
+
+
+def naive_match(searches: list[CompiledSearch], title: str, price, category) -> list[int]:
+    tokens = set(tokenize(title))
+    p = float(price) if price is not None else math.nan
+    cat = (category or "").strip().lower()
+    return [s.id for s in searches if s.tokens <= tokens and s.accepts(p, cat)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--searches", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = vocabulary()
+    searches = make_searches(args.searches, vocab, rng)
+    listings = make_listings(args.listings, vocab, rng)
+
+    t0 = time.perf_counter()
+    index = SavedSearchIndex()
+    index.rebuild(searches)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    indexed = [sorted(index.match(*lst)) for lst in listings]
+    t_index = time.perf_counter() - t0
+
+    sample = listings[: max(1, args.listings // 20)]
+    t0 = time.perf_counter()
+    naive = [sorted(naive_match(searches, *lst)) for lst in sample]
+    t_naive = (time.perf_counter() - t0) * len(listings) / len(sample)
+
+    identical = indexed[: len(sample)] == naive
+    print(f"saved searches:  {args.searches}")
+    print(f"listings:        {args.listings}")
+    print(f"index build:     {t_build:8.3f}s")
+    print(f"percolator:      {t_index:8.3f}s  ({args.listings / t_index:,.0f} listings/s)")
+    print(f"naive (est.):    {t_naive:8.3f}s  ({t_naive / t_index:,.0f}x slower)")
+    print(f"matches:         {sum(len(m) for m in indexed)}")
+    print(f"identical:       {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+"""
+Benchmark scalar SniperBot.evaluate against the vectorized evaluate_many and
+check that both produce identical scores and decisions.
+
+Usage:
+  python scripts/bench_scoring.py [--n 100000] [--seed 7]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.evaluators.sniper_bot import SniperBot  # noqa: E402
+
+_WORDS = ["iphone", "ps5", "rtx", "3060", "switch", "macbook", "dyson", "lego", "bike", "drill", "sofa"]
+
+
+def make_listings(n: int, now: datetime, seed: int) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        posted = None if rng.random() < 0.1 else now - timedelta(seconds=rng.uniform(-3600, 10 * 86400))
+        price = None if rng.random() < 0.05 else round(rng.uniform(5, 1500), 2)
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+        out.append(SimpleNamespace(title=title, price=price, posted_at=posted))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    bot = SniperBot()
+    now = datetime.now(timezone.utc)
+    listings = make_listings(args.n, now, args.seed)
+    # Resale estimates so margins are non-trivial
+    rng = np.random.default_rng(args.seed)
+    sell = np.array([(lst.price or 0.0) for lst in listings]) * rng.uniform(0.8, 1.8, args.n)
+
+    t0 = time.perf_counter()
+    scalar = [bot.evaluate(lst, assumed_sell_price=float(sell[i]), now=now) for i, lst in enumerate(listings)]
+    t_scalar = time.perf_counter() - t0
+
+    # Column extraction is part of the batch cost
+    t0 = time.perf_counter()
+    prices = np.array([np.nan if lst.price is None else lst.price for lst in listings], dtype=np.float64)
+    posted = np.array([np.nan if lst.posted_at is None else lst.posted_at.timestamp() for lst in listings])
+    trends = bot.scorer.trend_scores(lst.title for lst in listings)
+    t_columns = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = bot.evaluate_many(prices, posted, trends, assumed_sell_prices=sell, now=now.timestamp())
+    t_batch = time.perf_counter() - t0
+
+    demand = np.array([d.scores.demand_score for d in scalar])
+    margin = np.array([d.scores.margin.margin_percent for d in scalar])
+    composite = np.array([d.scores.composite.composite_score for d in scalar])
+    alert = np.array([d.should_alert for d in scalar])
+    identical = (
+        np.array_equal(demand, batch.scores.demand_score)
+        and np.array_equal(margin, batch.scores.margin.margin_percent)
+        and np.array_equal(composite, batch.scores.composite_score)
+        and np.array_equal(alert, batch.should_alert)
+        and all(scalar[i].reason == batch.reason(i) for i in range(0, args.n, max(1, args.n // 1000)))
+    )
+
+    print(f"listings:          {args.n}")
+    print(f"scalar evaluate:   {t_scalar:8.3f}s  ({args.n / t_scalar:,.0f}/s)")
+    print(f"column extraction: {t_columns:8.3f}s")
+    print(f"evaluate_many:     {t_batch:8.3f}s  ({args.n / t_batch:,.0f}/s, {t_scalar / t_batch:,.0f}x)")
+    print(f"alerts:            {int(batch.should_alert.sum())}")
+    print(f"identical:         {identical}")
+    if not identical:
+        print(f"max |d composite|: {np.max(np.abs(composite - batch.scores.composite_score)):.3e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
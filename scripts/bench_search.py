@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+"""
+Benchmark listing full-text search at scale.
+
+- Seeds --rows synthetic listings under a dedicated source (skipped when they
+  already exist; --drop removes them afterwards)
+- Ingest cost of the generated search_vector column: the same rows inserted
+  into two scratch copies of listings, with and without the column and its
+  GIN index
+- Search latency (p50/p95) of the GET /listings/search query for first and
+  second pages, against ILIKE scans for a common and a rare word
+
+Usage:
+  python scripts/bench_search.py [--rows 1000000] [--repeat 20] [--ingest-rows 100000] [--drop]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from src.api.pagination import encode_cursor  # noqa: E402
+from src.api.search import search_statement  # noqa: E402
+from src.core.database import get_engine  # noqa: E402
+from src.models.alert import Alert  # noqa: E402,F401
+from src.models.deal import Deal  # noqa: E402,F401
+
+SOURCE = "bench-search"
+
+_WORDS = (
+    "iphone,samsung,galaxy,ps5,xbox,switch,bike,mountain,road,helmet,sofa,leather,sectional,desk,chair,lego,"
+    "camera,lens,drill,dewalt,makita,tv,oled,vintage,pro,mini,max,used,new,black,white,red,blue"
+)
+
+# Titles of 3-6 common words plus one of 50k rare tokens; short descriptions
+_ROWS_SQL = f"""
+    SELECT '{SOURCE}', g::text, 'https://example.com/' || g,
+           (SELECT string_agg(w[1 + ((g::bigint * 7919 + i * 104729) % array_length(w, 1))], ' ')
+              FROM generate_series(1, 3 + g % 4) i) || ' w' || (g % 50000),
+           CASE WHEN g % 3 = 0 THEN 'barely used, includes charger and case'
+                WHEN g % 3 = 1 THEN 'pickup only, cash, no trades'
+                ELSE 'great condition, selling because moving' END,
+           (g % 2000) + 0.99, g % 10 <> 0, now() - (g % 100000) * interval '1 minute'
+      FROM generate_series(:lo, :hi) g, (SELECT string_to_array('{_WORDS}', ',') w) words
+"""
+_COLUMNS = "source, external_id, url, title, description, price, is_active, created_at"
+
+QUERIES = [
+    ("common word", "bike"),
+    ("two words", "mountain bike"),
+    ("phrase", '"vintage camera"'),
+    ("exclusion", "sofa -leather"),
+    ("or", "ps5 or xbox"),
+    ("rare token", "w12345"),
+]
+
+
+def seed(conn, rows: int, batch: int = 100_000) -> None:
+    have = conn.execute(text("SELECT count(*) FROM listings WHERE source = :s"), {"s": SOURCE}).scalar_one()
+    if have >= rows:
+        print(f"seed: {have} {SOURCE} listings already present")
+        return
+    t0 = time.perf_counter()
+    for lo in range(have + 1, rows + 1, batch):
+        conn.execute(
+            text(f"INSERT INTO listings ({_COLUMNS}) {_ROWS_SQL}"), {"lo": lo, "hi": min(rows, lo + batch - 1)}
+        )
+        conn.commit()
+    conn.execute(text("ANALYZE listings"))
+    conn.commit()
+    print(f"seed: {rows - have} listings in {time.perf_counter() - t0:.1f}s")
+
+
+def ingest_cost(conn, rows: int) -> None:
+    conn.execute(text("DROP TABLE IF EXISTS bench_fts_on, bench_fts_off"))
+    conn.execute(text("CREATE UNLOGGED TABLE bench_fts_on (LIKE listings INCLUDING ALL)"))
+    conn.execute(text("CREATE UNLOGGED TABLE bench_fts_off (LIKE listings INCLUDING ALL)"))
+    conn.execute(text("ALTER TABLE bench_fts_off DROP COLUMN search_vector"))
+    conn.commit()
+    rates = {}
+    try:
+        for table in ("bench_fts_off", "bench_fts_on"):
+            t0 = time.perf_counter()
+            conn.execute(text(f"INSERT INTO {table} ({_COLUMNS}) {_ROWS_SQL}"), {"lo": 1, "hi": rows})
+            conn.commit()
+            rates[table] = rows / (time.perf_counter() - t0)
+    finally:
+        conn.execute(text("DROP TABLE IF EXISTS bench_fts_on, bench_fts_off"))
+        conn.commit()
+    off, on = rates["bench_fts_off"], rates["bench_fts_on"]
+    print(f"ingest: {off:,.0f} rows/s without search_vector, {on:,.0f} rows/s with it ({on / off:.2f}x)")
+
+
+def timed(db, stmt, params=None, repeat: int = 20) -> tuple[list, list[float]]:
+    rows: list = []
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = db.execute(stmt, params or {}).all()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return rows, times
+
+
+def fmt(times: list[float]) -> str:
+    times = sorted(times)
+    return f"p50 {statistics.median(times):7.2f} ms  p95 {times[int(0.95 * (len(times) - 1))]:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GET /listings/search at scale")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--ingest-rows", type=int, default=100_000, help="0 skips the ingest comparison")
+    parser.add_argument("--drop", action="store_true", help="delete the seeded listings afterwards")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        seed(conn, args.rows)
+        if args.ingest_rows:
+            ingest_cost(conn, args.ingest_rows)
+
+        total = conn.execute(text("SELECT count(*) FROM listings")).scalar_one()
+    print(f"search over {total:,} listings, limit {args.limit}, {args.repeat} runs each")
+    with Session(engine) as db:
+        for label, q in QUERIES:
+            rows, first = timed(db, search_statement(q, args.limit), repeat=args.repeat)
+            line = f"  {label:<12} {q!r:<18} {len(rows):>3} hits  first page {fmt(first)}"
+            if len(rows) >= args.limit:
+                cursor = encode_cursor(rows[-1].rank, rows[-1].Listing.id)
+                _, second = timed(db, search_statement(q, args.limit, cursor), repeat=args.repeat)
+                line += f" | next page {fmt(second)}"
+            print(line)
+            db.expunge_all()
+
+    with engine.connect() as conn:
+        ilike = text("SELECT id FROM listings WHERE title ILIKE :p OR description ILIKE :p ORDER BY id DESC LIMIT :n")
+        # A common word fills the page early from the id index; a rare one scans the whole table
+        for pattern in ("%bike%", "%w12345%"):
+            _, times = timed(conn, ilike, {"p": pattern, "n": args.limit}, repeat=max(3, args.repeat // 4))
+            print(f"  ILIKE baseline {pattern!r:<13} (unranked, no index)  {fmt(times)}")
+
+        if args.drop:
+            conn.execute(text("DELETE FROM listings WHERE source = :s"), {"s": SOURCE})
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+"""
+Benchmark the similar-listings index: append synthetic listings to a temporary
+index, then time lookups and compare recall against an exact cosine scan.
+
+Usage:
+  python scripts/bench_similarity.py [--listings 1000000] [--queries 500] [--seed 7]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.similarity_index import SimilarityIndex  # noqa: E402
+
+_BRANDS = ["apple", "sony", "nintendo", "dyson", "dewalt", "lego", "samsung", "msi", "canon", "bose"]
+_NOISE = ["like", "new", "used", "mint", "bundle", "with", "box", "cheap", "pickup", "black", "pro", "2021"]
+
+
+def make_listings(n: int, products: int, rng: random.Random):
+    # Listings are noisy variants of a product name, so near neighbours exist
+    for i in range(n):
+        p = rng.randrange(products)
+        words = [_BRANDS[p % len(_BRANDS)], f"model{p}"] + rng.sample(_NOISE, rng.randint(1, 4))
+        rng.shuffle(words)
+        desc = " ".join(rng.choice(_NOISE) for _ in range(rng.randint(0, 12)))
+        yield i + 1, " ".join(words), desc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SimilarityIndex(tmp, dim=args.dim)
+        t0 = time.perf_counter()
+        batch = []
+        for row in make_listings(args.listings, args.products, rng):
+            batch.append(row)
+            if len(batch) == 10_000:
+                index.append(batch)
+                batch = []
+        index.append(batch)
+        t_append = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index.refresh()
+        t_load = time.perf_counter() - t0
+
+        ids = rng.sample(range(1, args.listings + 1), args.queries)
+        t0 = time.perf_counter()
+        results = [index.nearest(index.vector_of(i), k=args.k, exclude=i) for i in ids]
+        t_query = (time.perf_counter() - t0) / args.queries
+
+        # Exact top-k by brute force on a sample. Neighbours tied with the k-th
+        # best similarity count as hits, since either choice is correct.
+        vectors = index._vectors.astype(np.float32) / 127.0
+        sample = ids[: min(50, len(ids))]
+        t0 = time.perf_counter()
+        hit = 0
+        for i, got in zip(sample, results):
+            sims = vectors @ vectors[i - 1]
+            sims[i - 1] = -np.inf
+            kth = np.partition(sims, -args.k)[-args.k]
+            hit += sum(1 for _, sim in got if sim >= kth - 1e-3)
+        t_exact = (time.perf_counter() - t0) / len(sample)
+        recall = hit / (len(sample) * args.k)
+
+    print(f"listings:      {args.listings}")
+    print(f"append:        {t_append:8.2f}s  ({args.listings / t_append:,.0f}/s)")
+    print(f"load+sort:     {t_load:8.2f}s")
+    print(f"lookup:        {t_query * 1000:8.2f}ms/query (k={args.k})")
+    print(f"exact scan:    {t_exact * 1000:8.2f}ms/query")
+    print(f"recall@{args.k}:     {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+"""
+Rebuild the similar-listings index from every listing in the database.
+
+Usage:
+  python scripts/build_similarity_index.py
+
+The scraping worker appends new listings afterwards; rerun after changing the
+similarity settings (dim/features) or to drop deleted listings.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.similarity_index import get_similarity_index  # noqa: E402
+from src.core.database import session_scope  # noqa: E402
+
+# Register the models Listing's relationships refer to
+from src.models import alert as _alert  # noqa: F401,E402
+from src.models import deal as _deal  # noqa: F401,E402
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    with session_scope() as db:
+        total = get_similarity_index().rebuild_from_db(db)
+    print({"indexed": total})
+
+
+if __name__ == "__main__":
+    main()
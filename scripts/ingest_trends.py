@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+"""
+Run one Google Trends ingestion pass into the trends table.
+
+Usage:
+  python scripts/ingest_trends.py [--keywords "iphone,ps5"] [--recorded DIR]
+
+--recorded replays responses previously cached in DIR (no network access).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.database import session_scope  # noqa: E402
+from src.workers.trends_worker import CachingTransport, ingest_trends  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keywords", default=None, help="comma-separated; defaults to config keywords")
+    parser.add_argument("--recorded", default=None, help="directory of recorded responses to replay offline")
+    args = parser.parse_args()
+
+    keywords = [k for k in args.keywords.split(",")] if args.keywords else None
+    transport = CachingTransport(None, args.recorded) if args.recorded else None
+    with session_scope() as db:
+        counts = ingest_trends(db, keywords=keywords, transport=transport)
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
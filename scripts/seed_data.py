@@ -48,7 +48,7 @@ def seed_listings() -> None:
                 "posted_at": datetime.now(timezone.utc),
                 "seller_contact": None,
                 "is_active": True,
-                "metadata": {"condition": "excellent"},
+                "meta": {"condition": "excellent"},
             },
             {
                 "source": "offerup",
@@ -63,7 +63,7 @@ def seed_listings() -> None:
                 "posted_at": datetime.now(timezone.utc),
                 "seller_contact": None,
                 "is_active": True,
-                "metadata": {"extras": "1 controller"},
+                "meta": {"extras": "1 controller"},
             },
             {
                 "source": "facebook",
@@ -78,7 +78,7 @@ def seed_listings() -> None:
                 "posted_at": datetime.now(timezone.utc),
                 "seller_contact": None,
                 "is_active": True,
-                "metadata": {"brand": "NVIDIA"},
+                "meta": {"brand": "NVIDIA"},
             },
         ]
 
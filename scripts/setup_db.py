@@ -8,7 +8,8 @@ Usage:
   - Or with local env configured via .env / config.yaml
 
 This script imports models to ensure SQLAlchemy registers all tables,
-then calls Base.metadata.create_all(engine).
+then calls Base.metadata.create_all(engine) and applies the idempotent column
+additions in UPGRADES to tables created by earlier versions.
 """
 
 from pathlib import Path
@@ -19,6 +20,8 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from sqlalchemy import text  # noqa: E402
+
 from src.core.database import get_engine  # noqa: E402
 from src.models import Base  # noqa: E402
 
@@ -27,11 +30,41 @@ from src.models import listing as _listing  # noqa: F401,E402
 from src.models import deal as _deal  # noqa: F401,E402
 from src.models import alert as _alert  # noqa: F401,E402
 from src.models import trend as _trend  # noqa: F401,E402
+from src.models import latency as _latency  # noqa: F401,E402
+from src.models import price_sketch as _price_sketch  # noqa: F401,E402
+from src.models import saved_search as _saved_search  # noqa: F401,E402
+
+
+# create_all() never alters existing tables; columns added after a table's
+# first release are listed here.
+UPGRADES = [
+    "ALTER TABLE listings ADD COLUMN IF NOT EXISTS duplicate_of_id INTEGER REFERENCES listings(id) ON DELETE SET NULL",
+    "CREATE INDEX IF NOT EXISTS ix_listings_duplicate_of_id ON listings (duplicate_of_id)",
+    # Keyset pagination on (created_at, id), optionally behind a filter column
+    "CREATE INDEX IF NOT EXISTS ix_listings_created_at_id ON listings (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_deals_created_at_id ON deals (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_deals_status_created_at_id ON deals (status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_alerts_created_at_id ON alerts (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_alerts_status_created_at_id ON alerts (status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_alerts_channel_created_at_id ON alerts (channel, created_at, id)",
+    # Deal filters and sort=score
+    "CREATE INDEX IF NOT EXISTS ix_deals_score_id ON deals (score, id)",
+    "CREATE INDEX IF NOT EXISTS ix_deals_status_score_id ON deals (status, score, id)",
+    "CREATE INDEX IF NOT EXISTS ix_listings_category ON listings (category)",
+    "CREATE INDEX IF NOT EXISTS ix_listings_posted_at ON listings (posted_at)",
+    # Full-text search (GET /listings/search); adding the column rewrites the table once
+    f"ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({_listing.SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_listings_search_vector ON listings USING gin (search_vector)",
+]
 
 
 def main() -> None:
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for stmt in UPGRADES:
+            conn.execute(text(stmt))
     print("Database tables created successfully.")
 
 
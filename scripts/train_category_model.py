@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+"""
+Train the category model from the listings table and save it as an .npz artifact.
+
+Usage:
+  python scripts/train_category_model.py [--epochs 5] [--out data/category_model.npz]
+
+Labels are stored categories where present, else the keyword-rule category.
+Listings matching no rule are left out of training.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.analyzers.category_classifier import (  # noqa: E402
+    CategoryClassifier,
+    CategoryModel,
+    category_rules,
+    category_settings,
+    training_rows,
+)
+from src.core.database import session_scope  # noqa: E402
+
+# Register the models Listing's relationships refer to
+from src.models import alert as _alert  # noqa: F401,E402
+from src.models import deal as _deal  # noqa: F401,E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--out", default=None, help="defaults to categories.model_path")
+    args = parser.parse_args()
+
+    out = args.out or category_settings().get("model_path", "data/category_model.npz")
+    with session_scope() as db:
+        texts, labels = training_rows(db, CategoryClassifier(category_rules()))
+    t0 = time.perf_counter()
+    model = CategoryModel.train(texts, labels, epochs=args.epochs)
+    model.save(out)
+    print({"examples": len(texts), "classes": model.classes, "seconds": round(time.perf_counter() - t0, 2), "path": out})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass(frozen=True)
+class CatalogMatch:
+    key: str  # canonical product key
+    start: int  # token offset in the title
+    length: int  # tokens matched
+
+
+class CatalogMatcher:
+    """
+    Token-level Aho-Corasick automaton over catalog phrases.
+
+    Phrases and titles are split into lowercase alphanumeric tokens, so matches
+    always fall on word boundaries ("ps5" does not match "ps55"). One pass over a
+    title's tokens finds every phrase; each state also keeps its longest output
+    (following failure links), which makes best_key() O(1) per token.
+    """
+
+    def __init__(self, phrases: Dict[str, str]) -> None:
+        """
+        phrases: alias phrase -> canonical key (canonical keys map to themselves).
+        """
+        self._vocab: Dict[str, int] = {}
+        self._goto: Dict[int, int] = {}  # state * stride + token id -> state
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[Tuple[str, int], ...]] = [()]  # (key, length) incl. failure chain
+        self._best: List[Optional[Tuple[str, int]]] = [None]
+        self.size = 0
+
+        compiled: List[Tuple[List[str], str]] = []
+        for phrase, key in phrases.items():
+            tokens = tokenize(phrase)
+            if tokens and key:
+                compiled.append((tokens, key))
+                for tok in tokens:
+                    self._vocab.setdefault(tok, len(self._vocab))
+        self._stride = len(self._vocab) + 1
+
+        own: List[List[Tuple[str, int]]] = [[]]
+        for tokens, key in compiled:
+            state = 0
+            for tok in tokens:
+                edge = state * self._stride + self._vocab[tok]
+                nxt = self._goto.get(edge)
+                if nxt is None:
+                    nxt = len(self._fail)
+                    self._goto[edge] = nxt
+                    self._fail.append(0)
+                    own.append([])
+                state = nxt
+            if (key, len(tokens)) not in own[state]:
+                own[state].append((key, len(tokens)))
+            self.size += 1
+
+        self._link(own)
+
+    def _link(self, own: List[List[Tuple[str, int]]]) -> None:
+        children: List[List[Tuple[int, int]]] = [[] for _ in self._fail]
+        for edge, child in self._goto.items():
+            children[edge // self._stride].append((edge % self._stride, child))
+
+        self._outputs = [()] * len(self._fail)
+        self._best = [None] * len(self._fail)
+        queue = deque()
+        for _, child in children[0]:
+            self._fail[child] = 0
+            queue.append(child)
+        self._finish(0, own)
+        while queue:
+            state = queue.popleft()
+            self._finish(state, own)
+            for tok, child in children[state]:
+                f = self._fail[state]
+                while f and (f * self._stride + tok) not in self._goto:
+                    f = self._fail[f]
+                target = self._goto.get(f * self._stride + tok, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+
+    def _finish(self, state: int, own: List[List[Tuple[str, int]]]) -> None:
+        # BFS order guarantees the failure target is finished first
+        inherited = self._outputs[self._fail[state]] if state else ()
+        outs = tuple(own[state]) + tuple(o for o in inherited if o not in own[state])
+        self._outputs[state] = outs
+        self._best[state] = max(outs, key=lambda o: o[1]) if outs else None
+
+    def _step(self, state: int, tid: Optional[int]) -> int:
+        if tid is None:
+            return 0
+        while True:
+            nxt = self._goto.get(state * self._stride + tid)
+            if nxt is not None:
+                return nxt
+            if state == 0:
+                return 0
+            state = self._fail[state]
+
+    def match(self, title: Optional[str]) -> List[CatalogMatch]:
+        """
+        Every catalog phrase in the title, in order of where it ends.
+        """
+        out: List[CatalogMatch] = []
+        state = 0
+        vocab = self._vocab
+        for i, tok in enumerate(tokenize(title)):
+            state = self._step(state, vocab.get(tok))
+            for key, length in self._outputs[state]:
+                out.append(CatalogMatch(key=key, start=i - length + 1, length=length))
+        return out
+
+    def keys(self, title: Optional[str]) -> List[str]:
+        """
+        Distinct canonical keys found in the title, in order of appearance.
+        """
+        return list(dict.fromkeys(m.key for m in sorted(self.match(title), key=lambda m: m.start)))
+
+    def best_key(self, title: Optional[str]) -> Optional[str]:
+        """
+        Canonical key of the longest phrase in the title (earliest on ties).
+        """
+        best: Optional[Tuple[str, int]] = None
+        state = 0
+        vocab = self._vocab
+        goto = self._goto
+        fail = self._fail
+        stride = self._stride
+        for tok in _TOKEN_RE.findall((title or "").lower()):
+            tid = vocab.get(tok)
+            if tid is None:
+                state = 0
+                continue
+            while True:
+                nxt = goto.get(state * stride + tid)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            cand = self._best[state]
+            if cand is not None and (best is None or cand[1] > best[1]):
+                best = cand
+        return best[0] if best is not None else None
+
+
+def catalog_phrases(config: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Alias phrase -> canonical key from config:
+      scraping.keywords and trends.overrides keys are canonical keys themselves;
+      catalog maps canonical keys to aliases, e.g.
+        catalog:
+          "ps5": ["playstation 5", "ps 5"]
+          "iphone 13": ["iphone13"]
+    """
+    data = config if config is not None else cfg.data()
+    phrases: Dict[str, str] = {}
+
+    def add(phrase: Any, key: Any) -> None:
+        p = " ".join(tokenize(str(phrase)))
+        k = str(key).strip().lower()
+        if p and k:
+            phrases.setdefault(p, k)
+
+    catalog = data.get("catalog") or {}
+    if isinstance(catalog, dict):
+        for key, aliases in catalog.items():
+            add(key, key)
+            for alias in aliases if isinstance(aliases, list) else [aliases] if aliases else []:
+                add(alias, key)
+    for key in ((data.get("trends") or {}).get("overrides") or {}):
+        add(key, key)
+    for key in ((data.get("scraping") or {}).get("keywords") or []):
+        add(key, key)
+    return phrases
+
+
+def _fingerprint(phrases: Dict[str, str]) -> str:
+    return hashlib.sha1(json.dumps(phrases, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+_matcher: Optional[CatalogMatcher] = None
+_matcher_fp: Optional[str] = None
+_matcher_src: Optional[Tuple[int, ...]] = None
+_matcher_lock = threading.Lock()
+
+
+def get_catalog_matcher() -> CatalogMatcher:
+    """
+    Compiled matcher for the current config. Rebuilt only when the catalog,
+    trends.overrides or scraping.keywords sections change.
+    """
+    global _matcher, _matcher_fp, _matcher_src
+    data = cfg.data()
+    src = tuple(id(data.get(s)) for s in ("catalog", "trends", "scraping")) + (id(data),)
+    if _matcher is not None and src == _matcher_src:
+        return _matcher
+    with _matcher_lock:
+        phrases = catalog_phrases(data)
+        fp = _fingerprint(phrases)
+        if _matcher is None or fp != _matcher_fp:
+            _matcher = CatalogMatcher(phrases)
+            _matcher_fp = fp
+            log.info("Catalog matcher compiled: phrases=%d", _matcher.size)
+        _matcher_src = src
+        return _matcher
+
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..core.cache_versions import bump
+from ..core.config import cfg
+from ..core.exceptions import AnalysisError
+from ..utils.logger import get_logger
+from .catalog_matcher import CatalogMatcher, tokenize
+
+log = get_logger()
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_HASH_MUL = np.uint64(0x100000001B3)  # FNV-1a 64-bit prime, used as a polynomial base
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def classifier_text(title: Optional[str], description: Optional[str], desc_chars: int = 200) -> str:
+    """
+    Normalized text the model sees: title plus the start of the description,
+    lowercase alphanumerics separated by single spaces and padded with a space
+    on both sides (so word-boundary n-grams exist).
+    """
+    raw = f"{title or ''} {(description or '')[:desc_chars]}".lower()
+    return " " + _NON_ALNUM_RE.sub(" ", raw).strip() + " "
+
+
+class NgramHasher:
+    """
+    Hashed character n-grams for a whole batch at once.
+
+    The batch is concatenated into one byte array; every n-gram hash is a
+    polynomial rolling hash computed with shifted-slice arithmetic over that
+    array, and windows that straddle two documents are dropped. Returns
+    (doc index, feature index) pairs, i.e. a sparse binary design matrix.
+    """
+
+    def __init__(self, features: int = 1 << 18, ngram_range: Tuple[int, int] = (3, 5)) -> None:
+        self.features = features
+        self.ngram_range = ngram_range
+
+    def transform(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        if not texts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        encoded = [t.encode("utf-8") for t in texts]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        ends = np.cumsum(lengths)
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        doc_of = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        docs: List[np.ndarray] = []
+        feats: List[np.ndarray] = []
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            m = len(buf) - n + 1
+            if m <= 0:
+                continue
+            h = np.full(m, np.uint64(n), dtype=np.uint64)
+            for j in range(n):
+                h = h * _HASH_MUL + buf[j : j + m]
+            pos_doc = doc_of[:m]
+            ok = np.arange(m) + n <= ends[pos_doc]  # window ends inside its own document
+            h = h[ok]
+            # Fold the high bits in before reducing modulo the feature count
+            h = (h ^ (h >> np.uint64(29))) & _MASK32
+            docs.append(pos_doc[ok])
+            feats.append((h % np.uint64(self.features)).astype(np.int64))
+        if not docs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(docs), np.concatenate(feats)
+
+
+class CategoryModel:
+    """
+    Linear model over hashed character n-grams: one weight column per category.
+    Trained with an averaged perceptron; stored as an uncompressed .npz so
+    loading is a plain read of the weight matrix.
+    """
+
+    def __init__(self, classes: Sequence[str], weights: np.ndarray, hasher: NgramHasher) -> None:
+        self.classes = [str(c) for c in classes]
+        self.weights = weights.astype(np.float32, copy=False)
+        self.hasher = hasher
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        (docs, classes) scores, averaged over each document's n-grams.
+        """
+        doc, feat = self.hasher.transform(texts)
+        n = len(texts)
+        out = np.zeros((n, len(self.classes)), dtype=np.float32)
+        if not len(doc):
+            return out
+        w = self.weights[feat]
+        for c in range(len(self.classes)):
+            out[:, c] = np.bincount(doc, weights=w[:, c], minlength=n)
+        counts = np.bincount(doc, minlength=n).astype(np.float32)
+        out /= np.maximum(counts, 1.0)[:, None]
+        return out
+
+    def predict(self, texts: Sequence[str], min_margin: float = 0.0) -> List[Optional[str]]:
+        """
+        Best category per text, or None when the lead over the runner-up is
+        below min_margin.
+        """
+        if not texts:
+            return []
+        s = self.scores(texts)
+        if s.shape[1] == 1:
+            return [self.classes[0] if v > min_margin else None for v in s[:, 0]]
+        top2 = np.partition(s, -2, axis=1)[:, -2:]
+        margin = top2[:, 1] - top2[:, 0]
+        best = s.argmax(axis=1)
+        return [self.classes[b] if m > min_margin else None for b, m in zip(best.tolist(), margin.tolist())]
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        hasher: Optional[NgramHasher] = None,
+        epochs: int = 5,
+        seed: int = 7,
+    ) -> "CategoryModel":
+        """
+        Averaged multiclass perceptron: on a mistake, add the example's n-grams
+        to the true class and subtract them from the predicted one.
+        """
+        hasher = hasher or NgramHasher()
+        classes = sorted(set(labels))
+        if len(classes) < 2:
+            raise AnalysisError("category model needs at least two labelled classes")
+        y = np.asarray([classes.index(lab) for lab in labels], dtype=np.int64)
+        doc, feat = hasher.transform(texts)
+        order = np.argsort(doc, kind="stable")
+        doc, feat = doc[order], feat[order]
+        bounds = np.searchsorted(doc, np.arange(len(texts) + 1))
+        rows = [np.unique(feat[bounds[i] : bounds[i + 1]]) for i in range(len(texts))]
+
+        w = np.zeros((hasher.features, len(classes)), dtype=np.float32)
+        u = np.zeros_like(w)  # sum of c * update, for the averaged weights w - u / c
+        c = 1.0
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            for i in rng.permutation(len(texts)):
+                idx = rows[i]
+                if not len(idx):
+                    continue
+                pred = int(w[idx].sum(axis=0).argmax())
+                if pred != y[i]:
+                    w[idx, y[i]] += 1.0
+                    w[idx, pred] -= 1.0
+                    u[idx, y[i]] += c
+                    u[idx, pred] -= c
+                c += 1.0
+        return cls(classes, w - u / c, hasher)
+
+    def save(self, path: str | Path) -> None:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with p.open("wb") as f:
+            np.savez(
+                f,
+                weights=self.weights,
+                classes=np.asarray(self.classes),
+                features=np.int64(self.hasher.features),
+                ngram_range=np.asarray(self.hasher.ngram_range, dtype=np.int64),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CategoryModel":
+        with np.load(Path(path), allow_pickle=False) as data:
+            lo, hi = (int(x) for x in data["ngram_range"])
+            hasher = NgramHasher(int(data["features"]), (lo, hi))
+            return cls(data["classes"].tolist(), data["weights"], hasher)
+
+
+def category_rules(config: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Keyword phrase -> category from config:
+      categories:
+        rules:
+          gaming: ["ps5", "xbox", "nintendo switch"]
+          furniture: ["sofa", "couch", "desk"]
+    """
+    data = config if config is not None else cfg.data()
+    rules = ((data.get("categories") or {}).get("rules")) or {}
+    phrases: Dict[str, str] = {}
+    if isinstance(rules, dict):
+        for category, keywords in rules.items():
+            cat = str(category).strip().lower()
+            for kw in keywords if isinstance(keywords, list) else [keywords] if keywords else []:
+                p = " ".join(tokenize(str(kw)))
+                if p and cat:
+                    phrases.setdefault(p, cat)
+    return phrases
+
+
+class CategoryClassifier:
+    """
+    Fills Listing.category: keyword rules first (longest phrase in the title,
+    then in the description), then the n-gram model for the remaining texts
+    when it is confident enough.
+    """
+
+    def __init__(self, rules: Dict[str, str], model: Optional[CategoryModel] = None, min_margin: float = 0.05) -> None:
+        self.rules = CatalogMatcher(rules)
+        self.model = model
+        self.min_margin = min_margin
+
+    def rule_category(self, title: Optional[str], description: Optional[str] = None) -> Optional[str]:
+        return self.rules.best_key(title) or self.rules.best_key((description or "")[:200])
+
+    def predict_many(
+        self, titles: Sequence[Optional[str]], descriptions: Optional[Sequence[Optional[str]]] = None
+    ) -> List[Optional[str]]:
+        descs = descriptions if descriptions is not None else [None] * len(titles)
+        out = [self.rule_category(t, d) for t, d in zip(titles, descs)]
+        if self.model is not None:
+            todo = [i for i, c in enumerate(out) if c is None]
+            if todo:
+                preds = self.model.predict([classifier_text(titles[i], descs[i]) for i in todo], self.min_margin)
+                for i, p in zip(todo, preds):
+                    out[i] = p
+        return out
+
+    def fill(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Set data["category"] on parsed listing dicts that have none. Returns the number filled.
+        """
+        todo = [d for d in items if not d.get("category")]
+        if not todo:
+            return 0
+        preds = self.predict_many([d.get("title") for d in todo], [d.get("description") for d in todo])
+        filled = 0
+        for data, cat in zip(todo, preds):
+            if cat is not None:
+                data["category"] = cat
+                filled += 1
+        return filled
+
+
+def training_rows(db: Session, classifier: CategoryClassifier, chunk_size: int = 5000) -> Tuple[List[str], List[str]]:
+    """
+    Labelled texts for training: listings with a stored category, else the
+    category the keyword rules assign (weak supervision), so the model learns
+    to generalize past the rule keywords.
+    """
+    from ..models.listing import Listing
+
+    stmt = (
+        select(Listing.title, Listing.description, Listing.category)
+        .order_by(Listing.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    texts: List[str] = []
+    labels: List[str] = []
+    for title, description, category in db.execute(stmt):
+        label = (category or "").strip().lower() or classifier.rule_category(title, description)
+        if label:
+            texts.append(classifier_text(title, description))
+            labels.append(label)
+    return texts, labels
+
+
+def backfill_categories(db: Session, classifier: CategoryClassifier, chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    Classify listings without a category, streaming by id in chunks and
+    committing each chunk.
+    """
+    from ..models.listing import Listing
+
+    last_id = 0
+    scanned = 0
+    filled = 0
+    while True:
+        rows = db.execute(
+            select(Listing.id, Listing.title, Listing.description)
+            .where(Listing.category.is_(None), Listing.id > last_id)
+            .order_by(Listing.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        scanned += len(rows)
+        preds = classifier.predict_many([r[1] for r in rows], [r[2] for r in rows])
+        params = [{"id": r[0], "category": c} for r, c in zip(rows, preds) if c is not None]
+        if params:
+            db.execute(update(Listing), params)
+            filled += len(params)
+        db.commit()
+        if params:
+            bump("listings")
+        log.info("Category backfill: scanned=%d filled=%d (last id %d)", scanned, filled, last_id)
+    return {"scanned": scanned, "filled": filled}
+
+
+_classifier: Optional[CategoryClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def category_settings() -> dict:
+    """
+    categories:
+      enabled: true
+      model_path: "data/category_model.npz"   # optional; rules only when missing
+      min_margin: 0.05                         # model score lead required over the runner-up
+      rules:
+        gaming: ["ps5", "xbox", "nintendo switch"]
+    """
+    return cfg.get("categories", {}) or {}
+
+
+def load_classifier(settings: Optional[dict] = None) -> CategoryClassifier:
+    s = settings if settings is not None else category_settings()
+    model: Optional[CategoryModel] = None
+    path = Path(s.get("model_path", "data/category_model.npz"))
+    if path.exists():
+        try:
+            model = CategoryModel.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("Category model %s could not be loaded: %s", path, e)
+    return CategoryClassifier(category_rules(), model=model, min_margin=float(s.get("min_margin", 0.05)))
+
+
+def _on_config(changed: set[str]) -> None:
+    # Rules, model path or margin changed: rebuild on next use
+    global _classifier
+    with _classifier_lock:
+        _classifier = None
+
+
+cfg.subscribe(_on_config, ("categories",))
+
+
+def get_category_classifier() -> CategoryClassifier:
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = load_classifier()
+            log.info(
+                "Category classifier loaded: rules=%d, model=%s",
+                _classifier.rules.size,
+                ",".join(_classifier.model.classes) if _classifier.model else "none",
+            )
+        return _classifier
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Condition/marketing words that do not change what the item is
+_STOPWORDS = frozenset(
+    """
+    a an and the for with w in on of to or by from
+    new used like mint excellent great good fair condition cond works working
+    perfect clean nice brand sealed open box obo firm cash only pickup must sell
+    sale selling asap cheap deal price negotiable barely lightly
+    """.split()
+)
+
+
+def title_tokens(title: Optional[str], max_tokens: int = 4) -> Tuple[str, ...]:
+    """
+    Leading informative tokens of a title, in order: "iPhone 13 128GB - Excellent"
+    -> ("iphone", "13", "128gb").
+    """
+    out: List[str] = []
+    for tok in _TOKEN_RE.findall((title or "").lower()):
+        if tok in _STOPWORDS or (len(tok) < 2 and not tok.isdigit()) or tok in out:
+            continue
+        out.append(tok)
+        if len(out) >= max_tokens:
+            break
+    return tuple(out)
+
+
+def _key(category: str, tokens: Tuple[str, ...]) -> int:
+    raw = category + "\x1f" + " ".join(tokens)
+    return int.from_bytes(hashlib.blake2b(raw.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _quantile(sorted_vals: List[float], q: float) -> float:
+    # Linear interpolation between closest ranks (numpy's default)
+    pos = (len(sorted_vals) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (pos - lo)
+
+
+@dataclass(frozen=True)
+class CompStats:
+    median: float
+    p25: float
+    p75: float
+    count: int  # comparables seen for this key (the sample keeps the most recent ones)
+    tokens: Tuple[str, ...]  # title tokens the match was made on
+
+
+class _Comps:
+    """
+    Most recent prices for one key in a float32 ring buffer, with cached stats.
+    """
+
+    __slots__ = ("prices", "seen", "stats")
+
+    def __init__(self) -> None:
+        self.prices = array("f")
+        self.seen = 0
+        self.stats: Optional[CompStats] = None
+
+    def add(self, price: float, capacity: int) -> None:
+        if len(self.prices) < capacity:
+            self.prices.append(price)
+        else:
+            self.prices[self.seen % capacity] = price
+        self.seen += 1
+        self.stats = None
+
+    def summary(self, tokens: Tuple[str, ...]) -> CompStats:
+        if self.stats is None:
+            vals = sorted(self.prices)
+            self.stats = CompStats(
+                median=round(_quantile(vals, 0.5), 2),
+                p25=round(_quantile(vals, 0.25), 2),
+                p75=round(_quantile(vals, 0.75), 2),
+                count=self.seen,
+                tokens=tokens,
+            )
+        return self.stats
+
+
+class ComparablesIndex:
+    """
+    Comparable-sales index: recent prices of similar listings, keyed by category
+    plus the leading informative title tokens.
+
+    Every listing is added under each token prefix (1..max_tokens tokens), so a
+    lookup backs off from the most specific key ("iphone 13 128gb") to broader
+    ones ("iphone 13", "iphone") until one has at least min_count comparables.
+    Keys are 64-bit hashes and samples are bounded float32 ring buffers, so
+    memory stays proportional to the number of distinct keys.
+    """
+
+    def __init__(self, sample_size: int = 32, max_tokens: int = 4, min_count: int = 5) -> None:
+        self.sample_size = max(1, int(sample_size))
+        self.max_tokens = max(1, int(max_tokens))
+        self.min_count = max(1, int(min_count))
+        self._comps: Dict[int, _Comps] = {}
+        self._lock = threading.Lock()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._comps)
+
+    def add(self, title: Optional[str], category: Optional[str], price: Optional[float]) -> None:
+        try:
+            p = float(price) if price is not None else 0.0
+        except (TypeError, ValueError):
+            return
+        if not p > 0:
+            return
+        tokens = title_tokens(title, self.max_tokens)
+        cat = (category or "").strip().lower()
+        with self._lock:
+            for n in range(1, len(tokens) + 1):
+                key = _key(cat, tokens[:n])
+                comps = self._comps.get(key)
+                if comps is None:
+                    comps = self._comps[key] = _Comps()
+                comps.add(p, self.sample_size)
+
+    def lookup(self, title: Optional[str], category: Optional[str]) -> Optional[CompStats]:
+        """
+        Stats of the most specific key with enough comparables, or None.
+        At most max_tokens hash lookups.
+        """
+        tokens = title_tokens(title, self.max_tokens)
+        cat = (category or "").strip().lower()
+        for n in range(len(tokens), 0, -1):
+            comps = self._comps.get(_key(cat, tokens[:n]))
+            if comps is not None and comps.seen >= self.min_count:
+                return comps.summary(tokens[:n])
+        return None
+
+    def expected_price(self, title: Optional[str], category: Optional[str]) -> Optional[float]:
+        stats = self.lookup(title, category)
+        return stats.median if stats is not None else None
+
+    def rebuild_from_db(self, db: Session, max_age_days: Optional[float] = 180, chunk_size: int = 5000) -> int:
+        """
+        Replace the index with listings created in the last max_age_days,
+        streamed oldest first so each sample ends up with the most recent prices.
+        Returns the number of listings read.
+        """
+        from ..models.listing import Listing
+
+        started = time.perf_counter()
+        fresh = ComparablesIndex(self.sample_size, self.max_tokens, self.min_count)
+        stmt = select(Listing.title, Listing.category, Listing.price).where(Listing.price > 0)
+        if max_age_days:
+            stmt = stmt.where(Listing.created_at >= datetime.now(timezone.utc) - timedelta(days=float(max_age_days)))
+        stmt = stmt.order_by(Listing.created_at, Listing.id).execution_options(yield_per=chunk_size)
+
+        rows = 0
+        for title, category, price in db.execute(stmt):
+            fresh.add(title, category, price)
+            rows += 1
+
+        with self._lock:
+            self._comps = fresh._comps
+            self.built = True
+        log.info(
+            "Comparables index rebuilt: listings=%d, keys=%d in %.1fs",
+            rows,
+            len(self._comps),
+            time.perf_counter() - started,
+        )
+        return rows
+
+    def ensure_built(self, db: Session, max_age_days: Optional[float] = 180) -> None:
+        if not self.built:
+            self.rebuild_from_db(db, max_age_days=max_age_days)
+
+
+_index: Optional[ComparablesIndex] = None
+_index_lock = threading.Lock()
+
+
+def comparables_settings() -> dict:
+    """
+    comparables:
+      enabled: true
+      sample_size: 32     # recent prices kept per key
+      max_tokens: 4       # title tokens in the most specific key
+      min_count: 5        # comparables needed before a key is trusted
+      max_age_days: 180   # history window for rebuilds
+    """
+    return cfg.get("comparables", {}) or {}
+
+
+def get_comparables_index() -> ComparablesIndex:
+    """
+    Process-wide index. Starts empty; workers call ensure_built() before use
+    and add() as listings are created.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            c = comparables_settings()
+            _index = ComparablesIndex(
+                sample_size=int(c.get("sample_size", 32)),
+                max_tokens=int(c.get("max_tokens", 4)),
+                min_count=int(c.get("min_count", 5)),
+            )
+        return _index
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
+
 from ..core.config import cfg
 
 
@@ -28,6 +30,13 @@ class CompositeScorer:
     """
 
     def __init__(self) -> None:
+        self._load_config()
+        cfg.subscribe(self._on_config, ("thresholds",))
+
+    def _on_config(self, changed: set[str]) -> None:
+        self._load_config()
+
+    def _load_config(self) -> None:
         t = cfg.thresholds() or {}
         w = (t.get("composite_weights") or {}) if isinstance(t.get("composite_weights"), dict) else {}
         self.w_demand: float = float(w.get("demand", 0.6))
@@ -47,3 +56,24 @@ class CompositeScorer:
         composite = (self.w_demand * d) + (self.w_margin * m_unit)
         composite = max(0.0, min(1.0, composite))
         return CompositeScoreResult(demand_score=d, margin_percent=float(margin_percent), composite_score=composite)
+
+    def score_batch(self, demand_scores: np.ndarray, margin_percents: np.ndarray) -> np.ndarray:
+        """
+        Vectorized score(); returns the composite column.
+        """
+        d = np.maximum(0.0, np.minimum(1.0, np.asarray(demand_scores, dtype=np.float64)))
+        cap = max(1e-6, self.margin_cap_percent)
+        m_unit = np.maximum(0.0, np.minimum(1.0, np.asarray(margin_percents, dtype=np.float64) / cap))
+        composite = (self.w_demand * d) + (self.w_margin * m_unit)
+        return np.maximum(0.0, np.minimum(1.0, composite))
+
+    def sweep(self, demand_scores: np.ndarray, margin_percents: np.ndarray, demand_weights: np.ndarray) -> np.ndarray:
+        """
+        Composite column for each candidate demand weight (margin weight = 1 - w),
+        shape (len(demand_weights), rows). Used to replay weight settings.
+        """
+        d = np.maximum(0.0, np.minimum(1.0, np.asarray(demand_scores, dtype=np.float64)))
+        cap = max(1e-6, self.margin_cap_percent)
+        m_unit = np.maximum(0.0, np.minimum(1.0, np.asarray(margin_percents, dtype=np.float64) / cap))
+        w = np.clip(np.asarray(demand_weights, dtype=np.float64), 0.0, 1.0)[:, None]
+        return np.maximum(0.0, np.minimum(1.0, w * d + (1.0 - w) * m_unit))
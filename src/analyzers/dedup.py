@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import math
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+from .catalog_matcher import tokenize
+
+log = get_logger()
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def shingles(title: Optional[str], description: Optional[str], price: Optional[float], desc_tokens: int = 40) -> Set[str]:
+    """
+    Title words and word bigrams, leading description words, and a coarse
+    log-scale price bucket (~12% wide), so reposts with reworded text or a
+    small price change still overlap.
+    """
+    t = tokenize(title)
+    out: Set[str] = set(t)
+    out.update(f"{a} {b}" for a, b in zip(t, t[1:]))
+    out.update("d:" + w for w in tokenize(description)[:desc_tokens])
+    try:
+        p = float(price) if price is not None else 0.0
+    except (TypeError, ValueError):
+        p = 0.0
+    if p > 0:
+        out.add(f"p:{int(math.log1p(p) * 8)}")
+    return out
+
+
+class MinHasher:
+    """
+    MinHash signatures with num_perm universal hash functions (a*x + b) mod 2^61-1
+    over crc32 shingle hashes, computed for all permutations at once with NumPy.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # a, b < 2^32 keep a*x + b below 2^64 for 32-bit x
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        if not items:
+            return np.full(self.num_perm, _MASK32, dtype=np.uint32)
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64, count=len(items))
+        hv = (np.outer(x, self._a) + self._b) % _PRIME
+        return (hv.min(axis=0) & _MASK32).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """
+    In-memory MinHash LSH index of recent listings for near-duplicate detection.
+
+    Signatures are split into bands; listings sharing any band are candidates,
+    confirmed when the estimated Jaccard similarity reaches `threshold` and the
+    prices are within `price_tolerance` of each other. Every listing points at a
+    canonical listing (the earliest member of its cluster), and the index keeps
+    at most `max_items` listings, evicting the oldest.
+    With 16 bands of 4 rows, pairs at Jaccard 0.7 become candidates ~98% of the
+    time and pairs at 0.3 ~12% of the time.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.7,
+        price_tolerance: float = 0.15,
+        max_items: int = 500_000,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.price_tolerance = price_tolerance
+        self.max_items = max_items
+        self._items: "OrderedDict[int, Tuple[np.ndarray, float, int]]" = OrderedDict()  # id -> (sig, price, canonical)
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _band_keys(self, sig: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(i, sig[i * self.rows : (i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def _prices_close(self, a: float, b: float) -> bool:
+        if a <= 0 or b <= 0:
+            return a <= 0 and b <= 0
+        return abs(a - b) <= self.price_tolerance * max(a, b)
+
+    def _best_match(self, sig: np.ndarray, price: float, exclude: Optional[int] = None) -> Optional[int]:
+        seen: Set[int] = set()
+        best: Optional[Tuple[float, int]] = None
+        for key in self._band_keys(sig):
+            for cand in self._buckets.get(key, ()):
+                if cand in seen or cand == exclude:
+                    continue
+                seen.add(cand)
+                entry = self._items.get(cand)
+                if entry is None:
+                    continue
+                cand_sig, cand_price, _ = entry
+                sim = float(np.count_nonzero(cand_sig == sig)) / sig.shape[0]
+                if sim >= self.threshold and self._prices_close(price, cand_price):
+                    if best is None or sim > best[0] or (sim == best[0] and cand < best[1]):
+                        best = (sim, cand)
+        return best[1] if best is not None else None
+
+    def find(self, title: Optional[str], description: Optional[str], price: Optional[float]) -> Optional[int]:
+        """
+        Canonical id of an indexed near-duplicate, without adding anything.
+        """
+        sig = self.hasher.signature(shingles(title, description, price))
+        p = _as_price(price)
+        with self._lock:
+            match = self._best_match(sig, p)
+            return self._items[match][2] if match is not None else None
+
+    def add(
+        self,
+        listing_id: int,
+        title: Optional[str],
+        description: Optional[str],
+        price: Optional[float],
+        canonical_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Index a listing. Returns the canonical id it duplicates, or None when it
+        starts its own cluster. Pass canonical_id to restore a known assignment.
+        """
+        sig = self.hasher.signature(shingles(title, description, price))
+        p = _as_price(price)
+        with self._lock:
+            if canonical_id is None:
+                match = self._best_match(sig, p, exclude=listing_id)
+                if match is not None:
+                    canonical_id = self._items[match][2]
+            if canonical_id == listing_id:
+                canonical_id = None
+            self._remove(listing_id)
+            self._items[listing_id] = (sig, p, canonical_id if canonical_id is not None else listing_id)
+            for key in self._band_keys(sig):
+                self._buckets.setdefault(key, []).append(listing_id)
+            while len(self._items) > self.max_items:
+                self._remove(next(iter(self._items)))
+        return canonical_id
+
+    def _remove(self, listing_id: int) -> None:
+        entry = self._items.pop(listing_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry[0]):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(listing_id)
+            except ValueError:
+                pass
+            if not bucket:
+                del self._buckets[key]
+
+    def load(self, db: Session, window_days: float = 14, chunk_size: int = 5000) -> int:
+        """
+        Rebuild from recent listings, restoring stored cluster assignments.
+        """
+        from ..models.listing import Listing
+
+        stmt = (
+            select(Listing.id, Listing.title, Listing.description, Listing.price, Listing.duplicate_of_id)
+            .where(Listing.created_at >= datetime.now(timezone.utc) - timedelta(days=float(window_days)))
+            .order_by(Listing.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        with self._lock:
+            self._items.clear()
+            self._buckets.clear()
+        rows = 0
+        for listing_id, title, description, price, duplicate_of in db.execute(stmt):
+            self.add(listing_id, title, description, price, canonical_id=duplicate_of or listing_id)
+            rows += 1
+        self.loaded = True
+        log.info("Duplicate index loaded: listings=%d", rows)
+        return rows
+
+    def ensure_loaded(self, db: Session, window_days: float = 14) -> None:
+        if not self.loaded:
+            self.load(db, window_days=window_days)
+
+
+def _as_price(price: Optional[float]) -> float:
+    try:
+        return float(price) if price is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+_index: Optional[DuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def dedup_settings() -> dict:
+    """
+    dedup:
+      enabled: true
+      threshold: 0.7          # estimated Jaccard similarity of shingle sets
+      price_tolerance: 0.15   # max relative price difference within a cluster
+      window_days: 14         # listings loaded at startup
+      max_items: 500000
+    """
+    return cfg.get("dedup", {}) or {}
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            d = dedup_settings()
+            _index = DuplicateIndex(
+                threshold=float(d.get("threshold", 0.7)),
+                price_tolerance=float(d.get("price_tolerance", 0.15)),
+                max_items=int(d.get("max_items", 500_000)),
+            )
+        return _index
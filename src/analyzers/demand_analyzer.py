@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING, Union
+
+import numpy as np
 
 from ..core.config import cfg
 
@@ -22,9 +25,8 @@ class DemandAnalyzer:
     """
 
     def __init__(self) -> None:
-        t = cfg.thresholds() or {}
-        # How many hours since posted_at counts as "fresh"
-        self.fresh_hours: float = float(t.get("fresh_hours", 24.0))
+        self._load_config()
+        cfg.subscribe(self._on_config, ("thresholds",))
 
         # Caps to keep final score in bounds
         self.max_score: float = 1.0
@@ -34,19 +36,29 @@ class DemandAnalyzer:
         self.recency_weight: float = 0.35
         self.trend_weight: float = 0.25
 
+    def _load_config(self) -> None:
+        t = cfg.thresholds() or {}
+        # How many hours since posted_at counts as "fresh"
+        self.fresh_hours: float = float(t.get("fresh_hours", 24.0))
+
+    def _on_config(self, changed: set[str]) -> None:
+        self._load_config()
+
     @staticmethod
-    def _hours_since(dt: Optional[datetime]) -> Optional[float]:
+    def _hours_since(dt: Optional[datetime], now: Optional[datetime] = None) -> Optional[float]:
         if dt is None:
             return None
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
-        return (datetime.now(timezone.utc) - dt).total_seconds() / 3600.0
+        return ((now or datetime.now(timezone.utc)) - dt).total_seconds() / 3600.0
 
-    def score_listing(self, listing: "Listing", trend_score: Optional[float] = None) -> float:
+    def score_listing(
+        self, listing: "Listing", trend_score: Optional[float] = None, now: Optional[datetime] = None
+    ) -> float:
         score = self.base_score
 
         # Recency: full weight when posted within fresh_hours, linearly decay until 7 days
-        hours = self._hours_since(listing.posted_at)
+        hours = self._hours_since(listing.posted_at, now)
         if hours is not None:
             if hours <= self.fresh_hours:
                 score += self.recency_weight
@@ -64,3 +76,42 @@ class DemandAnalyzer:
 
         # Clamp
         return max(0.0, min(self.max_score, score))
+
+    def score_batch(
+        self,
+        posted_at: np.ndarray,
+        trend_scores: Optional[np.ndarray] = None,
+        now: Optional[Union[float, np.ndarray]] = None,
+    ) -> np.ndarray:
+        """
+        Vectorized score_listing over columns.
+          - posted_at: epoch seconds (float64), NaN when unknown
+          - trend_scores: 0..1, NaN when unknown (or None for all unknown)
+          - now: epoch seconds, scalar or per row (defaults to current time)
+        Ages are computed in integer microseconds, like timedelta.total_seconds(),
+        so results match the scalar path exactly.
+        """
+        posted = np.asarray(posted_at, dtype=np.float64)
+        score = np.full(posted.shape, self.base_score, dtype=np.float64)
+
+        if now is None or np.isscalar(now):
+            now_us = np.int64(round((time.time() if now is None else now) * 1e6))
+        else:
+            now_us = np.rint(np.asarray(now, dtype=np.float64) * 1e6).astype(np.int64)
+        known = ~np.isnan(posted)
+        posted_us = np.rint(np.where(known, posted, 0.0) * 1e6).astype(np.int64)
+        hours = ((now_us - posted_us) / 1e6) / 3600.0
+
+        window = max(1.0, 168.0 - self.fresh_hours)
+        over = np.minimum(168.0 - self.fresh_hours, np.maximum(0.0, hours - self.fresh_hours))
+        factor = np.maximum(0.0, 1.0 - (over / window))
+        recency = np.where(hours <= self.fresh_hours, self.recency_weight, self.recency_weight * factor)
+        score = np.where(known, score + recency, score)
+
+        if trend_scores is not None:
+            trend = np.asarray(trend_scores, dtype=np.float64)
+            has_trend = ~np.isnan(trend)
+            clamped = np.maximum(0.0, np.minimum(1.0, np.where(has_trend, trend, 0.0)))
+            score = np.where(has_trend, score + self.trend_weight * clamped, score)
+
+        return np.maximum(0.0, np.minimum(self.max_score, score))
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import math
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+_HEADER = struct.Struct("<BHQBddH")  # version, k, n, offset, min, max, levels
+_LEVEL = struct.Struct("<I")
+_VERSION = 1
+
+
+class KLLSketch:
+    """
+    KLL streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level h holds items of weight 2**h; when a level fills up it is sorted and
+    every other item is promoted to the next level. Capacities shrink by 2/3 per
+    level below the top, so memory is O(k) and rank error is about 1.7% at
+    k=200. Sketches merge by concatenating levels and compacting, so
+    per-process deltas can be folded into a shared copy.
+    Compaction alternates which half is kept instead of flipping a coin, which
+    keeps results reproducible.
+    """
+
+    __slots__ = ("k", "n", "levels", "_offset", "min", "max", "_cdf")
+
+    def __init__(self, k: int = 200) -> None:
+        self.k = max(8, int(k))
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._offset = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._cdf: Optional[Tuple[List[float], List[float]]] = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(lvl) for lvl in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, value: float) -> None:
+        x = float(value)
+        if math.isnan(x):
+            return
+        self.levels[0].append(x)
+        self.n += 1
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self._cdf = None
+        if self._size() >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        if other.n == 0:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, lvl in enumerate(other.levels):
+            self.levels[h].extend(lvl)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._cdf = None
+        while self._size() >= self._max_size():
+            self._compress()
+
+    def _compress(self) -> None:
+        for h in range(len(self.levels)):
+            if len(self.levels[h]) < self._capacity(h):
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            items = sorted(self.levels[h])
+            leftover = [items.pop()] if len(items) % 2 else []
+            self.levels[h + 1].extend(items[self._offset::2])
+            self._offset ^= 1
+            self.levels[h] = leftover
+            if self._size() < self._max_size():
+                break
+
+    def _sorted_cdf(self) -> Tuple[List[float], List[float]]:
+        if self._cdf is None:
+            weighted = sorted((x, 1 << h) for h, lvl in enumerate(self.levels) for x in lvl)
+            values: List[float] = []
+            cum: List[float] = []
+            total = 0
+            for x, w in weighted:
+                total += w
+                values.append(x)
+                cum.append(total)
+            self._cdf = (values, [c / total for c in cum] if total else [])
+        return self._cdf
+
+    def rank(self, value: float) -> float:
+        """
+        Approximate fraction of seen values <= value, in [0, 1].
+        """
+        values, cdf = self._sorted_cdf()
+        if not values:
+            return math.nan
+        i = bisect_right(values, float(value))
+        return cdf[i - 1] if i else 0.0
+
+    def quantile(self, q: float) -> float:
+        values, cdf = self._sorted_cdf()
+        if not values:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        return values[min(bisect_left(cdf, q), len(values) - 1)]
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(_VERSION, self.k, self.n, self._offset, self.min, self.max, len(self.levels))]
+        for lvl in self.levels:
+            parts.append(_LEVEL.pack(len(lvl)))
+            parts.append(array("d", lvl).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        version, k, n, offset, lo, hi, nlevels = _HEADER.unpack_from(data, 0)
+        if version != _VERSION:
+            raise ValueError(f"unsupported sketch version {version}")
+        sk = cls(k)
+        sk.n, sk._offset, sk.min, sk.max = n, offset, lo, hi
+        sk.levels = []
+        pos = _HEADER.size
+        for _ in range(nlevels):
+            (size,) = _LEVEL.unpack_from(data, pos)
+            pos += _LEVEL.size
+            lvl = array("d")
+            lvl.frombytes(data[pos : pos + 8 * size])
+            pos += 8 * size
+            sk.levels.append(lvl.tolist())
+        return sk
+
+
+@dataclass(frozen=True)
+class PricePosition:
+    key: str  # market the listing was compared against
+    count: int
+    median: float
+    percentile: float  # 0..100, share of market prices <= this price
+    discount_percent: float  # (median - price) / median * 100
+
+
+def market_keys(category: Optional[str], keyword: Optional[str]) -> List[str]:
+    """
+    Sketch keys for a listing, most specific first.
+    """
+    keys: List[str] = []
+    if keyword and keyword.strip():
+        keys.append("kw:" + keyword.strip().lower()[:200])
+    if category and category.strip():
+        keys.append("cat:" + category.strip().lower()[:200])
+    return keys
+
+
+class PriceSketchStore:
+    """
+    Per-market KLL sketches of listing prices, persisted in price_sketches.
+
+    Each process keeps a merged view for reads plus unflushed deltas. flush()
+    merges the deltas into the stored rows under row locks (so concurrent
+    workers never lose updates) and load() refreshes the view from the table.
+    position() answers in O(log k) from a cached CDF per sketch.
+    """
+
+    def __init__(self, k: int = 200, min_count: int = 20, refresh_seconds: float = 300.0) -> None:
+        self.k = k
+        self.min_count = max(1, int(min_count))
+        self.refresh_seconds = refresh_seconds
+        self._view: Dict[str, KLLSketch] = {}
+        self._pending: Dict[str, KLLSketch] = {}
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+
+    def add(self, price: Optional[float], category: Optional[str], keyword: Optional[str] = None) -> None:
+        try:
+            p = float(price) if price is not None else 0.0
+        except (TypeError, ValueError):
+            return
+        if not p > 0:
+            return
+        with self._lock:
+            for key in market_keys(category, keyword):
+                for target in (self._view, self._pending):
+                    sk = target.get(key)
+                    if sk is None:
+                        sk = target[key] = KLLSketch(self.k)
+                    sk.update(p)
+
+    def position(self, price: Optional[float], category: Optional[str], keyword: Optional[str] = None) -> Optional[PricePosition]:
+        try:
+            p = float(price) if price is not None else math.nan
+        except (TypeError, ValueError):
+            return None
+        if not p > 0:
+            return None
+        for key in market_keys(category, keyword):
+            sk = self._view.get(key)
+            if sk is None or sk.n < self.min_count:
+                continue
+            median = sk.quantile(0.5)
+            if not median > 0:
+                continue
+            return PricePosition(
+                key=key,
+                count=sk.n,
+                median=median,
+                percentile=round(sk.rank(p) * 100.0, 2),
+                discount_percent=(median - p) / median * 100.0,
+            )
+        return None
+
+    def discounts(
+        self,
+        prices: Iterable[Optional[float]],
+        categories: Iterable[Optional[str]],
+        keywords: Optional[Iterable[Optional[str]]] = None,
+    ) -> np.ndarray:
+        """
+        discount_percents column for SniperBot.evaluate_many(); NaN without market data.
+        """
+        kws = keywords if keywords is not None else repeat(None)
+        out: List[float] = []
+        for p, c, kw in zip(prices, categories, kws):
+            pos = self.position(p, c, kw)
+            out.append(math.nan if pos is None else pos.discount_percent)
+        return np.asarray(out, dtype=np.float64)
+
+    def flush(self, db: Session) -> int:
+        """
+        Merge pending deltas into the stored sketches (caller commits).
+        Returns the number of keys written.
+        """
+        from ..models.price_sketch import PriceSketch
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        keys = sorted(pending)  # fixed lock order across workers
+        try:
+            empty = KLLSketch(self.k).to_bytes()
+            db.execute(
+                insert(PriceSketch)
+                .values([{"key": k, "count": 0, "sketch": empty} for k in keys])
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+            rows = db.execute(
+                select(PriceSketch).where(PriceSketch.key.in_(keys)).order_by(PriceSketch.key).with_for_update()
+            ).scalars()
+            for row in rows:
+                merged = KLLSketch.from_bytes(row.sketch)
+                merged.merge(pending[row.key])
+                row.sketch = merged.to_bytes()
+                row.count = merged.n
+            db.flush()
+        except Exception:
+            with self._lock:
+                for k, sk in pending.items():
+                    self._pending.setdefault(k, KLLSketch(self.k)).merge(sk)
+            raise
+        return len(keys)
+
+    def load(self, db: Session) -> int:
+        """
+        Replace the read view with the stored sketches plus unflushed deltas.
+        """
+        from ..models.price_sketch import PriceSketch
+
+        view: Dict[str, KLLSketch] = {}
+        for key, data in db.execute(select(PriceSketch.key, PriceSketch.sketch)):
+            try:
+                view[key] = KLLSketch.from_bytes(data)
+            except (ValueError, struct.error) as e:
+                log.warning("price sketch %s unreadable: %s", key, e)
+        with self._lock:
+            for key, sk in self._pending.items():
+                view.setdefault(key, KLLSketch(self.k)).merge(sk)
+            self._view = view
+            self._loaded_at = time.monotonic()
+        return len(view)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use and whenever the view is older than refresh_seconds.
+        """
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(db)
+
+
+_store: Optional[PriceSketchStore] = None
+_store_lock = threading.Lock()
+
+
+def market_settings() -> dict:
+    """
+    market:
+      enabled: true
+      sketch_k: 200            # KLL accuracy/size parameter
+      min_count: 20            # prices needed before a market is used
+      refresh_seconds: 300     # reload sketches written by other workers
+    """
+    return cfg.get("market", {}) or {}
+
+
+def get_price_sketches() -> PriceSketchStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            m = market_settings()
+            _store = PriceSketchStore(
+                k=int(m.get("sketch_k", 200)),
+                min_count=int(m.get("min_count", 20)),
+                refresh_seconds=float(m.get("refresh_seconds", 300)),
+            )
+        return _store
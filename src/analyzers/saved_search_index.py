@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+from .catalog_matcher import tokenize
+
+log = get_logger()
+
+
+@dataclass(frozen=True)
+class CompiledSearch:
+    id: int
+    tokens: FrozenSet[str]  # all must appear in the title
+    category: str  # "" = any category
+    min_price: float  # -inf when unbounded
+    max_price: float  # +inf when unbounded
+
+    @classmethod
+    def build(
+        cls,
+        search_id: int,
+        query: Optional[str],
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> "CompiledSearch":
+        return cls(
+            id=int(search_id),
+            tokens=frozenset(tokenize(query)),
+            category=(category or "").strip().lower(),
+            min_price=float(min_price) if min_price is not None else -math.inf,
+            max_price=float(max_price) if max_price is not None else math.inf,
+        )
+
+    @property
+    def price_bounded(self) -> bool:
+        return self.min_price > -math.inf or self.max_price < math.inf
+
+    def accepts(self, price: float, category: str) -> bool:
+        if self.category and self.category != category:
+            return False
+        if self.price_bounded and (math.isnan(price) or not self.min_price <= price <= self.max_price):
+            return False
+        return True
+
+
+class SavedSearchIndex:
+    """
+    Percolator for saved searches: the searches are indexed, listings are the queries.
+
+      - Each search with query tokens is posted under one anchor token, its
+        rarest token across all searches. A listing only looks at the postings
+        of its own title tokens, and every candidate is then checked for the
+        remaining tokens, category and price range.
+      - Searches without tokens are bucketed by category and sorted by
+        min_price, so a bisect drops the ones whose range starts above the price.
+    Matching cost depends on the candidates a title touches, not on the number
+    of saved searches.
+    """
+
+    def __init__(self) -> None:
+        self._searches: Dict[int, CompiledSearch] = {}
+        self._postings: Dict[str, List[CompiledSearch]] = {}
+        self._tokenless: Dict[str, Tuple[List[float], List[CompiledSearch]]] = {}
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._searches)
+
+    def rebuild(self, searches: Iterable[CompiledSearch]) -> None:
+        items = {s.id: s for s in searches}
+        df = Counter(tok for s in items.values() for tok in s.tokens)
+        postings: Dict[str, List[CompiledSearch]] = {}
+        tokenless: Dict[str, List[CompiledSearch]] = {}
+        for s in items.values():
+            if s.tokens:
+                anchor = min(s.tokens, key=lambda t: (df[t], t))
+                postings.setdefault(anchor, []).append(s)
+            else:
+                tokenless.setdefault(s.category, []).append(s)
+        buckets: Dict[str, Tuple[List[float], List[CompiledSearch]]] = {}
+        for cat, group in tokenless.items():
+            group.sort(key=lambda s: s.min_price)
+            buckets[cat] = ([s.min_price for s in group], group)
+        with self._lock:
+            self._searches, self._postings, self._tokenless = items, postings, buckets
+
+    def match(self, title: Optional[str], price: Optional[float], category: Optional[str] = None) -> List[int]:
+        """
+        Ids of the saved searches a listing satisfies.
+        """
+        tokens = set(tokenize(title))
+        try:
+            p = float(price) if price is not None else math.nan
+        except (TypeError, ValueError):
+            p = math.nan
+        cat = (category or "").strip().lower()
+        postings, tokenless = self._postings, self._tokenless
+
+        out: List[int] = []
+        for tok in tokens:
+            for s in postings.get(tok, ()):
+                if s.tokens <= tokens and s.accepts(p, cat):
+                    out.append(s.id)
+        for bucket in {"", cat}:
+            entry = tokenless.get(bucket)
+            if entry is None:
+                continue
+            mins, group = entry
+            # Unknown prices only satisfy unbounded searches (min_price = -inf)
+            stop = bisect_right(mins, p) if not math.isnan(p) else bisect_right(mins, -math.inf)
+            for s in group[:stop]:
+                if s.accepts(p, cat):
+                    out.append(s.id)
+        return out
+
+    def load(self, db: Session) -> int:
+        """
+        Rebuild from the active rows of saved_searches.
+        """
+        from ..models.saved_search import SavedSearch
+
+        rows = db.execute(
+            select(
+                SavedSearch.id,
+                SavedSearch.query,
+                SavedSearch.category,
+                SavedSearch.min_price,
+                SavedSearch.max_price,
+            ).where(SavedSearch.is_active.is_(True))
+        )
+        self.rebuild(CompiledSearch.build(*row) for row in rows)
+        self._loaded_at = time.monotonic()
+        return len(self._searches)
+
+    def ensure_loaded(self, db: Session, refresh_seconds: float = 60.0) -> None:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > refresh_seconds:
+            n = self.load(db)
+            log.debug("Saved search index loaded: searches=%d", n)
+
+
+_index: Optional[SavedSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def watchlist_settings() -> dict:
+    """
+    watchlists:
+      enabled: true
+      refresh_seconds: 60   # pick up saved searches created via the API
+    """
+    return cfg.get("watchlists", {}) or {}
+
+
+def get_saved_search_index() -> SavedSearchIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SavedSearchIndex()
+        return _index
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+import uuid
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..utils.logger import get_logger
+from .catalog_matcher import tokenize
+
+log = get_logger()
+
+_ROWS = "rows.bin"
+_SCALE = 127.0
+_META = "meta.json"
+_FORMAT = 2  # one file of (id, vector) records; 1 was separate vectors.i8/ids.i64
+
+
+class SimilarityIndex:
+    """
+    Approximate nearest-neighbour index over listing text.
+
+      - Embedding: hashed title words/bigrams (weight 2) and leading description
+        words (weight 1), projected onto `dim` dimensions with a fixed random ±1
+        matrix and L2-normalized, so cosine similarity is a dot product.
+      - Storage: one append-only file in `directory` of fixed-size records, a
+        listing id (int64) followed by its int8-quantized vector (components
+        scaled by 127), memory-mapped for reads. Appends hold an flock and write
+        each batch in one call, so an id never pairs with another row's vector.
+        Rows appended by other processes are picked up by refresh(); a rebuild
+        elsewhere writes a new generation to meta.json, and refresh() then
+        drops its maps and tables and re-reads the file.
+      - Lookup: `tables` LSH tables of `bits` random-hyperplane sign bits each.
+        Every table is a sorted code array, so a bucket is one searchsorted, and
+        a few neighbouring buckets are probed too (multi-probe LSH);
+        rows appended since the last merge sit in a small unsorted tail that is
+        scanned directly. Candidates are re-ranked by exact cosine; indexes
+        smaller than `exact_below` rows are simply scanned in full.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        dim: int = 128,
+        tables: int = 8,
+        bits: int = 12,
+        probes: int = 4,
+        features: int = 1 << 18,
+        desc_tokens: int = 60,
+        merge_tail: int = 50_000,
+        exact_below: int = 50_000,
+        seed: int = 13,
+    ) -> None:
+        if bits > 16:
+            raise ValueError("bits must be <= 16")
+        self.directory = Path(directory)
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        self.probes = min(probes, bits)
+        self.features = features
+        self.desc_tokens = desc_tokens
+        self.merge_tail = merge_tail
+        self.exact_below = exact_below
+        rng = np.random.default_rng(seed)
+        self._projection = rng.choice(np.array([-1, 1], dtype=np.int8), size=(features, dim))
+        self._planes = rng.standard_normal((dim, tables * bits)).astype(np.float32)
+        self._weights = (1 << np.arange(bits, dtype=np.uint32)).astype(np.uint32)
+        self._record = np.dtype([("id", "<i8"), ("vector", np.int8, (dim,))])
+
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray = np.zeros((0, dim), dtype=np.int8)
+        self._ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._id_order: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._sorted_ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._sorted_rows = 0  # rows [0, _sorted_rows) are in the sorted tables
+        self._sorted_codes: List[np.ndarray] = []
+        self._sorted_order: List[np.ndarray] = []
+        self._tail_codes: np.ndarray = np.zeros((0, tables), dtype=np.uint16)
+        self._file_rows = 0
+        self._generation: Optional[str] = None
+        self._meta_stamp: Optional[Tuple[int, int]] = None  # (inode, mtime_ns) of meta.json when last read
+
+    # Embedding
+
+    def _feature_weights(self, title: Optional[str], description: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        t = tokenize(title)
+        feats = t + [f"{a} {b}" for a, b in zip(t, t[1:])]
+        desc = ["d:" + w for w in tokenize(description)[: self.desc_tokens]]
+        names = feats + desc
+        if not names:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        idx = np.fromiter((zlib.crc32(n.encode("utf-8")) for n in names), dtype=np.int64, count=len(names))
+        w = np.concatenate([np.full(len(feats), 2.0, dtype=np.float32), np.ones(len(desc), dtype=np.float32)])
+        return idx % self.features, w
+
+    def embed(self, title: Optional[str], description: Optional[str]) -> np.ndarray:
+        idx, w = self._feature_weights(title, description)
+        if not idx.size:
+            return np.zeros(self.dim, dtype=np.float32)
+        vec = w @ self._projection[idx].astype(np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def _probe_codes(self, q: np.ndarray) -> np.ndarray:
+        """
+        Per table, the query's bucket plus the buckets reached by flipping each
+        of its `probes` least certain bits (multi-probe LSH), shape (tables, 1 + probes).
+        """
+        proj = (q @ self._planes).reshape(self.tables, self.bits)
+        base = ((proj > 0).astype(np.uint32) * self._weights).sum(axis=1)
+        flips = np.argsort(np.abs(proj), axis=1)[:, : self.probes]
+        codes = np.concatenate([base[:, None], base[:, None] ^ self._weights[flips]], axis=1)
+        return codes.astype(np.uint16)
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        bits = (vectors.astype(np.float32) @ self._planes) > 0
+        bits = bits.reshape(len(vectors), self.tables, self.bits)
+        return (bits.astype(np.uint32) * self._weights).sum(axis=2).astype(np.uint16)
+
+    # Storage
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _params(self) -> dict:
+        return {"format": _FORMAT, "dim": self.dim, "features": self.features, "desc_tokens": self.desc_tokens}
+
+    def _write_meta(self) -> None:
+        # A new generation per set of files tells readers in other processes to start over
+        meta = {**self._params(), "generation": uuid.uuid4().hex}
+        self._path(_META).write_text(json.dumps(meta), encoding="utf-8")
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            meta = json.loads(self._path(_META).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+
+    def _check_meta(self) -> bool:
+        meta = self._read_meta()
+        return meta is not None and {k: meta.get(k) for k in self._params()} == self._params()
+
+    def _reset(self) -> None:
+        """
+        Forget the mapped file and lookup tables (caller holds the lock).
+        """
+        self._vectors = np.zeros((0, self.dim), dtype=np.int8)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._id_order = np.zeros(0, dtype=np.int64)
+        self._sorted_ids = np.zeros(0, dtype=np.int64)
+        self._sorted_rows = 0
+        self._sorted_codes, self._sorted_order = [], []
+        self._tail_codes = np.zeros((0, self.tables), dtype=np.uint16)
+        self._file_rows = 0
+
+    def append(self, items: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> int:
+        """
+        Embed and append (listing_id, title, description) rows to the file.
+        Visible to readers after their next refresh().
+        """
+        rows = list(items)
+        if not rows:
+            return 0
+        records = np.empty(len(rows), dtype=self._record)
+        records["id"] = [r[0] for r in rows]
+        records["vector"] = np.rint(np.stack([self.embed(t, d) for _, t, d in rows]) * _SCALE).astype(np.int8)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not self._path(_META).exists():
+                self._write_meta()
+            with self._path(_ROWS).open("ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # Drop a partial record left by a writer that died mid-write
+                    size = os.fstat(f.fileno()).st_size
+                    if size % self._record.itemsize:
+                        f.truncate(size - size % self._record.itemsize)
+                    f.write(records.tobytes())
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return len(rows)
+
+    def refresh(self) -> int:
+        """
+        Map rows appended since the last call. Returns the number of new rows.
+        Starts over when the file was rebuilt (new generation in meta.json).
+        """
+        try:
+            st = os.stat(self._path(_META))
+            # Whole records only: a trailing partial one is still being written
+            n = os.path.getsize(self._path(_ROWS)) // self._record.itemsize
+            # Rebuilt while we looked: the size may belong to either file
+            if os.stat(self._path(_META)).st_mtime_ns != st.st_mtime_ns:
+                return 0
+        except OSError:
+            return 0
+        stamp = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if stamp != self._meta_stamp:
+                meta = self._read_meta() or {}
+                if meta.get("generation") != self._generation:
+                    if self._file_rows:
+                        log.info("Similarity index at %s was rebuilt; reloading", self.directory)
+                    self._reset()
+                    self._generation = meta.get("generation")
+                self._meta_stamp = stamp
+            if n <= self._file_rows:
+                return 0
+            if self._file_rows == 0 and not self._check_meta():
+                log.warning("Similarity index at %s was built with other parameters; rebuild it", self.directory)
+                return 0
+            # Plain ndarray view of the map: fancy indexing on np.memmap is much slower
+            records = np.memmap(self._path(_ROWS), dtype=self._record, mode="r", shape=(n,)).view(np.ndarray)
+            self._vectors, self._ids = records["vector"], records["id"]
+            added = n - self._file_rows
+            self._file_rows = n
+            if n - self._sorted_rows > self.merge_tail:
+                self._merge()
+            else:
+                self._tail_codes = self._codes_chunked(self._sorted_rows, n)
+            self._id_order = np.argsort(self._ids, kind="stable")
+            self._sorted_ids = np.asarray(self._ids[self._id_order])
+        return added
+
+    def _codes_chunked(self, start: int, stop: int, chunk: int = 100_000) -> np.ndarray:
+        parts = [self._codes(self._vectors[i : min(i + chunk, stop)]) for i in range(start, stop, chunk)]
+        return np.concatenate(parts) if parts else np.zeros((0, self.tables), dtype=np.uint16)
+
+    def _merge(self) -> None:
+        codes = self._codes_chunked(0, self._file_rows)
+        self._sorted_order = []
+        self._sorted_codes = []
+        for t in range(self.tables):
+            order = np.argsort(codes[:, t], kind="stable").astype(np.int32)
+            self._sorted_order.append(order)
+            self._sorted_codes.append(codes[order, t])
+        self._sorted_rows = self._file_rows
+        self._tail_codes = np.zeros((0, self.tables), dtype=np.uint16)
+
+    def rebuild_from_db(self, db: Session, chunk_size: int = 5000) -> int:
+        """
+        Rewrite the file from every listing, streamed in id order.
+        """
+        from ..models.listing import Listing
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name in (_ROWS, _META):
+            self._path(name).unlink(missing_ok=True)
+        with self._lock:
+            self._reset()
+            self._write_meta()
+        stmt = (
+            select(Listing.id, Listing.title, Listing.description)
+            .order_by(Listing.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        total = 0
+        for part in db.execute(stmt).partitions(chunk_size):
+            total += self.append(part)
+        self.refresh()
+        with self._lock:
+            self._merge()
+        log.info("Similarity index rebuilt: listings=%d", total)
+        return total
+
+    # Lookup
+
+    def row_of(self, listing_id: int) -> Optional[int]:
+        with self._lock:
+            sorted_ids, order = self._sorted_ids, self._id_order
+        # Rightmost match: the last appended row for an id wins (re-embedded listings)
+        pos = int(np.searchsorted(sorted_ids, listing_id, side="right")) - 1
+        if pos >= 0 and sorted_ids[pos] == listing_id:
+            return int(order[pos])
+        return None
+
+    def __len__(self) -> int:
+        return self._file_rows
+
+    def vector_of(self, listing_id: int) -> Optional[np.ndarray]:
+        row = self.row_of(listing_id)
+        return None if row is None else self._vectors[row].astype(np.float32) / _SCALE
+
+    def nearest(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        exclude: Optional[int] = None,
+        min_similarity: float = 0.0,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (listing_id, cosine) among LSH candidates of a query vector.
+        """
+        with self._lock:
+            vectors, ids = self._vectors, self._ids
+            sorted_codes, sorted_order = self._sorted_codes, self._sorted_order
+            sorted_rows, tail_codes = self._sorted_rows, self._tail_codes
+        if not len(ids) or not np.any(vector):
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        if len(ids) < self.exact_below:
+            return self._top_k(np.arange(len(ids)), vectors, ids, q, k, exclude, min_similarity)
+        probes = self._probe_codes(q)
+
+        parts: List[np.ndarray] = []
+        for t in range(len(sorted_codes)):
+            lo = np.searchsorted(sorted_codes[t], probes[t], side="left")
+            hi = np.searchsorted(sorted_codes[t], probes[t], side="right")
+            for a, b in zip(lo.tolist(), hi.tolist()):
+                if b > a:
+                    parts.append(sorted_order[t][a:b])
+        if len(tail_codes):
+            hit = np.zeros(len(tail_codes), dtype=bool)
+            for t in range(self.tables):
+                hit |= np.isin(tail_codes[:, t], probes[t])
+            parts.append(np.nonzero(hit)[0].astype(np.int32) + sorted_rows)
+        if not parts:
+            return []
+        return self._top_k(np.concatenate(parts), vectors, ids, q, k, exclude, min_similarity)
+
+    def _top_k(
+        self,
+        rows: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        q: np.ndarray,
+        k: int,
+        exclude: Optional[int],
+        min_similarity: float,
+    ) -> List[Tuple[int, float]]:
+        sims = vectors[rows].astype(np.float32) @ (q / _SCALE)
+        cand_ids = ids[rows]
+        if exclude is not None:
+            sims[cand_ids == exclude] = -np.inf
+        # A row found by several tables appears several times; over-select, then
+        # keep the best row per listing id
+        take = min(len(sims), k * (self.tables + 1))
+        top = np.argpartition(-sims, take - 1)[:take]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        out: List[Tuple[int, float]] = []
+        seen: set[int] = set()
+        for i in top.tolist():
+            lid = int(cand_ids[i])
+            if sims[i] < min_similarity:
+                break
+            if lid in seen:
+                continue
+            seen.add(lid)
+            out.append((lid, round(float(sims[i]), 4)))
+            if len(out) >= k:
+                break
+        return out
+
+
+_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+
+def similarity_settings() -> dict:
+    """
+    similarity:
+      enabled: true
+      directory: "data/similarity"
+      dim: 128          # projected dimensions (int8 on disk: 8 + 128 bytes/listing)
+      tables: 8         # LSH tables
+      bits: 12          # hyperplanes per table (4096 buckets)
+      probes: 4         # extra buckets probed per table (least certain bits flipped)
+      min_similarity: 0.2
+      merge_tail: 50000 # appended rows scanned linearly before re-sorting
+    """
+    return cfg.get("similarity", {}) or {}
+
+
+def _on_config(changed: set[str]) -> None:
+    # Reopen with the new parameters on next use (files built with another
+    # dim are refused until rebuilt)
+    global _index
+    with _index_lock:
+        _index = None
+
+
+cfg.subscribe(_on_config, ("similarity",))
+
+
+def get_similarity_index() -> SimilarityIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            s = similarity_settings()
+            _index = SimilarityIndex(
+                s.get("directory", "data/similarity"),
+                dim=int(s.get("dim", 128)),
+                tables=int(s.get("tables", 8)),
+                bits=int(s.get("bits", 12)),
+                probes=int(s.get("probes", 4)),
+                merge_tail=int(s.get("merge_tail", 50_000)),
+            )
+        _index.refresh()
+        return _index
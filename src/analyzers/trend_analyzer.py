@@ -1,22 +1,30 @@
 from __future__ import annotations
 
-from functools import lru_cache
 from typing import Optional
 
 from ..core.config import cfg
+from .trend_cache import TrendCache, get_trend_cache
 
 
 class TrendAnalyzer:
     """
     Minimal trend analyzer.
 
-    Placeholder that maps a keyword (optionally with location) to a score in [0, 1].
-    In the future, wire this to Google Trends or other signals. For now:
+    Maps a keyword (optionally with location) to a score in [0, 1]:
       - Uses static per-keyword overrides from config if present
-      - Otherwise returns a conservative baseline
+      - Otherwise the latest stored trend score via the shared TrendCache
+      - Otherwise (unknown keyword, or not loaded yet) a conservative baseline
     """
 
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[TrendCache] = None) -> None:
+        self.cache = cache or get_trend_cache()
+        self._load_config()
+        cfg.subscribe(self._on_config, ("trends",))
+
+    def _on_config(self, changed: set[str]) -> None:
+        self._load_config()
+
+    def _load_config(self) -> None:
         tr_cfg = cfg.get("trends", {}) or {}
         self.default_score: float = float(tr_cfg.get("default_score", 0.5))
         # Optional explicit overrides in config, e.g.:
@@ -28,13 +36,12 @@ class TrendAnalyzer:
             k.lower(): float(v) for k, v in (tr_cfg.get("overrides", {}) or {}).items()
         }
 
-    @lru_cache(maxsize=1024)
     def score_keyword(self, keyword: str, location: Optional[str] = None) -> float:
         key = (keyword or "").strip().lower()
         if not key:
             return 0.0
-        # In a real impl, location could adjust score; keep simple for now.
         if key in self.overrides:
             val = self.overrides[key]
             return max(0.0, min(1.0, val))
-        return max(0.0, min(1.0, self.default_score))
+        val = self.cache.get(key, location, self.default_score)
+        return max(0.0, min(1.0, val))
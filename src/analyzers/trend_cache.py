@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..core.config import cfg
+from ..core.redis_client import get_redis, redis_errors
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+TrendKey = Tuple[str, str]  # (keyword, location or "")
+
+
+@dataclass(frozen=True)
+class _Entry:
+    score: Optional[float]  # None: known to have no trend row (use default)
+    loaded_at: float  # time.monotonic()
+
+
+def _redis_key(key: TrendKey) -> str:
+    keyword, location = key
+    return f"sniper:trend:{location}:{keyword}"
+
+
+def load_latest_scores(keys: Iterable[TrendKey]) -> Dict[TrendKey, Optional[float]]:
+    """
+    Latest score per (keyword, location) from the trends table, one query.
+    A key without a location falls back to the keyword's latest row in any
+    location. Keys without a row map to None.
+    """
+    from ..core.database import session_scope
+    from ..models.trend import Trend
+
+    wanted = list(dict.fromkeys(keys))
+    out: Dict[TrendKey, Optional[float]] = {k: None for k in wanted}
+    if not wanted:
+        return out
+    keywords = {k for k, _ in wanted}
+    stmt = (
+        select(Trend.keyword, Trend.location, Trend.score)
+        .where(Trend.keyword.in_(keywords))
+        .order_by(Trend.keyword, Trend.timeframe_end.desc().nulls_last(), Trend.updated_at.desc())
+    )
+    with session_scope() as db:
+        for keyword, location, score in db.execute(stmt):
+            if score is None:
+                continue
+            for key in ((keyword, location or ""), (keyword, "")):
+                if key in out and out[key] is None:
+                    out[key] = float(score)
+    return out
+
+
+class TrendCache:
+    """
+    Two-tier trend score cache shared by every TrendAnalyzer in the process.
+      - L1: in-process LRU, entries older than local_ttl are refreshed
+      - L2: Redis, shared by all workers, expires after update_frequency_hours
+      - Source of truth: latest row in the trends table
+    get() never blocks: misses return the caller's default and stale entries
+    return their last value while a background thread refreshes them.
+    Use warm() in batch jobs to load known keywords up front.
+    """
+
+    def __init__(
+        self,
+        local_ttl: float = 300.0,
+        shared_ttl: float = 6 * 3600.0,
+        maxsize: int = 4096,
+        loader: Callable[[Iterable[TrendKey]], Dict[TrendKey, Optional[float]]] = load_latest_scores,
+        redis_client: Optional[Any] = None,
+        use_redis: bool = True,
+        failure_backoff: float = 60.0,
+    ) -> None:
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.maxsize = maxsize
+        self._loader = loader
+        self._redis = redis_client if redis_client is not None else (get_redis() if use_redis else None)
+        self._failure_backoff = failure_backoff
+        self._entries: "OrderedDict[TrendKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: set[TrendKey] = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="trend-refresh")
+        self._redis_down_until = 0.0
+        self._db_down_until = 0.0
+
+    @staticmethod
+    def key(keyword: str, location: Optional[str] = None) -> TrendKey:
+        return (keyword.strip().lower(), (location or "").strip())
+
+    def get(self, keyword: str, location: Optional[str], default: float) -> float:
+        key = self.key(keyword, location)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or time.monotonic() - entry.loaded_at > self.local_ttl:
+            self._schedule(key)
+        if entry is None or entry.score is None:
+            return default
+        return entry.score
+
+    def warm(self, keys: Iterable[TrendKey]) -> None:
+        """
+        Synchronously load keys missing from L1 (Redis first, then the DB).
+        """
+        with self._lock:
+            missing = [k for k in dict.fromkeys(keys) if k not in self._entries]
+        if missing:
+            self._refresh(missing)
+
+    def invalidate(self, keys: Optional[Iterable[TrendKey]] = None) -> None:
+        """
+        Drop L1 entries (all when keys is None) and their shared copies.
+        """
+        with self._lock:
+            targets = list(self._entries) if keys is None else list(keys)
+            for k in targets:
+                self._entries.pop(k, None)
+        if self._redis is not None and targets and keys is not None:
+            try:
+                self._redis.delete(*[_redis_key(k) for k in targets])
+            except redis_errors() as e:
+                log.debug("trend cache: redis delete failed: %s", e)
+
+    def publish(self, scores: Dict[TrendKey, Optional[float]]) -> None:
+        """
+        Write-through for fresh scores (e.g. from trends ingestion).
+        """
+        self._store(scores, write_shared=True)
+
+    def _schedule(self, key: TrendKey) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+        try:
+            self._executor.submit(self._refresh_one, key)
+        except RuntimeError:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def _refresh_one(self, key: TrendKey) -> None:
+        try:
+            self._refresh([key])
+        except Exception as e:
+            log.debug("trend cache: refresh failed for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def _refresh(self, keys: list[TrendKey]) -> None:
+        found: Dict[TrendKey, Optional[float]] = {}
+        now = time.monotonic()
+        if self._redis is not None and now >= self._redis_down_until:
+            try:
+                raw = self._redis.mget([_redis_key(k) for k in keys])
+                for k, val in zip(keys, raw):
+                    if val is not None:
+                        found[k] = json.loads(val)["score"]
+            except redis_errors() as e:
+                self._redis_down_until = now + self._failure_backoff
+                log.debug("trend cache: redis unavailable: %s", e)
+
+        remaining = [k for k in keys if k not in found]
+        loaded: Dict[TrendKey, Optional[float]] = {}
+        loader_ok = False
+        if remaining and now >= self._db_down_until:
+            try:
+                loaded = self._loader(remaining)
+                loader_ok = True
+            except Exception as e:
+                self._db_down_until = now + self._failure_backoff
+                log.debug("trend cache: trends lookup failed: %s", e)
+        # Only answers from the trends table are shared with other workers
+        if loader_ok:
+            for k in remaining:
+                loaded.setdefault(k, None)
+        self._store(found, write_shared=False)
+        self._store(loaded, write_shared=loader_ok)
+        if not loader_ok:
+            self._keep(remaining)
+
+    def _keep(self, keys: list[TrendKey]) -> None:
+        """
+        Unresolved keys (lookup failed or backing off): known scores are kept
+        until the next refresh, unknown ones are cached as "no data".
+        """
+        if not keys:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for k in keys:
+                entry = self._entries.pop(k, None)
+                self._entries[k] = _Entry(score=entry.score if entry else None, loaded_at=now)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, scores: Dict[TrendKey, Optional[float]], write_shared: bool) -> None:
+        if not scores:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for k, score in scores.items():
+                self._entries.pop(k, None)
+                self._entries[k] = _Entry(score=score, loaded_at=now)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        if write_shared and self._redis is not None and now >= self._redis_down_until:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for k, score in scores.items():
+                    pipe.set(_redis_key(k), json.dumps({"score": score}), ex=max(1, int(self.shared_ttl)))
+                pipe.execute()
+            except redis_errors() as e:
+                self._redis_down_until = now + self._failure_backoff
+                log.debug("trend cache: redis write failed: %s", e)
+
+
+_cache: Optional[TrendCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_trend_cache() -> TrendCache:
+    """
+    Process-wide cache configured from the trends section:
+      trends:
+        update_frequency_hours: 6   # shared (Redis) TTL
+        local_ttl_seconds: 300      # in-process TTL before a background refresh
+        cache_size: 4096
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TrendCache(**_cache_settings())
+            cfg.subscribe(_on_config, ("trends",))
+        return _cache
+
+
+def _cache_settings() -> Dict[str, Any]:
+    tr_cfg = cfg.get("trends", {}) or {}
+    return {
+        "local_ttl": float(tr_cfg.get("local_ttl_seconds", 300)),
+        "shared_ttl": float(tr_cfg.get("update_frequency_hours", 6)) * 3600.0,
+        "maxsize": int(tr_cfg.get("cache_size", 4096)),
+    }
+
+
+def _on_config(changed: set[str]) -> None:
+    # Cached scores come from the trends table, not the config: keep them and
+    # only apply the new TTLs/size
+    if _cache is not None:
+        for name, value in _cache_settings().items():
+            setattr(_cache, name, value)
@@ -0,0 +1,187 @@
+"""
+Bulk listing ingest (POST /listings/bulk).
+
+- The body is a JSON array (or {"items": [...]}) or NDJSON, one listing per
+  line; NDJSON lines are validated straight from bytes, one at a time
+- Items that fail validation are reported by index and never reach the DB
+- Valid items are upserted on (source, external_id) with one multi-row
+  INSERT ... ON CONFLICT DO UPDATE ... RETURNING per chunk (up to the
+  engine's insertmanyvalues page size), one transaction per chunk;
+  xmax = 0 in RETURNING tells created rows from updated ones
+- Updates follow the scraping worker's upsert: null fields keep the stored
+  value and last_seen_at is refreshed
+- If a chunk is rejected by the database its items are retried one by one,
+  so only the offending items are reported as errors
+- A key repeated within the request is written from its last occurrence;
+  earlier ones are reported as superseded, with that item's index and id
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..models.listing import Listing
+from ..utils.logger import get_logger
+from .schemas.listing_schema import ListingCreate
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+log = get_logger()
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+# Columns written from the payload; the rest are defaults or maintained elsewhere
+_COLUMNS = (
+    "source", "external_id", "title", "description", "price", "currency", "url", "location", "category",
+    "posted_at", "seller_contact", "is_active", "last_seen_at", "metadata",
+)
+_KEY = ("source", "external_id")
+
+Result = Dict[str, Any]  # index, status (created/updated/superseded/error), id, error, superseded_by
+
+
+def bulk_settings() -> dict:
+    """
+    api_bulk:
+      max_items: 10000   # larger requests get 413
+      chunk_size: 1000   # rows per transaction
+    """
+    return cfg.get("api_bulk", {}) or {}
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _error_text(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+
+
+def parse_items(raw: bytes, content_type: str, max_items: int) -> Tuple[List[Tuple[int, ListingCreate]], List[Result]]:
+    """
+    Valid (index, item) pairs and error results for the rest; 400 when the
+    body is not a JSON array/object or NDJSON, 413 above max_items.
+    """
+    valid: List[Tuple[int, ListingCreate]] = []
+    errors: List[Result] = []
+    if content_type.split(";")[0].strip().lower() in NDJSON_TYPES:
+        lines = [line for line in raw.splitlines() if line.strip()]
+        if len(lines) > max_items:
+            raise HTTPException(status_code=413, detail=f"at most {max_items} items per request")
+        for i, line in enumerate(lines):
+            try:
+                valid.append((i, ListingCreate.model_validate_json(line)))
+            except ValidationError as e:
+                errors.append({"index": i, "status": "error", "id": None, "error": _error_text(e)})
+        return valid, errors
+
+    try:
+        body = _loads(raw)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON") from e
+    items = body.get("items") if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of listings or NDJSON")
+    if len(items) > max_items:
+        raise HTTPException(status_code=413, detail=f"at most {max_items} items per request")
+    for i, item in enumerate(items):
+        try:
+            valid.append((i, ListingCreate.model_validate(item)))
+        except ValidationError as e:
+            errors.append({"index": i, "status": "error", "id": None, "error": _error_text(e)})
+    return valid, errors
+
+
+def _row(item: ListingCreate, now: datetime) -> Dict[str, Any]:
+    data = item.model_dump()
+    row = {c: data.get(c) for c in _COLUMNS}
+    row["last_seen_at"] = now
+    return row
+
+
+def _upsert_statement() -> Any:
+    # Core table: rows and excluded are keyed by column name ("metadata", mapped as Listing.meta)
+    t = Listing.__table__
+    stmt = insert(t)
+    updates = {c: func.coalesce(stmt.excluded[c], t.c[c]) for c in _COLUMNS if c not in _KEY}
+    updates["last_seen_at"] = stmt.excluded.last_seen_at
+    updates["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(constraint="uq_listing_source_external_id", set_=updates).returning(
+        t.c.id, t.c.source, t.c.external_id, literal_column("xmax = 0").label("created")
+    )
+
+
+# Built once per process. ON CONFLICT statements have no cache key, so it is
+# still compiled on every execute; executed with a list of rows, SQLAlchemy
+# renders it as one multi-row INSERT per insertmanyvalues page
+_UPSERT = _upsert_statement()
+
+
+def _upsert(db: Session, rows: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, str], Tuple[int, bool]]:
+    result = db.execute(_UPSERT, list(rows))
+    return {(r.source, r.external_id): (r.id, bool(r.created)) for r in result}
+
+
+def upsert_listings(
+    db: Session, items: Sequence[Tuple[int, ListingCreate]], chunk_size: int = 1000
+) -> List[Result]:
+    """
+    Upsert items chunk by chunk; one result per item. A key repeated within
+    the request is written once, from its last occurrence; the earlier ones
+    share its id.
+    """
+    now = datetime.now(timezone.utc)
+    last: Dict[Tuple[str, str], int] = {}
+    for i, item in items:
+        last[(item.source, item.external_id)] = i
+    results: List[Result] = []
+    unique: List[Tuple[int, Dict[str, Any]]] = []
+    superseded: List[Result] = []
+    for i, item in items:
+        key = (item.source, item.external_id)
+        if last[key] != i:
+            superseded.append(
+                {"index": i, "status": "superseded", "id": None, "error": None, "superseded_by": last[key]}
+            )
+        else:
+            unique.append((i, _row(item, now)))
+
+    for start in range(0, len(unique), max(1, chunk_size)):
+        chunk = unique[start : start + chunk_size]
+        try:
+            written = _upsert(db, [row for _, row in chunk])
+            db.commit()
+        except DBAPIError as e:
+            db.rollback()
+            log.debug("bulk ingest: chunk of %d rejected, retrying per item: %s", len(chunk), e.orig)
+            written = {}
+            for i, row in chunk:
+                try:
+                    written.update(_upsert(db, [row]))
+                    db.commit()
+                except DBAPIError as item_error:
+                    db.rollback()
+                    message = str(item_error.orig).strip().splitlines()[0]
+                    results.append({"index": i, "status": "error", "id": None, "error": message})
+        for i, row in chunk:
+            hit: Optional[Tuple[int, bool]] = written.get((row["source"], row["external_id"]))
+            if hit is not None:
+                results.append({"index": i, "status": "created" if hit[1] else "updated", "id": hit[0], "error": None})
+    ids = {r["index"]: r["id"] for r in results}
+    for r in superseded:
+        r["id"] = ids.get(r["superseded_by"])
+    results.extend(superseded)
+    results.sort(key=lambda r: r["index"])
+    return results
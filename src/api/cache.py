@@ -0,0 +1,328 @@
+"""
+Read-through cache for hot GET endpoints.
+
+- ResponseCacheMiddleware serves cached 200 responses for the routes in
+  CACHED_ROUTES without running the route (no DB session, no serialization)
+- Keys are the path, the normalized query string and the data versions of the
+  namespaces the route reads (see core.cache_versions); writes bump versions,
+  so old entries are never served and age out of the LRU
+- Tier 1 is an in-process LRU, tier 2 optionally Redis, shared by all API
+  processes; both expire after ttl_seconds as a backstop
+- The same routes and their /{id} detail routes carry a weak ETag built from
+  those versions; a matching If-None-Match gets 304 before the route runs.
+  Without shared (Redis) counters another process's writes are invisible, so
+  the ETag also rolls over every ttl_seconds
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.cache_versions import bump, shared, versions
+from ..core.config import cfg
+from ..core.redis_client import get_redis, redis_errors
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+# path -> namespaces whose writes change the response
+CACHED_ROUTES: Dict[str, Tuple[str, ...]] = {
+    "/listings/": ("listings",),
+    "/listings/search": ("listings",),
+    "/deals/": ("deals", "listings"),  # include=listing and listing filters
+    "/alerts/": ("alerts",),
+    "/config/": ("config",),
+}
+
+# /listings/123 etc. get ETags under their collection's namespaces
+_DETAIL_ROUTE = re.compile(r"^(/(?:listings|deals|alerts)/)\d+$")
+
+# Response headers kept with the body
+_KEPT_HEADERS = {b"content-type", b"x-next-cursor"}
+
+CachedResponse = Tuple[int, List[Tuple[bytes, bytes]], bytes]  # status, headers, body
+
+
+def match_route(path: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """
+    (route template, namespaces) for a covered GET path, else None.
+    """
+    namespaces = CACHED_ROUTES.get(path)
+    if namespaces is not None:
+        return path, namespaces
+    m = _DETAIL_ROUTE.match(path)
+    if m:
+        return m.group(1) + "{id}", CACHED_ROUTES[m.group(1)]
+    return None
+
+
+def normalize_query(query_string: bytes) -> str:
+    """
+    Query parameters sorted, blanks dropped: ?b=1&a=&a=2 -> a=2&b=1.
+    """
+    pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=False)
+    return urlencode(sorted(pairs))
+
+
+def _fingerprint(path: str, query_string: bytes, ver: Tuple[int, ...]) -> str:
+    return f"{path}?{normalize_query(query_string)}#{'.'.join(map(str, ver))}"
+
+
+def make_etag(path: str, query_string: bytes, ver: Tuple[int, ...], bucket_seconds: float = 0.0) -> str:
+    """
+    Weak validator for the response to path?query at data versions ver; with
+    bucket_seconds it also changes every bucket_seconds of wall time.
+    """
+    raw = _fingerprint(path, query_string, ver)
+    if bucket_seconds > 0:
+        raw += f"@{int(time.time() // bucket_seconds)}"
+    return 'W/"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Weak comparison of etag against an If-None-Match header value.
+    """
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 30.0,
+        max_body_bytes: int = 1 << 20,
+        redis_client: Optional[Any] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_body_bytes = max_body_bytes
+        self._redis = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+        self.stats_by_route: Dict[str, Dict[str, int]] = {}
+
+    def key(self, path: str, query_string: bytes, ver: Tuple[int, ...]) -> str:
+        raw = _fingerprint(path, query_string, ver)
+        return "sniper:http:" + hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _count(self, path: str, what: str) -> None:
+        with self._lock:
+            s = self.stats_by_route.setdefault(
+                path, {"hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "not_modified": 0}
+            )
+            s[what] += 1
+
+    def get(self, path: str, key: str) -> Optional[CachedResponse]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+        if entry is not None and entry[0] > now:
+            self._count(path, "hits")
+            return entry[1]
+        if self._redis is not None and now >= self._redis_down_until:
+            try:
+                raw = self._redis.get(key)
+            except redis_errors() as e:
+                self._redis_down_until = now + 30.0
+                log.debug("response cache: redis get failed: %s", e)
+                raw = None
+            if raw is not None:
+                cached = _decode(raw)
+                self._put_local(key, cached)
+                self._count(path, "shared_hits")
+                return cached
+        self._count(path, "misses")
+        return None
+
+    def set(self, path: str, key: str, cached: CachedResponse) -> None:
+        if len(cached[2]) > self.max_body_bytes:
+            return
+        self._put_local(key, cached)
+        self._count(path, "stores")
+        if self._redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                self._redis.set(key, _encode(cached), ex=max(1, int(self.ttl)))
+            except redis_errors() as e:
+                self._redis_down_until = time.monotonic() + 30.0
+                log.debug("response cache: redis set failed: %s", e)
+
+    def _put_local(self, key: str, cached: CachedResponse) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, cached)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {p: dict(s) for p, s in self.stats_by_route.items()}
+            entries = len(self._entries)
+        hits = sum(s["hits"] + s["shared_hits"] for s in routes.values())
+        misses = sum(s["misses"] for s in routes.values())
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "not_modified": sum(s.get("not_modified", 0) for s in routes.values()),
+            "routes": routes,
+        }
+
+
+def _encode(cached: CachedResponse) -> bytes:
+    status, headers, body = cached
+    head = json.dumps([status, [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers]]).encode("utf-8")
+    return len(head).to_bytes(4, "big") + head + body
+
+
+def _decode(raw: bytes) -> CachedResponse:
+    n = int.from_bytes(raw[:4], "big")
+    status, headers = json.loads(raw[4 : 4 + n])
+    return status, [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers], raw[4 + n :]
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware; adds X-Cache: HIT or MISS to the collection routes it
+    caches and an ETag to every route it covers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = match_route(scope.get("path", "")) if scope["type"] == "http" else None
+        if route is None or scope.get("method") != "GET":
+            await self.app(scope, receive, send)
+            return
+        s = api_cache_settings()
+        use_etag = bool(s.get("etag", True))
+        # Detail routes are cheap primary-key reads; only validate them
+        cache = get_response_cache() if route[0] in CACHED_ROUTES else None
+        if cache is None and not use_etag:
+            await self.app(scope, receive, send)
+            return
+
+        path, query = scope["path"], scope.get("query_string", b"")
+        ver = await run_in_threadpool(versions, route[1])
+        etag: Optional[bytes] = None
+        if use_etag:
+            bucket = 0.0 if shared() else float(s.get("ttl_seconds", 30))
+            etag = make_etag(path, query, ver, bucket).encode("latin-1")
+            if_none_match = _header(scope, b"if-none-match")
+            if if_none_match is not None and etag_matches(if_none_match, etag.decode("latin-1")):
+                if cache is not None:
+                    cache._count(route[0], "not_modified")
+                await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", etag)]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        key = cache.key(path, query, ver) if cache is not None else ""
+        if cache is not None:
+            hit = await run_in_threadpool(cache.get, route[0], key)
+            if hit is not None:
+                status, headers, body = hit
+                out_headers = headers + [(b"content-length", str(len(body)).encode()), (b"x-cache", b"HIT")]
+                if etag is not None:
+                    out_headers.append((b"etag", etag))
+                await send({"type": "http.response.start", "status": status, "headers": out_headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+                extra = [(b"x-cache", b"MISS")] if cache is not None else []
+                if etag is not None and message["status"] == 200:
+                    extra.append((b"etag", etag))
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            elif message["type"] == "http.response.body" and cache is not None and start.get("status") == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    headers = [(k, v) for k, v in start.get("headers", []) if k.lower() in _KEPT_HEADERS]
+                    await run_in_threadpool(cache.set, route[0], key, (200, headers, b"".join(chunks)))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers", []):
+        if k.lower() == name:
+            return v.decode("latin-1")
+    return None
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def api_cache_settings() -> dict:
+    """
+    api_cache:
+      enabled: true
+      maxsize: 1024              # responses kept per process
+      ttl_seconds: 30            # backstop expiry; writes invalidate through versions
+      max_body_bytes: 1048576    # larger responses are not cached
+      redis: true                # share cached responses between API processes
+      version_check_seconds: 1   # how stale another process's write may be seen
+      etag: true                 # weak ETags and 304s on list and detail routes
+    """
+    return cfg.get("api_cache", {}) or {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Process-wide response cache, or None when api_cache.enabled is false.
+    """
+    global _cache
+    s = api_cache_settings()
+    if not s.get("enabled", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                maxsize=int(s.get("maxsize", 1024)),
+                ttl=float(s.get("ttl_seconds", 30)),
+                max_body_bytes=int(s.get("max_body_bytes", 1 << 20)),
+                redis_client=get_redis() if s.get("redis", True) else None,
+            )
+            # GET /config serves the live config; any reload changes it
+            cfg.subscribe(_on_config)
+        return _cache
+
+
+def _on_config(changed: set[str]) -> None:
+    bump("config")
+    if "api_cache" in changed and _cache is not None:
+        s = api_cache_settings()
+        _cache.maxsize = int(s.get("maxsize", 1024))
+        _cache.ttl = float(s.get("ttl_seconds", 30))
+        _cache.max_body_bytes = int(s.get("max_body_bytes", 1 << 20))
@@ -0,0 +1,157 @@
+"""
+Response compression.
+
+- gzip, or brotli when the brotli module is installed and the client prefers
+  it, for complete responses of at least minimum_size bytes
+- Streamed responses (exports, /deals/stream) pass through untouched: their
+  first body message says more_body, and buffering them would defeat the
+  streaming; text/event-stream is never compressed
+- Applied after the response cache, so cached bodies stay uncompressed and
+  one entry serves every Accept-Encoding
+"""
+from __future__ import annotations
+
+import gzip
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import cfg
+
+try:
+    import brotli
+except Exception:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+_COMPRESSIBLE = (b"application/json", b"text/", b"application/x-ndjson", b"application/javascript")
+
+# Bodies above this are compressed off the event loop
+_THREADPOOL_BYTES = 64 * 1024
+
+
+def compression_settings() -> dict:
+    """
+    api_compression:
+      enabled: true
+      minimum_size: 1024   # smaller bodies are sent as is
+      gzip_level: 6
+      brotli_quality: 4    # used only when the brotli package is installed
+    """
+    return cfg.get("api_compression", {}) or {}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    "br" or "gzip" from an Accept-Encoding header, preferring br when both
+    are acceptable and brotli is available; None when neither is.
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0.0) > 0:
+        return "br"
+    if accepted.get("gzip", 0.0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, settings: dict) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=int(settings.get("brotli_quality", 4)))
+    return gzip.compress(body, compresslevel=int(settings.get("gzip_level", 6)), mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware; compresses complete compressible responses per
+    api_compression.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        s = compression_settings()
+        accept = next((v for k, v in scope.get("headers", []) if k.lower() == b"accept-encoding"), b"")
+        encoding = choose_encoding(accept.decode("latin-1")) if s.get("enabled", True) else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        minimum_size = int(s.get("minimum_size", 1024))
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def wrapped(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not _compressible(message.get("headers", []))
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough or start is None:
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            headers = list(start.get("headers", []))
+            if message.get("more_body", False) or len(body) < minimum_size:
+                # Streaming, or too small to be worth it
+                passthrough = True
+                if not message.get("more_body", False):
+                    headers = _with_vary(headers)
+                await send({**start, "headers": headers})
+                await send(message)
+                return
+
+            if len(body) > _THREADPOOL_BYTES:
+                body = await run_in_threadpool(compress, body, encoding, s)
+            else:
+                body = compress(body, encoding, s)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+            await send({**start, "headers": _with_vary(headers)})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped)
+
+
+def _compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    content_type = b""
+    for k, v in headers:
+        k = k.lower()
+        if k == b"content-encoding":
+            return False
+        if k == b"content-type":
+            content_type = v.lower()
+    if content_type.startswith(b"text/event-stream"):
+        return False
+    return content_type.startswith(_COMPRESSIBLE)
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    out: List[Tuple[bytes, bytes]] = []
+    found = False
+    for k, v in headers:
+        if k.lower() == b"vary":
+            found = True
+            if b"accept-encoding" not in v.lower():
+                v = v + b", Accept-Encoding"
+        out.append((k, v))
+    if not found:
+        out.append((b"vary", b"Accept-Encoding"))
+    return out
+
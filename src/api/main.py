@@ -9,13 +9,20 @@ try:
     from .routes import deals as deals_routes  # type: ignore
     from .routes import alerts as alerts_routes  # type: ignore
     from .routes import config as config_routes  # type: ignore
+    from .routes import metrics as metrics_routes  # type: ignore
+    from .routes import saved_searches as saved_searches_routes  # type: ignore
 except Exception:
     listings_routes = None  # type: ignore[assignment]
     deals_routes = None  # type: ignore[assignment]
     alerts_routes = None  # type: ignore[assignment]
     config_routes = None  # type: ignore[assignment]
+    metrics_routes = None  # type: ignore[assignment]
+    saved_searches_routes = None  # type: ignore[assignment]
 
 from ..core.config import cfg
+from ..core.database import dispose_async_engine
+from .cache import ResponseCacheMiddleware
+from .compression import CompressionMiddleware
 
 
 def create_app() -> FastAPI:
@@ -26,6 +33,22 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
     )
 
+    # Cached GET /listings, /deals, /alerts and /config (api_cache section)
+    app.add_middleware(ResponseCacheMiddleware)
+    # gzip/brotli for complete responses (api_compression section); outermost
+    app.add_middleware(CompressionMiddleware)
+
+    # Pick up config/config.yaml edits without a restart (app.config_reload_seconds, 0 = off)
+    @app.on_event("startup")
+    def watch_config() -> None:
+        interval = float(cfg.app().get("config_reload_seconds", 2) or 0)
+        if interval > 0:
+            cfg.start_watching(interval)
+
+    @app.on_event("shutdown")
+    async def close_async_pool() -> None:
+        await dispose_async_engine()
+
     # Healthcheck
     @app.get("/health", tags=["system"])
     def health() -> JSONResponse:
@@ -45,6 +68,10 @@ def create_app() -> FastAPI:
         app.include_router(alerts_routes.router, prefix="/alerts", tags=["alerts"])
     if config_routes and hasattr(config_routes, "router"):
         app.include_router(config_routes.router, prefix="/config", tags=["config"])
+    if metrics_routes and hasattr(metrics_routes, "router"):
+        app.include_router(metrics_routes.router, prefix="/metrics", tags=["metrics"])
+    if saved_searches_routes and hasattr(saved_searches_routes, "router"):
+        app.include_router(saved_searches_routes.router, prefix="/saved-searches", tags=["saved-searches"])
 
     return app
 
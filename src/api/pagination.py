@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = Tuple[Any, int]  # (sort key, id) of the last row of the previous page
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    raw = json.dumps([text, int(row_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, numeric: bool = False) -> Cursor:
+    """
+    Parse a cursor from encode_cursor() for a datetime (or numeric) sort key;
+    400 when it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        return (Decimal(value) if numeric else datetime.fromisoformat(value)), int(row_id)
+    except (ValueError, TypeError, InvalidOperation) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def paginate(
+    stmt: Select, model: Any, limit: int, offset: int = 0, cursor: Optional[str] = None, key: Any = None
+) -> Select:
+    """
+    Descending on (key, id), key defaulting to created_at. With a cursor,
+    continue after it with a row-value comparison the (…, key, id) indexes can
+    seek to, so every page costs the same; offset is only applied without a
+    cursor. A numeric key must be non-null in every row selected.
+    """
+    key = key if key is not None else model.created_at
+    stmt = stmt.order_by(key.desc(), model.id.desc()).limit(limit)
+    if cursor:
+        value, row_id = decode_cursor(cursor, numeric=not isinstance(key.type, DateTime))
+        return stmt.where(tuple_(key, model.id) < tuple_(value, row_id))
+    return stmt.offset(offset) if offset else stmt
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, key: str = "created_at") -> None:
+    """
+    Point X-Next-Cursor at the last row of a full page.
+    """
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, key), last.id)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional, Set, Type
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .pagination import NEXT_CURSOR_HEADER
+
+FieldsParam = Query(None, max_length=500, description="Comma-separated fields to return, e.g. id,score,status")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Set[str]]:
+    """
+    Requested top-level fields of schema, or None for all; 400 on unknown names.
+    """
+    if not fields:
+        return None
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+    return wanted or None
+
+
+def projected(
+    items: Iterable[Any], schema: Type[BaseModel], fields: Set[str], response: Optional[Response] = None
+) -> JSONResponse:
+    """
+    Serialize only `fields` of each item through schema. Returned directly, so
+    the X-Next-Cursor header set on `response` is carried over.
+    """
+    content = [schema.model_validate(item).model_dump(mode="json", include=fields) for item in items]
+    headers = {}
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return JSONResponse(content, headers=headers)
+
+
+def projected_one(item: Any, schema: Type[BaseModel], fields: Set[str]) -> JSONResponse:
+    return JSONResponse(schema.model_validate(item).model_dump(mode="json", include=fields))
@@ -2,30 +2,36 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ...core.database import get_db
+from ...core.cache_versions import bump
+from ...core.database import get_async_db, get_db
 from ...models.alert import Alert
+from ..pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[dict])
-def list_alerts(
-    db: Session = Depends(get_db),
+async def list_alerts(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, max_length=200, description="X-Next-Cursor of the previous page"),
     status_filter: str | None = Query(None, max_length=30),
     channel_filter: str | None = Query(None, max_length=30),
 ) -> list[dict]:
-    stmt = select(Alert).order_by(Alert.created_at.desc()).offset(offset).limit(limit)
+    stmt = paginate(select(Alert), Alert, limit, offset, cursor)
     if status_filter:
         stmt = stmt.where(Alert.status == status_filter)
     if channel_filter:
         stmt = stmt.where(Alert.channel == channel_filter)
-    rows = db.execute(stmt).scalars().all()
+    rows = (await db.execute(stmt)).scalars().all()
+    set_next_cursor(response, rows, limit)
     # Return plain dicts for now; schemas can be added later if needed
     return [  # type: ignore[return-value]
         {
@@ -35,7 +41,7 @@ def list_alerts(
             "status": r.status,
             "message": r.message,
             "sent_at": r.sent_at,
-            "metadata": r.metadata,
+            "metadata": r.meta,
             "created_at": r.created_at,
             "updated_at": r.updated_at,
         }
@@ -44,8 +50,8 @@ def list_alerts(
 
 
 @router.get("/{alert_id}", response_model=dict)
-def get_alert(alert_id: int, db: Session = Depends(get_db)) -> dict:
-    obj = db.get(Alert, alert_id)
+async def get_alert(alert_id: int, db: AsyncSession = Depends(get_async_db)) -> dict:
+    obj = await db.get(Alert, alert_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Alert not found")
     return {
@@ -55,17 +61,18 @@ def get_alert(alert_id: int, db: Session = Depends(get_db)) -> dict:
         "status": obj.status,
         "message": obj.message,
         "sent_at": obj.sent_at,
-        "metadata": obj.metadata,
+        "metadata": obj.meta,
         "created_at": obj.created_at,
         "updated_at": obj.updated_at,
     }
 
 
-@router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
 def delete_alert(alert_id: int, db: Session = Depends(get_db)) -> None:
     obj = db.get(Alert, alert_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Alert not found")
     db.delete(obj)
     db.commit()
+    bump("alerts")
     return None
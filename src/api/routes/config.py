@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from typing import Any, Dict
 
 from fastapi import APIRouter
@@ -26,12 +25,21 @@ def _sanitize_config(data: Dict[str, Any]) -> Dict[str, Any]:
             return [redact(x) for x in obj]
         return obj
 
-    data_copy = deepcopy(data)
-    return redact(data_copy)  # type: ignore[return-value]
+    # redact() rebuilds every dict and list, so the live config is never shared
+    return redact(data)  # type: ignore[return-value]
 
 
 @router.get("/", tags=["config"])
 def get_config() -> JSONResponse:
     data = cfg.data()
     sanitized = _sanitize_config(data)
-    return JSONResponse({"config": sanitized, "source_path": str(cfg.source_path)})
+    return JSONResponse({"config": sanitized, "source_path": str(cfg.source_path), "version": cfg.version})
+
+
+@router.post("/reload", tags=["config"])
+def reload_config() -> JSONResponse:
+    """
+    Re-read the config file now instead of waiting for the watcher.
+    """
+    changed = cfg.reload(force=True)
+    return JSONResponse({"version": cfg.version, "changed": sorted(changed)})
@@ -1,54 +1,210 @@
 from __future__ import annotations
 
-from typing import List
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from ...core.database import get_db
+from ...core.cache_versions import bump
+from ...core.database import get_async_db, get_db
+from ...core.events import (
+    DealEvent,
+    DealEventHub,
+    Subscription,
+    get_deal_event_hub,
+    notify_deal_change,
+    streaming_settings,
+)
 from ...models.deal import Deal
-from ..schemas.deal_schema import DealCreate, DealRead
+from ...models.listing import Listing
+from ..export import ExportFormat, export_columns, export_response
+from ..pagination import paginate, set_next_cursor
+from ..projection import FieldsParam, parse_fields, projected, projected_one
+from ..schemas.deal_schema import DealCreate, DealRead, DealWithListing
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[DealRead])
-def list_deals(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=List[Union[DealWithListing, DealRead]])
+async def list_deals(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, max_length=200, description="X-Next-Cursor of the previous page"),
     status_filter: str | None = Query(None, max_length=30),
-) -> list[Deal]:
-    stmt = select(Deal).order_by(Deal.created_at.desc()).offset(offset).limit(limit)
+    min_score: float | None = Query(None),
+    max_score: float | None = Query(None),
+    min_margin: float | None = Query(None, description="estimated_margin lower bound"),
+    max_margin: float | None = Query(None),
+    source: str | None = Query(None, max_length=50, description="Listing source"),
+    category: str | None = Query(None, max_length=100, description="Listing category"),
+    posted_after: datetime | None = Query(None, description="Listing posted_at lower bound"),
+    posted_before: datetime | None = Query(None),
+    sort: Literal["created", "score"] = Query("created", description="created (newest first) or score (highest first)"),
+    include: Literal["listing"] | None = Query(None, description="listing: embed each deal's listing"),
+    fields: str | None = FieldsParam,
+) -> list[DealRead]:
+    """
+    Filter deals server side. Listing filters (source, category, posted_*) join
+    the listing; sort=score skips unscored deals. Cursors from X-Next-Cursor
+    are only valid for the sort they were issued with.
+    """
+    schema = DealWithListing if include == "listing" else DealRead
+    only = parse_fields(fields, schema)
+    key = Deal.score if sort == "score" else None
+    stmt = paginate(select(Deal), Deal, limit, offset, cursor, key=key)
     if status_filter:
         stmt = stmt.where(Deal.status == status_filter)
-    rows = db.execute(stmt).scalars().all()
-    return rows
+    if sort == "score":
+        stmt = stmt.where(Deal.score.is_not(None))
+    if min_score is not None:
+        stmt = stmt.where(Deal.score >= min_score)
+    if max_score is not None:
+        stmt = stmt.where(Deal.score <= max_score)
+    if min_margin is not None:
+        stmt = stmt.where(Deal.estimated_margin >= min_margin)
+    if max_margin is not None:
+        stmt = stmt.where(Deal.estimated_margin <= max_margin)
+    if source or category or posted_after or posted_before:
+        stmt = stmt.join(Deal.listing)
+        if source:
+            stmt = stmt.where(Listing.source == source)
+        if category:
+            stmt = stmt.where(Listing.category == category)
+        if posted_after:
+            stmt = stmt.where(Listing.posted_at >= posted_after)
+        if posted_before:
+            stmt = stmt.where(Listing.posted_at < posted_before)
+    if include == "listing":
+        # All listings of the page in one SELECT ... WHERE id IN (...)
+        stmt = stmt.options(selectinload(Deal.listing))
+    rows = (await db.execute(stmt)).scalars().all()
+    set_next_cursor(response, rows, limit, key="score" if sort == "score" else "created_at")
+    if only:
+        return projected(rows, schema, only, response)  # type: ignore[return-value]
+    return [schema.model_validate(d) for d in rows]
 
 
 @router.post("/", response_model=DealRead, status_code=status.HTTP_201_CREATED)
 def create_deal(payload: DealCreate, db: Session = Depends(get_db)) -> Deal:
-    obj = Deal(**payload.model_dump(exclude_unset=True))
+    data = payload.model_dump(exclude_unset=True)
+    if "metadata" in data:
+        data["meta"] = data.pop("metadata")
+    obj = Deal(**data)
     db.add(obj)
+    db.flush()
+    notify_deal_change(db, obj, op="insert")
     db.commit()
+    bump("deals")
     db.refresh(obj)
     return obj
 
 
+def _sse(hub: DealEventHub, event: DealEvent) -> str:
+    return f"id: {hub.event_id(event)}\nevent: deal\ndata: {json.dumps(event.data, default=str)}\n\n"
+
+
+async def _deal_event_stream(
+    request: Request,
+    hub: DealEventHub,
+    sub: Subscription,
+    replay: Optional[List[DealEvent]],
+    status_filter: Optional[str],
+) -> AsyncIterator[str]:
+    heartbeat = float(streaming_settings().get("heartbeat_seconds", 15))
+    try:
+        if replay is None:
+            # Cannot resume from the client's id; it should refetch GET /deals
+            yield "event: reset\ndata: {}\n\n"
+            replay = []
+        for event in replay:
+            if status_filter is None or event.data.get("status") == status_filter:
+                yield _sse(hub, event)
+        while not await request.is_disconnected():
+            event = await sub.get(timeout=heartbeat)
+            if sub.overflowed:
+                # Too slow to keep up; client reconnects with Last-Event-ID
+                yield "event: reset\ndata: {}\n\n"
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if status_filter is None or event.data.get("status") == status_filter:
+                yield _sse(hub, event)
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/stream")
+async def stream_deals(
+    request: Request,
+    status_filter: str | None = Query("eligible", max_length=30),
+    last_event_id: str | None = Query(None, max_length=64),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of deal inserts/updates (eligible deals by default).
+    Resume with the Last-Event-ID header or ?last_event_id=; a 'reset' event means
+    the id is too old (or the server restarted) and the client should refetch.
+    """
+    hub = get_deal_event_hub()
+    sub, replay = hub.subscribe(last_event_id_header or last_event_id)
+    return StreamingResponse(
+        _deal_event_stream(request, hub, sub, replay, status_filter or None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+_EXPORT_COLUMNS = (
+    "id", "listing_id", "status", "score", "estimated_margin", "currency", "notes", "created_at", "updated_at",
+)
+
+
+@router.get("/export")
+def export_deals(
+    fmt: ExportFormat = Query("ndjson", alias="format"),
+    since: datetime | None = Query(None, description="Only deals created at or after this time"),
+    status_filter: str | None = Query(None, max_length=30),
+    min_score: float | None = Query(None),
+) -> StreamingResponse:
+    """
+    Every matching deal in id order, streamed as NDJSON or CSV.
+    """
+    t = Deal.__table__
+    stmt = select(*export_columns(t, _EXPORT_COLUMNS)).order_by(t.c.id)
+    if since is not None:
+        stmt = stmt.where(t.c.created_at >= since)
+    if status_filter:
+        stmt = stmt.where(t.c.status == status_filter)
+    if min_score is not None:
+        stmt = stmt.where(t.c.score >= min_score)
+    return export_response(stmt, fmt, "deals")
+
+
 @router.get("/{deal_id}", response_model=DealRead)
-def get_deal(deal_id: int, db: Session = Depends(get_db)) -> Deal:
-    obj = db.get(Deal, deal_id)
+async def get_deal(deal_id: int, db: AsyncSession = Depends(get_async_db), fields: str | None = FieldsParam) -> Deal:
+    only = parse_fields(fields, DealRead)
+    obj = await db.get(Deal, deal_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Deal not found")
+    if only:
+        return projected_one(obj, DealRead, only)  # type: ignore[return-value]
     return obj
 
 
-@router.delete("/{deal_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{deal_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
 def delete_deal(deal_id: int, db: Session = Depends(get_db)) -> None:
     obj = db.get(Deal, deal_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Deal not found")
     db.delete(obj)
     db.commit()
+    bump("deals", "alerts")
     return None
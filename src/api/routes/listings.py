@@ -1,56 +1,202 @@
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ...core.database import get_db
+from ...analyzers.similarity_index import get_similarity_index, similarity_settings
+from ...core.cache_versions import bump
+from ...core.database import get_async_db, get_db
 from ...models.listing import Listing
-from ..schemas.listing_schema import ListingCreate, ListingRead
+from ..bulk import bulk_settings, parse_items, upsert_listings
+from ..export import ExportFormat, export_columns, export_response
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor, paginate, set_next_cursor
+from ..projection import FieldsParam, parse_fields, projected, projected_one
+from ..search import search_statement
+from ..schemas.listing_schema import BulkResult, ListingCreate, ListingRead, ListingSearchHit, SimilarListing
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ListingRead])
-def list_listings(
-    db: Session = Depends(get_db),
+async def list_listings(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, max_length=200, description="X-Next-Cursor of the previous page"),
+    fields: str | None = FieldsParam,
 ) -> list[Listing]:
-    stmt = (
-        select(Listing)
-        .order_by(Listing.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    )
-    rows = db.execute(stmt).scalars().all()
+    only = parse_fields(fields, ListingRead)
+    stmt = paginate(select(Listing), Listing, limit, offset, cursor)
+    rows = (await db.execute(stmt)).scalars().all()
+    set_next_cursor(response, rows, limit)
+    if only:
+        return projected(rows, ListingRead, only, response)  # type: ignore[return-value]
     return rows
 
 
 @router.post("/", response_model=ListingRead, status_code=status.HTTP_201_CREATED)
 def create_listing(payload: ListingCreate, db: Session = Depends(get_db)) -> Listing:
-    obj = Listing(**payload.model_dump(exclude_unset=True))
+    data = payload.model_dump(exclude_unset=True)
+    if "metadata" in data:
+        data["meta"] = data.pop("metadata")
+    obj = Listing(**data)
     db.add(obj)
     db.commit()
+    bump("listings")
     db.refresh(obj)
     return obj
 
 
+async def _raw_body(request: Request) -> bytes:
+    return await request.body()
+
+
+@router.post("/bulk", response_model=BulkResult)
+def bulk_upsert_listings(
+    request: Request, raw: bytes = Depends(_raw_body), db: Session = Depends(get_db)
+) -> dict:
+    """
+    Create or update many listings from a JSON array or NDJSON
+    (Content-Type: application/x-ndjson), keyed on (source, external_id).
+    """
+    s = bulk_settings()
+    valid, results = parse_items(raw, request.headers.get("content-type", ""), int(s.get("max_items", 10000)))
+    if valid:
+        results = sorted(
+            results + upsert_listings(db, valid, int(s.get("chunk_size", 1000))), key=lambda r: r["index"]
+        )
+    counts = {"created": 0, "updated": 0, "superseded": 0, "error": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    if counts["created"] or counts["updated"]:
+        bump("listings")
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "superseded": counts["superseded"],
+        "errors": counts["error"],
+        "results": results,
+    }
+
+
+_EXPORT_COLUMNS = (
+    "id", "source", "external_id", "title", "description", "price", "currency", "url", "location", "category",
+    "posted_at", "is_active", "last_seen_at", "duplicate_of_id", "created_at", "updated_at",
+)
+
+
+@router.get("/export")
+def export_listings(
+    fmt: ExportFormat = Query("ndjson", alias="format"),
+    since: datetime | None = Query(None, description="Only listings created at or after this time"),
+    source: str | None = Query(None, max_length=50),
+    category: str | None = Query(None, max_length=100),
+    active_only: bool = Query(False),
+) -> StreamingResponse:
+    """
+    Every matching listing in id order, streamed as NDJSON or CSV.
+    """
+    t = Listing.__table__
+    stmt = select(*export_columns(t, _EXPORT_COLUMNS)).order_by(t.c.id)
+    if since is not None:
+        stmt = stmt.where(t.c.created_at >= since)
+    if source:
+        stmt = stmt.where(t.c.source == source)
+    if category:
+        stmt = stmt.where(t.c.category == category)
+    if active_only:
+        stmt = stmt.where(t.c.is_active.is_(True))
+    return export_response(stmt, fmt, "listings")
+
+
+@router.get("/search", response_model=List[ListingSearchHit])
+async def search_listings(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description='Web-search syntax: words, "phrases", -excluded, or'),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, max_length=200, description="X-Next-Cursor of the previous page"),
+    source: str | None = Query(None, max_length=50),
+    category: str | None = Query(None, max_length=100),
+    min_price: float | None = Query(None),
+    max_price: float | None = Query(None),
+    posted_after: datetime | None = Query(None),
+    active_only: bool = Query(False),
+) -> list[dict]:
+    """
+    Full-text search over title (weighted higher) and description, best match
+    first. Cursors from X-Next-Cursor are only valid for the same q.
+    """
+    stmt = search_statement(
+        q, limit, cursor, source=source, category=category, min_price=min_price, max_price=max_price,
+        posted_after=posted_after, active_only=active_only,
+    )
+    rows = (await db.execute(stmt)).all()
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].rank, rows[-1].Listing.id)
+    return [{"listing": row.Listing, "rank": row.rank} for row in rows]
+
+
 @router.get("/{listing_id}", response_model=ListingRead)
-def get_listing(listing_id: int, db: Session = Depends(get_db)) -> Listing:
-    obj = db.get(Listing, listing_id)
+async def get_listing(
+    listing_id: int, db: AsyncSession = Depends(get_async_db), fields: str | None = FieldsParam
+) -> Listing:
+    only = parse_fields(fields, ListingRead)
+    obj = await db.get(Listing, listing_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Listing not found")
+    if only:
+        return projected_one(obj, ListingRead, only)  # type: ignore[return-value]
     return obj
 
 
-@router.delete("/{listing_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.get("/{listing_id}/similar", response_model=List[SimilarListing])
+def similar_listings(
+    listing_id: int,
+    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=50),
+    days: Optional[int] = Query(None, ge=1, description="Only listings created in the last N days"),
+) -> list[dict]:
+    """
+    Listings with the most similar title/description, from the similarity index.
+    """
+    if not similarity_settings().get("enabled", True):
+        raise HTTPException(status_code=404, detail="Similarity index disabled")
+    index = get_similarity_index()
+    vector = index.vector_of(listing_id)
+    if vector is None:
+        # Not indexed yet (e.g. created via the API): embed on the fly
+        obj = db.get(Listing, listing_id)
+        if not obj:
+            raise HTTPException(status_code=404, detail="Listing not found")
+        vector = index.embed(obj.title, obj.description)
+
+    # Over-fetch so deleted or out-of-window listings don't leave the page short
+    min_similarity = float(similarity_settings().get("min_similarity", 0.2))
+    hits = index.nearest(vector, k=limit * 3, exclude=listing_id, min_similarity=min_similarity)
+    if not hits:
+        return []
+    stmt = select(Listing).where(Listing.id.in_([lid for lid, _ in hits]))
+    if days is not None:
+        stmt = stmt.where(Listing.created_at >= datetime.now(timezone.utc) - timedelta(days=days))
+    rows = {obj.id: obj for obj in db.execute(stmt).scalars()}
+    out = [{"listing": rows[lid], "similarity": sim} for lid, sim in hits if lid in rows]
+    return out[:limit]
+
+
+@router.delete("/{listing_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
 def delete_listing(listing_id: int, db: Session = Depends(get_db)) -> None:
     obj = db.get(Listing, listing_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Listing not found")
     db.delete(obj)
     db.commit()
+    bump("listings", "deals", "alerts")  # cascades
     return None
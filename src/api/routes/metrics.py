@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ...core.database import get_db, pool_stats
+from ...core.latency import BUCKETS, GROUP_BY, SEGMENTS, latency_rollups
+from ...evaluators.decision_cache import get_decision_cache
+from ..cache import get_response_cache
+
+router = APIRouter()
+
+
+@router.get("/latency", response_model=dict)
+def get_latency(
+    db: Session = Depends(get_db),
+    since_hours: float = Query(24.0, gt=0, le=24 * 90),
+    group_by: str = Query("source", max_length=50),
+    source: str | None = Query(None, max_length=50),
+    keyword: str | None = Query(None, max_length=200),
+) -> dict:
+    """
+    Time-to-snipe rollups: per-segment seconds (count, p50/p90/p99, cumulative
+    histogram buckets) for listings fetched in the last since_hours.
+    group_by is a comma-separated subset of source,keyword (empty for overall).
+    """
+    groups = [g.strip() for g in group_by.split(",") if g.strip()]
+    unknown = set(groups) - GROUP_BY
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"unsupported group_by: {', '.join(sorted(unknown))}")
+    since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+    return {
+        "since": since,
+        "group_by": groups,
+        "segments": [{"name": n, "from": list(a), "to": b} for n, a, b in SEGMENTS],
+        "buckets": list(BUCKETS),
+        "groups": latency_rollups(db, since=since, group_by=groups, source=source, keyword=keyword),
+    }
+
+
+@router.get("/decision-cache", response_model=dict)
+def get_decision_cache_stats() -> dict:
+    """
+    Analysis decision cache for this process: entries, hits/misses, hit ratio
+    and the estimated seconds of scoring and deal writes skipped.
+    """
+    cache = get_decision_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/api-cache", response_model=dict)
+def get_api_cache_stats() -> dict:
+    """
+    Response cache for this process: entries, hits (local and shared), misses
+    and hit ratio, overall and per route.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/db-pool", response_model=dict)
+def get_db_pool_stats() -> dict:
+    """
+    Connection pools of this process (sync psycopg2, async asyncpg): size,
+    checked out, overflow, checkout wait percentiles, timeouts, pre-ping
+    cost and compiled statement cache hit ratio.
+    """
+    return pool_stats()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...core.database import get_db
+from ...models.saved_search import SavedSearch
+from ..schemas.saved_search_schema import SavedSearchCreate, SavedSearchRead
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SavedSearchRead])
+def list_saved_searches(
+    db: Session = Depends(get_db),
+    owner: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+) -> list[SavedSearch]:
+    stmt = select(SavedSearch).order_by(SavedSearch.id).offset(offset).limit(limit)
+    if owner:
+        stmt = stmt.where(SavedSearch.owner == owner)
+    return db.execute(stmt).scalars().all()
+
+
+@router.post("/", response_model=SavedSearchRead, status_code=status.HTTP_201_CREATED)
+def create_saved_search(payload: SavedSearchCreate, db: Session = Depends(get_db)) -> SavedSearch:
+    if payload.min_price is not None and payload.max_price is not None and payload.min_price > payload.max_price:
+        raise HTTPException(status_code=422, detail="min_price must not exceed max_price")
+    obj = SavedSearch(**payload.model_dump(exclude_unset=True))
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
+@router.get("/{search_id}", response_model=SavedSearchRead)
+def get_saved_search(search_id: int, db: Session = Depends(get_db)) -> SavedSearch:
+    obj = db.get(SavedSearch, search_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return obj
+
+
+@router.delete("/{search_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+def delete_saved_search(search_id: int, db: Session = Depends(get_db)) -> None:
+    obj = db.get(SavedSearch, search_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    db.delete(obj)
+    db.commit()
+    return None
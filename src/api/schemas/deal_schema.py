@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
+
+from .listing_schema import ListingRead
 
 
 class DealBase(BaseModel):
@@ -23,6 +25,12 @@ class DealCreate(DealBase):
 class DealRead(DealBase):
     model_config = ConfigDict(from_attributes=True)
 
+    # Read from Deal.meta (the "metadata" column)
+    metadata: Optional[dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"))
     id: int
     created_at: datetime
     updated_at: datetime
+
+
+class DealWithListing(DealRead):
+    listing: ListingRead
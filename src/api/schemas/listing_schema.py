@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class ListingBase(BaseModel):
@@ -30,6 +30,35 @@ class ListingCreate(ListingBase):
 class ListingRead(ListingBase):
     model_config = ConfigDict(from_attributes=True)
 
+    # Read from Listing.meta (the "metadata" column)
+    metadata: Optional[dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"))
     id: int
+    duplicate_of_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "superseded", "error"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+    superseded_by: Optional[int] = None  # index of the later item with the same key
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    superseded: int
+    errors: int
+    results: List[BulkItemResult]
+
+
+class SimilarListing(BaseModel):
+    listing: ListingRead
+    similarity: float
+
+
+class ListingSearchHit(BaseModel):
+    listing: ListingRead
+    rank: float
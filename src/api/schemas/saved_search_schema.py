@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SavedSearchBase(BaseModel):
+    owner: str = Field(..., max_length=100)
+    name: Optional[str] = Field(None, max_length=200)
+    query: str = Field("", max_length=300)
+    category: Optional[str] = Field(None, max_length=100)
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+    is_active: bool = True
+
+
+class SavedSearchCreate(SavedSearchBase):
+    pass
+
+
+class SavedSearchRead(SavedSearchBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created_at: datetime
+    updated_at: datetime
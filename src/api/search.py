@@ -0,0 +1,53 @@
+"""
+Full-text search over listings.
+
+- listings.search_vector is a stored generated tsvector (title weighted A,
+  description B) that Postgres maintains on insert and update, indexed with
+  GIN; nothing in the ingest path computes it
+- Queries take web-search syntax (websearch_to_tsquery) in the same text
+  search config as the column, so the index applies
+- Matches are ranked with ts_rank_cd; pages continue from a (rank, id) cursor
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import REAL, Select, func, literal_column, select
+
+from ..models.listing import SEARCH_CONFIG, Listing
+from .pagination import paginate
+
+
+def search_statement(
+    q: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    posted_after: Optional[datetime] = None,
+    active_only: bool = False,
+) -> Select:
+    """
+    SELECT (Listing, rank) for one page of matches of q, best first.
+    """
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    query = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank_cd(Listing.search_vector, query, type_=REAL)
+    stmt = paginate(select(Listing, rank.label("rank")), Listing, limit, cursor=cursor, key=rank)
+    stmt = stmt.where(Listing.search_vector.bool_op("@@")(query))
+    if source:
+        stmt = stmt.where(Listing.source == source)
+    if category:
+        stmt = stmt.where(Listing.category == category)
+    if min_price is not None:
+        stmt = stmt.where(Listing.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Listing.price <= max_price)
+    if posted_after is not None:
+        stmt = stmt.where(Listing.posted_at >= posted_after)
+    if active_only:
+        stmt = stmt.where(Listing.is_active.is_(True))
+    return stmt
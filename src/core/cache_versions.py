@@ -0,0 +1,93 @@
+"""
+Data version counters for read caches.
+
+- One counter per namespace (listings, deals, alerts, config); writers call
+  bump() after committing, readers fold versions() into their cache keys
+- Counters live in Redis (INCR) so a worker's write invalidates API caches in
+  every process; without Redis they are per-process only
+- Readers reuse a Redis read for check_seconds, so another process's write is
+  seen within that long; bumps made in this process are seen immediately
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from .config import cfg
+from .redis_client import get_redis, redis_errors
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+NAMESPACES = ("listings", "deals", "alerts", "config")
+
+_local: Dict[str, int] = {}
+_remote: Dict[str, Tuple[int, float]] = {}  # namespace -> (value, read at monotonic)
+_lock = threading.Lock()
+_redis_down_until = 0.0
+
+
+def _redis_key(namespace: str) -> str:
+    return f"sniper:cache:version:{namespace}"
+
+
+def _check_seconds() -> float:
+    return float((cfg.get("api_cache", {}) or {}).get("version_check_seconds", 1.0))
+
+
+def bump(*namespaces: str) -> None:
+    """
+    Invalidate everything cached under these namespaces, in all processes.
+    """
+    global _redis_down_until
+    with _lock:
+        for ns in namespaces:
+            _local[ns] = _local.get(ns, 0) + 1
+            _remote.pop(ns, None)
+    client = get_redis()
+    if client is None or time.monotonic() < _redis_down_until:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for ns in namespaces:
+            pipe.incr(_redis_key(ns))
+        pipe.execute()
+    except redis_errors() as e:
+        _redis_down_until = time.monotonic() + 30.0
+        log.debug("cache versions: redis incr failed: %s", e)
+
+
+def shared() -> bool:
+    """
+    Whether versions() currently reflects writes made by other processes.
+    """
+    return get_redis() is not None and time.monotonic() >= _redis_down_until
+
+
+def versions(namespaces: Iterable[str]) -> Tuple[int, ...]:
+    """
+    Current (local, shared) version pairs flattened, one pair per namespace.
+    """
+    global _redis_down_until
+    wanted = list(namespaces)
+    now = time.monotonic()
+    ttl = _check_seconds()
+    with _lock:
+        stale = [ns for ns in wanted if ns not in _remote or now - _remote[ns][1] > ttl]
+    client = get_redis()
+    if stale and client is not None and now >= _redis_down_until:
+        try:
+            values = client.mget([_redis_key(ns) for ns in stale])
+            with _lock:
+                for ns, v in zip(stale, values):
+                    _remote[ns] = (int(v or 0), now)
+        except redis_errors() as e:
+            _redis_down_until = now + 30.0
+            log.debug("cache versions: redis read failed: %s", e)
+    with _lock:
+        out = []
+        for ns in wanted:
+            out.append(_local.get(ns, 0))
+            out.append(_remote.get(ns, (0, 0.0))[0])
+        return tuple(out)
@@ -4,15 +4,24 @@ Configuration loader for Local Sniper Agent.
 - Loads environment variables from .env (if present)
 - Loads YAML config from config/config.yaml (overrideable via SNIPER_CONFIG_PATH)
 - Provides simple accessors for nested sections
+- Hot-reloads the YAML file: reload() swaps the data atomically, bumps
+  `version` and notifies subscribers of the top-level sections that changed
 """
 from __future__ import annotations
 
 import os
+import threading
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Union
 
 import yaml
 
+from ..utils.logger import get_logger
+
+log = get_logger()
+
 try:
     # Optional: load .env if available
     from dotenv import load_dotenv
@@ -23,12 +32,74 @@ except Exception:
     pass
 
 
+ConfigCallback = Callable[[Set[str]], None]
+
+
+@dataclass
+class _Subscription:
+    ref: Union[weakref.WeakMethod, Callable[[], Optional[ConfigCallback]]]
+    sections: Optional[FrozenSet[str]]  # None = any section
+
+
+def _default_data() -> Dict[str, Any]:
+    # Safe default minimal configuration if the file isn't present yet.
+    return {
+        "app": {
+            "name": "Local Sniper Agent",
+            "version": "0.1.0",
+            "environment": "development",
+            "log_level": "INFO",
+        },
+        "database": {
+            "host": "localhost",
+            "port": 5432,
+            "name": "sniper_agent",
+            "user": "postgres",
+            "password": os.getenv("DB_PASSWORD", None),
+        },
+        "redis": {"host": "localhost", "port": 6379, "db": 0},
+        "location": {"zip_code": "00000", "radius_miles": 50},
+        "thresholds": {
+            "min_discount_percent": 20,
+            "min_margin_percent": 15,
+            "min_demand_score": 0.7,
+            "min_composite_score": 0.75,
+        },
+    }
+
+
+def _read(config_path: Path) -> Dict[str, Any]:
+    with config_path.open("r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{config_path}: top level must be a mapping")
+
+    # Environment overrides (simple example for DB password)
+    db = data.setdefault("database", {})
+    db.setdefault("password", os.getenv("DB_PASSWORD"))
+    return data
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
 class Config:
     _instance: Optional["Config"] = None
 
     def __init__(self, data: Dict[str, Any], source_path: Path) -> None:
         self._data = data
         self._source_path = source_path
+        self._version = 1
+        self._mtime = _mtime(source_path)
+        self._reload_lock = threading.Lock()
+        self._subscribers: List[_Subscription] = []
+        self._sub_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
 
     @classmethod
     def load(cls) -> "Config":
@@ -44,42 +115,103 @@ class Config:
         config_path = Path(config_path_str)
 
         if not config_path.exists():
-            # Provide a safe default minimal configuration if file isn't present yet.
-            default_data: Dict[str, Any] = {
-                "app": {
-                    "name": "Local Sniper Agent",
-                    "version": "0.1.0",
-                    "environment": "development",
-                    "log_level": "INFO",
-                },
-                "database": {
-                    "host": "localhost",
-                    "port": 5432,
-                    "name": "sniper_agent",
-                    "user": "postgres",
-                    "password": os.getenv("DB_PASSWORD", None),
-                },
-                "redis": {"host": "localhost", "port": 6379, "db": 0},
-                "location": {"zip_code": "00000", "radius_miles": 50},
-                "thresholds": {
-                    "min_discount_percent": 20,
-                    "min_margin_percent": 15,
-                    "min_demand_score": 0.7,
-                    "min_composite_score": 0.75,
-                },
-            }
-            cls._instance = cls(default_data, config_path)
+            cls._instance = cls(_default_data(), config_path)
             return cls._instance
 
-        with config_path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        cls._instance = cls(_read(config_path), config_path)
+        return cls._instance
 
-        # Environment overrides (simple example for DB password)
-        db = data.setdefault("database", {})
-        db.setdefault("password", os.getenv("DB_PASSWORD"))
+    # Hot reload
 
-        cls._instance = cls(data, config_path)
-        return cls._instance
+    @property
+    def version(self) -> int:
+        """
+        Monotonically increasing; bumped by every reload that changed something.
+        """
+        return self._version
+
+    def reload(self, force: bool = False) -> Set[str]:
+        """
+        Re-read the file if it changed since the last load (or force=True) and
+        swap the data in one assignment, so readers see either the old or the
+        new config, never a mix. An unreadable or invalid file keeps the
+        current config. Returns the top-level sections that changed.
+        """
+        with self._reload_lock:
+            mtime = _mtime(self._source_path)
+            if mtime is None or (not force and mtime == self._mtime):
+                return set()
+            try:
+                data = _read(self._source_path)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                log.warning("Config reload failed, keeping version %d: %s", self._version, e)
+                return set()
+            self._mtime = mtime
+            old = self._data
+            changed = {k for k in set(old) | set(data) if old.get(k) != data.get(k)}
+            if not changed:
+                return set()
+            self._data = data
+            self._version += 1
+            version = self._version
+        log.info("Config reloaded: version=%d, sections=%s", version, ",".join(sorted(changed)))
+        self._notify(changed)
+        return changed
+
+    def subscribe(self, callback: ConfigCallback, sections: Optional[Any] = None) -> ConfigCallback:
+        """
+        Call callback(changed_sections) after a reload that changed any of
+        `sections` (any section when None). Bound methods are held weakly, so
+        subscribing does not keep their object alive.
+        """
+        ref: Union[weakref.WeakMethod, Callable[[], Optional[ConfigCallback]]]
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            ref = weakref.WeakMethod(callback)  # type: ignore[arg-type]
+        else:
+            ref = lambda: callback  # noqa: E731
+        secs = frozenset([sections] if isinstance(sections, str) else sections) if sections is not None else None
+        with self._sub_lock:
+            # Drop collected subscribers here too; components built per request would pile up otherwise
+            self._subscribers = [s for s in self._subscribers if s.ref() is not None]
+            self._subscribers.append(_Subscription(ref=ref, sections=secs))
+        return callback
+
+    def _notify(self, changed: Set[str]) -> None:
+        with self._sub_lock:
+            live = [s for s in self._subscribers if s.ref() is not None]
+            self._subscribers = live
+        for sub in live:
+            if sub.sections is not None and not (sub.sections & changed):
+                continue
+            cb = sub.ref()
+            if cb is None:
+                continue
+            try:
+                cb(changed)
+            except Exception as e:
+                log.warning("Config subscriber %r failed: %s", cb, e)
+
+    def start_watching(self, interval_seconds: float = 2.0) -> None:
+        """
+        Poll the file's mtime from a daemon thread and reload on change.
+        Safe to call more than once.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def run() -> None:
+            while not self._stop_watching.wait(interval_seconds):
+                try:
+                    self.reload()
+                except Exception as e:
+                    log.warning("Config watcher error: %s", e)
+
+        self._watcher = threading.Thread(target=run, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
 
     @property
     def source_path(self) -> Path:
@@ -3,37 +3,90 @@ Database setup using SQLAlchemy 2.0 style.
 
 - Engine/session factory configured from Config
 - Dependency helpers for FastAPI
+- An asyncpg engine alongside the psycopg2 one, for async routes and the
+  async scraping path; its pool belongs to the event loop that first used
+  it, so short-lived loops (asyncio.run) dispose it when they finish
+- Pool sizing comes from the database section; both pools are instrumented
+  (see core.pool_metrics) and reported by pool_stats()
 """
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator, Optional
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from .config import cfg
+from .pool_metrics import PoolStats, instrument_engine, instrumented_pool_class
 
 _engine = None
 _SessionLocal: Optional[sessionmaker] = None
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+# Kept across engine rebuilds so counters cover the process lifetime
+_pool_stats: Dict[str, PoolStats] = {}
 
 
-def _build_db_url() -> str:
+def _build_db_url(driver: str = "psycopg2") -> str:
     db = cfg.database()
     user = db.get("user", "postgres")
     password = db.get("password", "")
     host = db.get("host", "localhost")
     port = db.get("port", 5432)
     name = db.get("name", "sniper_agent")
-    # psycopg2 driver
-    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{name}"
+    return f"postgresql+{driver}://{user}:{password}@{host}:{port}/{name}"
+
+
+def pool_settings() -> dict:
+    """
+    database:
+      pool_size: 5                        # psycopg2 pool (sync routes, workers)
+      max_overflow: 10                    # extra connections, closed again when returned
+      pool_timeout: 30                    # seconds to wait for a free connection
+      pool_recycle: 1800                  # replace connections older than this; -1 = never
+      pool_pre_ping: true                 # round trip on every checkout to catch dead connections
+      pgbouncer: false                    # behind PgBouncer in transaction mode: no app-side pool,
+                                          # no asyncpg prepared statements
+      query_cache_size: 500               # compiled statements cached per engine
+      prepared_statement_cache_size: 100  # asyncpg prepared statements per connection
+      async_pool_size: 10
+      async_max_overflow: 10
+    """
+    return cfg.database()
+
+
+def _engine_kwargs(stats: PoolStats, base_pool: Any, size_key: str, overflow_key: str) -> Dict[str, Any]:
+    db = pool_settings()
+    kwargs: Dict[str, Any] = {
+        "echo": False,
+        "pool_pre_ping": bool(db.get("pool_pre_ping", True)),
+        "query_cache_size": int(db.get("query_cache_size", 500)),
+    }
+    if db.get("pgbouncer", False):
+        # PgBouncer owns the pooling; a second pool in front of it only pins server connections
+        kwargs["poolclass"] = instrumented_pool_class(NullPool, stats)
+        return kwargs
+    kwargs.update(
+        poolclass=instrumented_pool_class(base_pool, stats),
+        pool_size=int(db.get(size_key, 5)),
+        max_overflow=int(db.get(overflow_key, 10)),
+        pool_timeout=float(db.get("pool_timeout", 30)),
+        pool_recycle=int(db.get("pool_recycle", 1800)),
+    )
+    return kwargs
 
 
 def get_engine():
     global _engine, _SessionLocal
     if _engine is None:
         url = _build_db_url()
-        _engine = create_engine(url, echo=False, pool_pre_ping=True, future=True)
+        stats = _pool_stats.setdefault("sync", PoolStats("sync"))
+        _engine = create_engine(url, future=True, **_engine_kwargs(stats, QueuePool, "pool_size", "max_overflow"))
+        instrument_engine(_engine, stats)
         _SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
     return _engine
 
@@ -69,3 +122,76 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        db = pool_settings()
+        stats = _pool_stats.setdefault("async", PoolStats("async"))
+        kwargs = _engine_kwargs(stats, AsyncAdaptedQueuePool, "async_pool_size", "async_max_overflow")
+        if db.get("pgbouncer", False):
+            # Transaction pooling hands each transaction any server connection,
+            # so statements prepared on one are missing on the next
+            kwargs["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            kwargs["connect_args"] = {
+                "prepared_statement_cache_size": int(db.get("prepared_statement_cache_size", 100)),
+            }
+        _async_engine = create_async_engine(_build_db_url("asyncpg"), **kwargs)
+        instrument_engine(_async_engine.sync_engine, stats)
+        _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    get_async_engine()
+    assert _AsyncSessionLocal is not None
+    return _AsyncSessionLocal
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async counterpart of session_scope().
+    """
+    session: AsyncSession = get_async_session_factory()()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def dispose_async_engine() -> None:
+    """
+    Close the asyncpg pool; the next get_async_engine() builds a new one on
+    the running loop.
+    """
+    global _async_engine, _AsyncSessionLocal
+    engine, _async_engine, _AsyncSessionLocal = _async_engine, None, None
+    if engine is not None:
+        await engine.dispose()
+
+
+# FastAPI dependency for async routes
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    db = get_async_session_factory()()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Pool and statement-cache metrics for each engine created in this process.
+    """
+    return {name: stats.snapshot() for name, stats in _pool_stats.items()}
@@ -0,0 +1,252 @@
+"""
+Real-time deal change events.
+
+- Deal writes call notify_deal_change() inside their transaction; Postgres only
+  delivers the NOTIFY to listeners once that transaction commits.
+- One background thread per process LISTENs on the channel and publishes into
+  a DealEventHub, which fans events out to per-subscriber bounded queues.
+- A ring buffer of recent events lets reconnecting clients resume from the last
+  event id they saw (SSE Last-Event-ID).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import select
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .config import cfg
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from ..models.deal import Deal
+
+log = get_logger()
+
+DEAL_EVENTS_CHANNEL = "deal_events"
+
+
+def streaming_settings() -> Dict[str, Any]:
+    """
+    streaming:
+      buffer_size: 1000       # events kept for Last-Event-ID replay
+      queue_size: 256         # per-subscriber backlog before it is reset
+      heartbeat_seconds: 15
+    """
+    return cfg.get("streaming", {}) or {}
+
+
+def deal_event_payload(deal: "Deal", op: str) -> Dict[str, Any]:
+    return {
+        "op": op,
+        "id": deal.id,
+        "listing_id": deal.listing_id,
+        "status": deal.status,
+        "score": float(deal.score) if deal.score is not None else None,
+        "estimated_margin": float(deal.estimated_margin) if deal.estimated_margin is not None else None,
+        "currency": deal.currency,
+    }
+
+
+def notify_deal_change(db: Session, deal: "Deal", op: str = "update") -> None:
+    """
+    Queue a NOTIFY for a deal write. The deal must be flushed (have an id).
+    Delivery happens on commit, so rolled-back writes are never streamed.
+    """
+    payload = json.dumps(deal_event_payload(deal, op), default=str)
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": DEAL_EVENTS_CHANNEL, "payload": payload},
+    )
+
+
+@dataclass(frozen=True)
+class DealEvent:
+    seq: int
+    data: Dict[str, Any]
+
+
+class Subscription:
+    """
+    A single stream consumer. Events are delivered on the subscriber's own loop.
+    If the consumer falls more than queue_size events behind it is marked as
+    overflowed instead of blocking the publisher; the stream then tells the
+    client to reconnect and resume from its last event id.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[DealEvent] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def _offer(self, event: DealEvent) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self._wakeup.set()
+
+    async def get(self, timeout: float) -> Optional[DealEvent]:
+        """
+        Return the next event, or None on timeout or overflow (check .overflowed).
+        """
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        getter = asyncio.ensure_future(self.queue.get())
+        waker = asyncio.ensure_future(self._wakeup.wait())
+        done, pending = await asyncio.wait({getter, waker}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for fut in pending:
+            fut.cancel()
+        if getter in done:
+            return getter.result()
+        return None
+
+
+class DealEventHub:
+    """
+    Thread-safe fan-out of deal events to many async subscribers.
+    Event ids are "<epoch>-<seq>"; the epoch changes on every process start so
+    ids from a previous process are recognized as unresumable.
+    """
+
+    def __init__(self, buffer_size: int = 1000, queue_size: int = 256) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffer: Deque[DealEvent] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def event_id(self, event: DealEvent) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return -1
+        return int(seq)
+
+    def publish(self, data: Dict[str, Any]) -> DealEvent:
+        with self._lock:
+            self._seq += 1
+            event = DealEvent(seq=self._seq, data=data)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # Subscriber loop already closed; it will be dropped on unsubscribe
+                pass
+        return event
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Tuple[Subscription, Optional[List[DealEvent]]]:
+        """
+        Register a subscriber on the running loop.
+        Returns (subscription, replay) where replay holds buffered events newer than
+        last_event_id, or None when that id can no longer be resumed from.
+        """
+        sub = Subscription(asyncio.get_running_loop(), self.queue_size)
+        after = self._parse_event_id(last_event_id)
+        with self._lock:
+            self._subscribers.add(sub)
+            replay: Optional[List[DealEvent]] = []
+            if after is not None:
+                oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+                if after < 0 or after > self._seq or after < oldest - 1:
+                    replay = None
+                else:
+                    replay = [e for e in self._buffer if e.seq > after]
+        return sub, replay
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # Postgres LISTEN loop
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen_forever, name="deal-events-listener", daemon=True)
+            self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _listen_forever(self) -> None:
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+                attempt = 0
+            except Exception as e:
+                attempt += 1
+                delay = min(30.0, 0.5 * (2 ** min(attempt, 6)))
+                log.warning("Deal event listener error (retry in %.1fs): %s", delay, e)
+                time.sleep(delay)
+
+    def _listen_once(self) -> None:
+        from .database import get_engine
+
+        # A dedicated connection, detached so it never returns to the pool
+        raw = get_engine().raw_connection()
+        conn = raw.driver_connection
+        raw.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {DEAL_EVENTS_CHANNEL}")
+            log.info("Deal event listener: listening on channel=%s", DEAL_EVENTS_CHANNEL)
+            while not self._stop.is_set():
+                if select.select([conn], [], [], 5.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    note = conn.notifies.pop(0)
+                    try:
+                        self.publish(json.loads(note.payload))
+                    except ValueError:
+                        log.warning("Deal event listener: bad payload %r", note.payload)
+        finally:
+            raw.close()
+
+
+_hub: Optional[DealEventHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_deal_event_hub() -> DealEventHub:
+    """
+    Process-wide hub; the LISTEN thread starts on first use.
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            s = streaming_settings()
+            _hub = DealEventHub(
+                buffer_size=int(s.get("buffer_size", 1000)),
+                queue_size=int(s.get("queue_size", 256)),
+            )
+        _hub.start()
+        return _hub
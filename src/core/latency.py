@@ -0,0 +1,176 @@
+"""
+Time-to-snipe instrumentation.
+
+- record_ingest(): upsert a listing's fetched/parsed/persisted timestamps
+- mark_stage(): stamp a later stage (analyzed, alert_created, alert_sent)
+- latency_rollups(): per source/keyword percentiles + cumulative histograms of
+  the time spent between consecutive stages
+
+Every stage keeps its first occurrence, so re-scrapes and re-analysis of the
+same listing do not hide how long it originally took to reach us.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, extract, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models.latency import ListingLatency
+
+STAGES: Tuple[str, ...] = (
+    "fetched",
+    "parsed",
+    "persisted",
+    "analyzed",
+    "alert_created",
+    "alert_sent",
+)
+
+# Stage segments reported by the rollups, plus end-to-end totals.
+# A segment starts at the latest of its start columns that is not after its end,
+# so "analyze" measures from persist (batch path) or from parse (fast path,
+# which evaluates before writing).
+SEGMENTS: Tuple[Tuple[str, Tuple[str, ...], str], ...] = (
+    ("detection", ("posted_at",), "fetched_at"),
+    ("parse", ("fetched_at",), "parsed_at"),
+    ("persist", ("parsed_at",), "persisted_at"),
+    ("analyze", ("parsed_at", "persisted_at"), "analyzed_at"),
+    ("alert_create", ("analyzed_at",), "alert_created_at"),
+    ("alert_send", ("alert_created_at",), "alert_sent_at"),
+    ("fetch_to_alert", ("fetched_at",), "alert_sent_at"),
+    ("time_to_snipe", ("posted_at",), "alert_sent_at"),
+)
+
+# Cumulative histogram bucket upper bounds, in seconds
+BUCKETS: Tuple[float, ...] = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600, 21600, 86400)
+
+GROUP_BY = {"source", "keyword"}
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_ingest(
+    db: Session,
+    listing_id: int,
+    source: str,
+    keyword: Optional[str] = None,
+    posted_at: Optional[datetime] = None,
+    stage_ts: Optional[Dict[str, Any]] = None,
+    persisted_at: Optional[datetime] = None,
+) -> None:
+    """
+    Upsert the ingest side of a listing's timeline.
+    stage_ts is the scraper's metadata.stage_ts dict (epoch seconds per stage).
+    """
+    ts = stage_ts or {}
+    values: Dict[str, Any] = {
+        "listing_id": listing_id,
+        "source": source,
+        "keyword": keyword[:200] if keyword else None,
+        "posted_at": _as_datetime(posted_at),
+        "persisted_at": persisted_at or datetime.now(timezone.utc),
+    }
+    for stage in STAGES:
+        if stage in ts and stage != "persisted":
+            values[f"{stage}_at"] = _as_datetime(ts[stage])
+    if "evaluated" in ts:
+        # The fast path evaluates before persisting
+        values.setdefault("analyzed_at", _as_datetime(ts["evaluated"]))
+
+    stmt = insert(ListingLatency).values(**values)
+    table = ListingLatency.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.listing_id],
+        set_={
+            k: func.coalesce(table.c[k], stmt.excluded[k])
+            for k in values
+            if k not in ("listing_id", "source")
+        },
+    )
+    db.execute(stmt)
+
+
+def mark_stage(db: Session, listing_id: int, stage: str, at: Optional[datetime] = None) -> None:
+    """
+    Stamp a later stage for a listing that already has a timeline row.
+    """
+    if stage not in STAGES:
+        raise ValueError(f"unknown stage {stage!r}")
+    col = ListingLatency.__table__.c[f"{stage}_at"]
+    db.execute(
+        update(ListingLatency)
+        .where(ListingLatency.listing_id == listing_id, col.is_(None))
+        .values({col: at or datetime.now(timezone.utc)})
+    )
+
+
+def latency_rollups(
+    db: Session,
+    since: Optional[datetime] = None,
+    group_by: Sequence[str] = ("source",),
+    source: Optional[str] = None,
+    keyword: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate stage latencies (seconds) per group in a single query.
+    Each segment reports count, p50/p90/p99 and cumulative bucket counts (le_<s>).
+    """
+    table = ListingLatency.__table__
+    groups = [table.c[g] for g in group_by if g in GROUP_BY]
+    since = since or (datetime.now(timezone.utc) - timedelta(hours=24))
+
+    cols: List[Any] = list(groups)
+    labels: List[Tuple[str, str, Optional[float]]] = []
+    for name, starts, end in SEGMENTS:
+        end_col = table.c[end]
+        if len(starts) == 1:
+            start_col = table.c[starts[0]]
+        else:
+            start_col = func.greatest(*[case((table.c[c] <= end_col, table.c[c])) for c in starts])
+        delta = extract("epoch", end_col - start_col)
+        cols.append(func.count(delta).label(f"{name}__count"))
+        labels.append((name, "count", None))
+        for q in (0.5, 0.9, 0.99):
+            key = f"p{int(q * 100)}"
+            cols.append(func.percentile_cont(q).within_group(delta).label(f"{name}__{key}"))
+            labels.append((name, key, None))
+        for edge in BUCKETS:
+            cols.append(func.sum(case((delta <= edge, 1), else_=0)).label(f"{name}__le_{edge:g}"))
+            labels.append((name, f"le_{edge:g}", edge))
+
+    stmt = select(*cols).where(table.c.fetched_at >= since)
+    if source:
+        stmt = stmt.where(table.c.source == source)
+    if keyword:
+        stmt = stmt.where(table.c.keyword == keyword)
+    if groups:
+        stmt = stmt.group_by(*groups).order_by(*groups)
+
+    out: List[Dict[str, Any]] = []
+    for row in db.execute(stmt).mappings():
+        entry: Dict[str, Any] = {g.name: row[g.name] for g in groups}
+        segments: Dict[str, Dict[str, Any]] = {}
+        for name, key, edge in labels:
+            seg = segments.setdefault(name, {"buckets": {}})
+            value = row[f"{name}__{key}"]
+            if edge is not None:
+                seg["buckets"][key] = int(value or 0)
+            elif key == "count":
+                seg["count"] = int(value or 0)
+            else:
+                seg[key] = float(value) if value is not None else None
+        entry["segments"] = segments
+        out.append(entry)
+    return out
@@ -0,0 +1,170 @@
+"""
+Connection pool instrumentation.
+
+- instrumented_pool_class() derives a pool class that times every checkout,
+  including the wait for a free connection and pool timeouts; the class
+  carries its PoolStats, so pools recreated by engine.dispose() keep them
+- Pool events count connects, checkouts, checkins and invalidations, and the
+  dialect's ping is wrapped to time pre-ping
+- Every execution is counted by compiled-statement cache outcome, the
+  client-side half of statement caching (asyncpg additionally keeps
+  prepared statements per connection)
+- PoolStats.snapshot() merges these with the pool's own gauges
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+# Recent checkout waits kept for percentiles
+_WAIT_SAMPLES = 2048
+
+
+class PoolStats:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.counts: Dict[str, int] = {
+            "connects": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "invalidations": 0,
+            "timeouts": 0,
+            "pings": 0,
+            "ping_failures": 0,
+            "statements_cached": 0,
+            "statements_compiled": 0,
+            "statements_uncacheable": 0,
+        }
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.ping_seconds_total = 0.0
+
+    def incr(self, what: str) -> None:
+        with self._lock:
+            self.counts[what] += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.counts["timeouts"] += 1
+
+    def record_ping(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.counts["pings"] += 1
+            self.ping_seconds_total += seconds
+            if not ok:
+                self.counts["ping_failures"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+            waits = sorted(self._waits)
+            wait_total = self.wait_seconds_total
+            wait_max = self.wait_seconds_max
+            ping_total = self.ping_seconds_total
+
+        def pct(p: float) -> float:
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000.0 if waits else 0.0
+
+        pool = self.pool
+        gauges: Dict[str, Any] = {"name": self.name, "pool_class": type(pool).__name__ if pool is not None else None}
+        for gauge in ("size", "checkedout", "checkedin", "overflow"):
+            fn = getattr(pool, gauge, None)
+            gauges[gauge] = fn() if callable(fn) else None
+        executed = counts["statements_cached"] + counts["statements_compiled"]
+        return {
+            **gauges,
+            **counts,
+            "wait_ms": {
+                "mean": wait_total / counts["checkouts"] * 1000.0 if counts["checkouts"] else 0.0,
+                "p50": pct(0.50),
+                "p99": pct(0.99),
+                "max": wait_max * 1000.0,
+            },
+            "ping_ms_mean": ping_total / counts["pings"] * 1000.0 if counts["pings"] else 0.0,
+            "ping_ms_total": ping_total * 1000.0,
+            "statement_cache_hit_ratio": counts["statements_cached"] / executed if executed else 0.0,
+        }
+
+
+def instrumented_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Subclass of base whose checkouts are timed into stats.
+    """
+
+    def _do_get(self: Pool) -> Any:
+        t0 = time.perf_counter()
+        try:
+            conn = base._do_get(self)  # type: ignore[attr-defined]
+        except PoolTimeoutError:
+            stats.record_wait(time.perf_counter() - t0, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - t0)
+        return conn
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "stats": stats})
+
+
+def instrument_engine(engine: Any, stats: PoolStats) -> None:
+    """
+    Attach pool, ping and statement-cache counters to a sync engine (for an
+    AsyncEngine, pass engine.sync_engine).
+    """
+    stats.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection: Any, record: Any) -> None:
+        stats.incr("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        stats.incr("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection: Any, record: Any) -> None:
+        stats.incr("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection: Any, record: Any, exception: Any) -> None:
+        stats.incr("invalidations")
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _executed(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        hit = getattr(context, "cache_hit", None)
+        if hit is CacheStats.CACHE_HIT:
+            stats.incr("statements_cached")
+        elif hit is CacheStats.CACHE_MISS:
+            stats.incr("statements_compiled")
+        else:
+            stats.incr("statements_uncacheable")
+
+    @event.listens_for(engine, "engine_disposed")
+    def _disposed(engine_: Any) -> None:
+        stats.pool = engine_.pool
+
+    dialect = engine.dialect
+    ping = dialect.do_ping
+
+    def timed_ping(dbapi_connection: Any) -> bool:
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            ok = ping(dbapi_connection)
+            return ok
+        finally:
+            stats.record_ping(time.perf_counter() - t0, ok)
+
+    dialect.do_ping = timed_ping
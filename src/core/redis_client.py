@@ -0,0 +1,52 @@
+"""
+Shared Redis client.
+
+- Built lazily from the `redis` config section
+- Returns None when Redis is disabled (redis.enabled: false) or the client
+  library is unavailable, so callers can treat Redis as an optional tier
+- Short socket timeouts: Redis is a cache here, never worth a long stall
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Optional
+
+from .config import cfg
+
+try:
+    import redis
+except Exception:  # pragma: no cover - optional at runtime
+    redis = None  # type: ignore[assignment]
+
+_client: Optional[Any] = None
+_lock = threading.Lock()
+
+
+def get_redis() -> Optional["redis.Redis"]:
+    global _client
+    if redis is None:
+        return None
+    r = cfg.redis()
+    if not r.get("enabled", True):
+        return None
+    with _lock:
+        if _client is None:
+            _client = redis.Redis(
+                host=r.get("host", "localhost"),
+                port=int(r.get("port", 6379)),
+                db=int(r.get("db", 0)),
+                password=r.get("password"),
+                socket_timeout=float(r.get("socket_timeout", 0.25)),
+                socket_connect_timeout=float(r.get("connect_timeout", 0.25)),
+                health_check_interval=30,
+            )
+        return _client
+
+
+def redis_errors() -> tuple[type[BaseException], ...]:
+    """
+    Exception types to catch around Redis calls (always includes OSError).
+    """
+    if redis is None:
+        return (OSError,)
+    return (redis.RedisError, OSError)
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..analyzers.comparables import comparables_settings
+from ..core.config import cfg
+from ..utils.logger import get_logger
+from .sniper_bot import SniperBot
+
+log = get_logger()
+
+HIST_BINS = 10  # composite score histogram of alerted listings, bins of 0.1
+
+
+@dataclass(frozen=True)
+class BacktestData:
+    """
+    Historical listings as columns, scored once with the current SniperBot
+    inputs. Everything a threshold/weight setting changes is derived from these.
+    """
+    listing_ids: np.ndarray
+    demand_score: np.ndarray
+    margin_percent: np.ndarray
+    discount_percent: np.ndarray  # NaN without market data
+    sold_fast: np.ndarray  # precision proxy (bool)
+
+    def __len__(self) -> int:
+        return int(self.listing_ids.shape[0])
+
+
+@dataclass(frozen=True)
+class BacktestGrid:
+    min_demand: Sequence[float]
+    min_margin: Sequence[float]
+    min_composite: Sequence[float]
+    min_discount: Sequence[float]
+    demand_weight: Sequence[float]  # composite margin weight is 1 - demand_weight
+
+    def __len__(self) -> int:
+        return (
+            len(self.min_demand)
+            * len(self.min_margin)
+            * len(self.min_composite)
+            * len(self.min_discount)
+            * len(self.demand_weight)
+        )
+
+
+@dataclass(frozen=True)
+class BacktestReport:
+    """
+    One row per setting; params columns are
+    (min_demand, min_margin, min_composite, min_discount, demand_weight).
+    """
+    params: np.ndarray  # (settings, 5)
+    alerts: np.ndarray
+    hits: np.ndarray  # alerts on listings that sold fast
+    mean_composite: np.ndarray
+    mean_margin: np.ndarray
+    mean_discount: np.ndarray  # over alerts with market data
+    composite_hist: np.ndarray  # (settings, HIST_BINS)
+    listings: int
+    sold_fast: int
+
+    PARAM_NAMES = ("min_demand", "min_margin", "min_composite", "min_discount", "demand_weight")
+
+    def __len__(self) -> int:
+        return int(self.alerts.shape[0])
+
+    @property
+    def precision(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.alerts > 0, self.hits / np.maximum(self.alerts, 1), np.nan)
+
+    @property
+    def recall(self) -> np.ndarray:
+        return self.hits / max(1, self.sold_fast)
+
+    def row(self, i: int) -> Dict[str, object]:
+        out: Dict[str, object] = {name: float(v) for name, v in zip(self.PARAM_NAMES, self.params[i])}
+        out.update(
+            alerts=int(self.alerts[i]),
+            alert_rate=float(self.alerts[i]) / max(1, self.listings),
+            precision=float(self.precision[i]),
+            recall=float(self.recall[i]),
+            mean_composite=float(self.mean_composite[i]),
+            mean_margin=float(self.mean_margin[i]),
+            mean_discount=float(self.mean_discount[i]),
+            composite_hist=self.composite_hist[i].astype(int).tolist(),
+        )
+        return out
+
+    def top(self, n: int = 20, min_alerts: int = 1, key: str = "precision") -> List[Dict[str, object]]:
+        """
+        Best settings by precision (or recall/alerts), among those with at least min_alerts alerts.
+        """
+        metric = {"precision": self.precision, "recall": self.recall, "alerts": self.alerts}[key]
+        ok = np.nonzero((self.alerts >= min_alerts) & ~np.isnan(metric))[0]
+        # Ties broken by more alerts
+        order = ok[np.lexsort((-self.alerts[ok], -metric[ok]))]
+        return [self.row(int(i)) for i in order[:n]]
+
+
+def backtest_settings() -> dict:
+    """
+    backtest:
+      window_days: 90          # listings created in the last N days
+      sold_within_hours: 72    # "sold fast": gone within this long of first being seen
+      gone_after_hours: 24     # not seen for this long before the last scrape = gone
+      grid:
+        min_demand: [0.5, 0.6, 0.7, 0.8]
+        min_margin: [5, 10, 15, 20, 25, 30]
+        min_composite: [0.5, 0.6, 0.7, 0.75, 0.8]
+        min_discount: [0, 10, 20, 30]
+        demand_weight: [0.4, 0.5, 0.6, 0.7]
+    """
+    return cfg.get("backtest", {}) or {}
+
+
+def default_grid(bot: Optional[SniperBot] = None) -> BacktestGrid:
+    """
+    Grid from backtest.grid, falling back to the current thresholds as single values.
+    """
+    g = backtest_settings().get("grid") or {}
+    bot = bot or SniperBot(market=None)
+    current = {
+        "min_demand": bot.min_demand_score,
+        "min_margin": bot.min_margin_percent,
+        "min_composite": bot.min_composite_score,
+        "min_discount": bot.min_discount_percent,
+        "demand_weight": bot.scorer.composite.w_demand,
+    }
+    values = {}
+    for name, cur in current.items():
+        raw = g.get(name)
+        values[name] = [float(x) for x in raw] if isinstance(raw, list) and raw else [cur]
+    return BacktestGrid(**values)
+
+
+def load_backtest_data(
+    db: Session,
+    bot: SniperBot,
+    window_days: Optional[float] = None,
+    sold_within_hours: Optional[float] = None,
+    gone_after_hours: Optional[float] = None,
+    chunk_size: int = 5000,
+) -> BacktestData:
+    """
+    Load canonical listings from the window as columns and score them through
+    SniperBot.evaluate_many, each at the time it was first seen.
+
+    Precision proxy: a listing "sold fast" when it is inactive or has not been
+    seen for gone_after_hours before the most recent scrape, and it was last seen
+    within sold_within_hours of being first seen.
+    Resale estimates, market discounts and trend scores come from the current
+    indexes, so they include information from after each listing was posted.
+    """
+    from ..models.listing import Listing
+
+    s = backtest_settings()
+    window = float(window_days if window_days is not None else s.get("window_days", 90))
+    sold_within = float(sold_within_hours if sold_within_hours is not None else s.get("sold_within_hours", 72))
+    gone_after = float(gone_after_hours if gone_after_hours is not None else s.get("gone_after_hours", 24))
+
+    stmt = (
+        select(
+            Listing.id,
+            Listing.title,
+            Listing.category,
+            Listing.price,
+            Listing.posted_at,
+            Listing.created_at,
+            Listing.last_seen_at,
+            Listing.is_active,
+            Listing.meta["keyword"].astext.label("keyword"),
+        )
+        .where(
+            Listing.duplicate_of_id.is_(None),
+            Listing.created_at >= datetime.now(timezone.utc) - timedelta(days=window),
+        )
+        .order_by(Listing.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    ids: List[int] = []
+    titles: List[Optional[str]] = []
+    categories: List[Optional[str]] = []
+    keywords: List[Optional[str]] = []
+    prices: List[float] = []
+    posted: List[float] = []
+    created: List[float] = []
+    last_seen: List[float] = []
+    active: List[bool] = []
+    for row in db.execute(stmt):
+        ids.append(row.id)
+        titles.append(row.title)
+        categories.append(row.category)
+        keywords.append(row.keyword)
+        prices.append(float(row.price) if row.price is not None else np.nan)
+        posted.append(row.posted_at.timestamp() if row.posted_at is not None else np.nan)
+        created.append(row.created_at.timestamp())
+        last_seen.append(row.last_seen_at.timestamp() if row.last_seen_at is not None else np.nan)
+        active.append(bool(row.is_active))
+
+    price = np.asarray(prices, dtype=np.float64)
+    first_seen = np.asarray(created, dtype=np.float64)
+    seen = np.asarray(last_seen, dtype=np.float64)
+    seen = np.where(np.isnan(seen), first_seen, seen)
+
+    if bot.scorer.comparables is not None:
+        bot.scorer.comparables.ensure_built(db, max_age_days=comparables_settings().get("max_age_days", 180))
+    if bot.market is not None:
+        bot.market.ensure_loaded(db)
+    decision = bot.evaluate_many(
+        prices=price,
+        posted_at=np.asarray(posted, dtype=np.float64),
+        trend_scores=bot.scorer.trend_scores(titles),
+        assumed_sell_prices=bot.scorer.expected_prices(titles, categories),
+        now=first_seen,
+        discount_percents=bot.market.discounts(prices, categories, keywords) if bot.market is not None else None,
+    )
+
+    latest = float(seen.max()) if len(seen) else 0.0
+    gone = ~np.asarray(active, dtype=bool) | (seen < latest - gone_after * 3600.0)
+    sold_fast = gone & (seen - first_seen <= sold_within * 3600.0)
+    log.info("Backtest data loaded: listings=%d, sold_fast=%d", len(ids), int(sold_fast.sum()))
+    return BacktestData(
+        listing_ids=np.asarray(ids, dtype=np.int64),
+        demand_score=decision.scores.demand_score,
+        margin_percent=decision.scores.margin.margin_percent,
+        discount_percent=decision.discount_percent,
+        sold_fast=sold_fast,
+    )
+
+
+def run_backtest(
+    data: BacktestData,
+    grid: BacktestGrid,
+    bot: Optional[SniperBot] = None,
+    max_cells: int = 1 << 23,
+) -> BacktestReport:
+    """
+    Replay every grid setting over the loaded listings.
+
+    Per demand weight, the alert masks of a block of settings form a
+    (settings, listings) matrix; one matrix product with the per-listing
+    metric columns (count, sold fast, composite, margin, discount, histogram
+    one-hots) yields all metrics for the block. Blocks hold at most max_cells
+    mask entries.
+    """
+    bot = bot or SniperBot(market=None)
+    n = len(data)
+    weights = np.asarray(grid.demand_weight, dtype=np.float64)
+    composites = bot.scorer.composite.sweep(data.demand_score, data.margin_percent, weights)
+
+    disc = data.discount_percent
+    has_disc = ~np.isnan(disc)
+    disc_filled = np.where(has_disc, disc, 0.0)
+    combos = np.asarray(
+        list(itertools.product(grid.min_demand, grid.min_margin, grid.min_composite, grid.min_discount)),
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    block = max(1, max_cells // max(1, n))
+
+    params: List[np.ndarray] = []
+    sums: List[np.ndarray] = []
+    for wi, w in enumerate(weights):
+        comp = composites[wi]
+        bins = np.minimum((comp * HIST_BINS).astype(np.int64), HIST_BINS - 1)
+        metrics = np.zeros((n, 6 + HIST_BINS), dtype=np.float32)
+        metrics[:, 0] = 1.0
+        metrics[:, 1] = data.sold_fast
+        metrics[:, 2] = comp
+        metrics[:, 3] = data.margin_percent
+        metrics[:, 4] = disc_filled
+        metrics[:, 5] = has_disc
+        metrics[np.arange(n), 6 + bins] = 1.0
+        for start in range(0, len(combos), block):
+            c = combos[start : start + block]
+            mask = (
+                (data.demand_score[None, :] >= c[:, 0:1])
+                & (data.margin_percent[None, :] >= c[:, 1:2])
+                & (comp[None, :] >= c[:, 2:3])
+                & (~has_disc[None, :] | (disc[None, :] >= c[:, 3:4]))
+            )
+            sums.append(mask.astype(np.float32) @ metrics)
+            params.append(np.column_stack([c, np.full(len(c), w)]))
+
+    if not sums:
+        empty = np.zeros(0)
+        return BacktestReport(
+            np.zeros((0, 5)), empty, empty, empty, empty, empty, np.zeros((0, HIST_BINS)), n, int(data.sold_fast.sum())
+        )
+    total = np.concatenate(sums).astype(np.float64)
+    alerts = np.rint(total[:, 0])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_composite = np.where(alerts > 0, total[:, 2] / alerts, np.nan)
+        mean_margin = np.where(alerts > 0, total[:, 3] / alerts, np.nan)
+        mean_discount = np.where(total[:, 5] > 0, total[:, 4] / total[:, 5], np.nan)
+    return BacktestReport(
+        params=np.concatenate(params),
+        alerts=alerts,
+        hits=np.rint(total[:, 1]),
+        mean_composite=mean_composite,
+        mean_margin=mean_margin,
+        mean_discount=mean_discount,
+        composite_hist=np.rint(total[:, 6:]),
+        listings=n,
+        sold_fast=int(data.sold_fast.sum()),
+    )
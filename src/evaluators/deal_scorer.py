@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from datetime import datetime
+from typing import Iterable, Optional, TYPE_CHECKING, Union
+
+import numpy as np
 
 from ..analyzers.demand_analyzer import DemandAnalyzer
 from ..analyzers.trend_analyzer import TrendAnalyzer
 from ..analyzers.composite_scorer import CompositeScorer, CompositeScoreResult
-from .margin_calculator import calculate_margin, MarginResult
+from ..analyzers.catalog_matcher import get_catalog_matcher
+from ..analyzers.comparables import ComparablesIndex, comparables_settings, get_comparables_index
+from .margin_calculator import calculate_margin, calculate_margin_batch, MarginBatch, MarginResult
 from ..core.config import cfg
 
 if TYPE_CHECKING:
@@ -20,25 +25,61 @@ class DealScoreOutput:
     composite: CompositeScoreResult
 
 
+@dataclass(frozen=True)
+class BatchScoreOutput:
+    """
+    Columnar DealScoreOutput for score_batch(); row(i) rebuilds the scalar form.
+    """
+    demand_score: np.ndarray
+    margin: MarginBatch
+    composite_score: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.demand_score.shape[0])
+
+    def row(self, i: int) -> DealScoreOutput:
+        margin = self.margin.row(i)
+        return DealScoreOutput(
+            demand_score=float(self.demand_score[i]),
+            margin=margin,
+            composite=CompositeScoreResult(
+                demand_score=float(self.demand_score[i]),
+                margin_percent=margin.margin_percent,
+                composite_score=float(self.composite_score[i]),
+            ),
+        )
+
+
 class DealScorer:
     """
     Orchestrates demand, margin, and composite scoring for a listing.
     Assumptions:
-      - assumed_sell_price: expected resale price (defaults to listing.price if provided)
+      - assumed_sell_price: expected resale price (defaults to the comparables median
+        for similar listings, else listing.price)
       - fees_percent: marketplace/payment fees from config.thresholds.fees_percent (default 10%)
       - shipping_cost: from config.thresholds.shipping_cost (default 0)
-      - trend: Uses TrendAnalyzer to compute a keyword-based score (optional, default baseline)
+      - trend: Uses TrendAnalyzer to compute a keyword-based score (optional, default baseline);
+        the keyword is the title's canonical catalog key (see CatalogMatcher)
     """
 
-    def __init__(self) -> None:
+    def __init__(self, comparables: Optional[ComparablesIndex] = None) -> None:
         self.demand_analyzer = DemandAnalyzer()
         self.trend_analyzer = TrendAnalyzer()
         self.composite = CompositeScorer()
+        if comparables is None and comparables_settings().get("enabled", True):
+            comparables = get_comparables_index()
+        self.comparables = comparables
+        self._load_config()
+        cfg.subscribe(self._on_config, ("thresholds",))
 
+    def _load_config(self) -> None:
         t = cfg.thresholds() or {}
         self.default_fees_percent: float = float(t.get("fees_percent", 10.0))
         self.default_shipping_cost: float = float(t.get("shipping_cost", 0.0))
 
+    def _on_config(self, changed: set[str]) -> None:
+        self._load_config()
+
     def score_listing(
         self,
         listing: "Listing",
@@ -47,16 +88,21 @@ class DealScorer:
         shipping_cost: Optional[float] = None,
         trend_keyword: Optional[str] = None,
         trend_location: Optional[str] = None,
+        now: Optional[datetime] = None,
     ) -> DealScoreOutput:
         # Determine trend score (optional); fall back to default baseline in TrendAnalyzer
-        keyword = trend_keyword or (listing.title or "")[:50]
+        keyword = trend_keyword or self.trend_keyword(listing.title)
         trend_score = self.trend_analyzer.score_keyword(keyword, trend_location)
 
         # Demand score
-        demand = self.demand_analyzer.score_listing(listing, trend_score)
+        demand = self.demand_analyzer.score_listing(listing, trend_score, now=now)
 
         # Margin
-        sell_price = assumed_sell_price if assumed_sell_price is not None else listing.price
+        sell_price = assumed_sell_price
+        if sell_price is None:
+            sell_price = self.expected_resale_price(listing)
+        if sell_price is None:
+            sell_price = listing.price
         fees = self._coalesce_float(fees_percent, self.default_fees_percent)
         ship = self._coalesce_float(shipping_cost, self.default_shipping_cost)
         margin = calculate_margin(
@@ -71,6 +117,81 @@ class DealScorer:
 
         return DealScoreOutput(demand_score=demand, margin=margin, composite=composite)
 
+    def expected_resale_price(self, listing: "Listing") -> Optional[float]:
+        """
+        Median price of comparable listings, or None without enough comparables.
+        """
+        if self.comparables is None:
+            return None
+        return self.comparables.expected_price(listing.title, listing.category)
+
+    def expected_prices(self, titles: Iterable[Optional[str]], categories: Iterable[Optional[str]]) -> np.ndarray:
+        """
+        assumed_sell_prices column for score_batch(); NaN where comparables are lacking.
+        """
+        if self.comparables is None:
+            return np.full(len(list(titles)), np.nan)
+        lookup = self.comparables.expected_price
+        return np.fromiter(
+            (np.nan if (p := lookup(t, c)) is None else p for t, c in zip(titles, categories)),
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def trend_keyword(title: Optional[str]) -> str:
+        """
+        Canonical catalog key for a title, falling back to its first 50 characters.
+        """
+        return get_catalog_matcher().best_key(title) or (title or "")[:50]
+
+    def trend_scores(self, titles: Iterable[Optional[str]], trend_location: Optional[str] = None) -> np.ndarray:
+        """
+        Trend column for score_batch(), keyed the same way as score_listing().
+        """
+        matcher = get_catalog_matcher()
+        return np.fromiter(
+            (
+                self.trend_analyzer.score_keyword(matcher.best_key(t) or (t or "")[:50], trend_location)
+                for t in titles
+            ),
+            dtype=np.float64,
+        )
+
+    def score_batch(
+        self,
+        prices: np.ndarray,
+        posted_at: np.ndarray,
+        trend_scores: Optional[np.ndarray] = None,
+        assumed_sell_prices: Optional[np.ndarray] = None,
+        fees_percent: Optional[float] = None,
+        shipping_cost: Optional[float] = None,
+        now: Optional[Union[float, np.ndarray]] = None,
+    ) -> BatchScoreOutput:
+        """
+        Vectorized score_listing() over columns in one pass.
+          - prices: listing prices (NaN = unknown), also the cost basis
+          - posted_at: epoch seconds (NaN = unknown)
+          - trend_scores: 0..1 per row (see trend_scores()); NaN/None = no trend signal
+          - assumed_sell_prices: per-row resale estimate; NaN falls back to the price
+          - now: epoch seconds used for recency, scalar or per row (defaults to current time)
+        """
+        price = np.asarray(prices, dtype=np.float64)
+        demand = self.demand_analyzer.score_batch(posted_at, trend_scores, now=now)
+
+        sell = price
+        if assumed_sell_prices is not None:
+            assumed = np.asarray(assumed_sell_prices, dtype=np.float64)
+            sell = np.where(np.isnan(assumed), price, assumed)
+        margin = calculate_margin_batch(
+            sell_price=sell,
+            cost_basis=price,
+            fees_percent=self._coalesce_float(fees_percent, self.default_fees_percent),
+            shipping_cost=self._coalesce_float(shipping_cost, self.default_shipping_cost),
+        )
+
+        composite = self.composite.score_batch(demand, margin.margin_percent)
+        return BatchScoreOutput(demand_score=demand, margin=margin, composite_score=composite)
+
     @staticmethod
     def _coalesce_float(val: Optional[float], fallback: float) -> float:
         try:
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+
+from ..analyzers.composite_scorer import CompositeScoreResult
+from ..core.config import cfg
+from .deal_scorer import DealScoreOutput
+from .margin_calculator import MarginResult
+from .sniper_bot import SniperDecision
+
+if TYPE_CHECKING:
+    from ..models.listing import Listing
+
+# should_alert, demand, 7 margin fields, composite, discount, percentile (NaN = None)
+_PACK = struct.Struct("<?11d")
+
+# Sections whose values feed SniperBot.evaluate (thresholds, trend defaults,
+# catalog keys, comparables and market settings)
+DECISION_SECTIONS = ("thresholds", "trends", "catalog", "comparables", "market")
+
+DealState = Tuple[Any, ...]  # deal columns as written, see analysis_worker._written_state
+
+
+def listing_fingerprint(
+    listing: "Listing", trend_score: Optional[float] = None, keyword: Optional[str] = None
+) -> bytes:
+    """
+    8-byte hash of the listing fields SniperBot.evaluate reads, plus the trend
+    score it will see for the listing's title and its market keyword
+    (metadata.keyword, passed in like for evaluate).
+    """
+    posted = listing.posted_at.isoformat() if listing.posted_at is not None else ""
+    price = repr(float(listing.price)) if listing.price is not None else ""
+    trend = repr(float(trend_score)) if trend_score is not None else ""
+    parts = (listing.title or "", listing.category or "", listing.currency or "", price, posted, keyword or "", trend)
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+
+
+def _opt(x: Optional[float]) -> float:
+    return math.nan if x is None else float(x)
+
+
+def _none(x: float) -> Optional[float]:
+    return None if math.isnan(x) else x
+
+
+def pack_decision(decision: SniperDecision) -> bytes:
+    m = decision.scores.margin
+    return _PACK.pack(
+        decision.should_alert,
+        decision.scores.demand_score,
+        m.sell_price,
+        m.cost_basis,
+        m.fees_amount,
+        m.shipping_cost,
+        m.total_cost,
+        m.margin_amount,
+        m.margin_percent,
+        decision.scores.composite.composite_score,
+        _opt(decision.discount_percent),
+        _opt(decision.price_percentile),
+    )
+
+
+def unpack_decision(packed: bytes, reason: str) -> SniperDecision:
+    alert, demand, sell, cost, fees, ship, total, amount, percent, composite, discount, pct = _PACK.unpack(packed)
+    return SniperDecision(
+        should_alert=alert,
+        reason=reason,
+        scores=DealScoreOutput(
+            demand_score=demand,
+            margin=MarginResult(sell, cost, fees, ship, total, amount, percent),
+            composite=CompositeScoreResult(demand_score=demand, margin_percent=percent, composite_score=composite),
+        ),
+        discount_percent=_none(discount),
+        price_percentile=_none(pct),
+    )
+
+
+@dataclass(frozen=True)
+class _Entry:
+    fingerprint: bytes
+    epoch: int  # config epoch
+    expires_at: float  # epoch seconds
+    packed: bytes
+    reason: str
+    deal_state: DealState  # deal row as written for this decision
+
+
+class DecisionCache:
+    """
+    Last SniperBot decision per listing, reused while its inputs are unchanged.
+
+    An entry is valid for the same listing fingerprint (which includes the
+    listing's own trend score, so a trend change only affects the listings it
+    applies to) and config epoch (bumped by changes to DECISION_SECTIONS).
+    Entries also expire:
+    at the end of the listing's fresh window (the demand recency step) and at
+    most max_age seconds after they were made, which bounds drift from the
+    recency decay and from comparables/market data that grow between runs.
+    Decisions are kept packed (~90 bytes plus the reason string).
+    """
+
+    def __init__(self, max_entries: int = 200_000, max_age: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._miss_seconds = 0.0  # EWMA cost of evaluating + writing one listing
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def lookup(
+        self, listing: "Listing", fingerprint: Optional[bytes] = None, now: Optional[float] = None
+    ) -> Optional[Tuple[SniperDecision, DealState]]:
+        """
+        Cached (decision, deal state) for the listing, or None. Does not count
+        towards the hit/miss metrics; see record().
+        """
+        fp = fingerprint or listing_fingerprint(listing)
+        epoch = self.epoch()
+        with self._lock:
+            entry = self._entries.get(listing.id)
+            if entry is None:
+                return None
+            if entry.fingerprint != fp or entry.epoch != epoch or entry.expires_at <= (now or time.time()):
+                del self._entries[listing.id]
+                return None
+            self._entries.move_to_end(listing.id)
+        return unpack_decision(entry.packed, entry.reason), entry.deal_state
+
+    def store(
+        self,
+        listing: "Listing",
+        decision: SniperDecision,
+        deal_state: DealState,
+        fresh_hours: float,
+        fingerprint: Optional[bytes] = None,
+        epoch: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Remember a decision. Pass the epoch read before evaluating so a config
+        change during evaluation is not cached under the new epoch.
+        """
+        now = now or time.time()
+        expires = now + self.max_age
+        if listing.posted_at is not None:
+            posted = listing.posted_at
+            if posted.tzinfo is None:
+                posted = posted.replace(tzinfo=timezone.utc)
+            fresh_until = posted.timestamp() + fresh_hours * 3600.0
+            if fresh_until > now:
+                expires = min(expires, fresh_until)
+        entry = _Entry(
+            fingerprint=fingerprint or listing_fingerprint(listing),
+            epoch=self.epoch() if epoch is None else epoch,
+            expires_at=expires,
+            packed=pack_decision(decision),
+            reason=decision.reason,
+            deal_state=deal_state,
+        )
+        with self._lock:
+            self._entries.pop(listing.id, None)
+            self._entries[listing.id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, hits: int, misses: int, miss_seconds: float = 0.0) -> None:
+        """
+        Count a batch: hits skipped scoring and deal writes; miss_seconds is the
+        time spent on the misses and prices the savings of future hits.
+        """
+        with self._lock:
+            if misses:
+                per_miss = miss_seconds / misses
+                self._miss_seconds = per_miss if not self._miss_seconds else 0.8 * self._miss_seconds + 0.2 * per_miss
+            self.hits += hits
+            self.misses += misses
+            self.saved_seconds += hits * self._miss_seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "miss_seconds_avg": round(self._miss_seconds, 6),
+                "epoch": self._epoch,
+            }
+
+
+_cache: Optional[DecisionCache] = None
+_cache_lock = threading.Lock()
+
+
+def decision_cache_settings() -> dict:
+    """
+    decision_cache:
+      enabled: true
+      max_entries: 200000
+      max_age_seconds: 3600   # re-score at least this often (comparables/market drift, recency decay)
+    """
+    return cfg.get("decision_cache", {}) or {}
+
+
+def get_decision_cache() -> Optional[DecisionCache]:
+    """
+    Process-wide decision cache, or None when decision_cache.enabled is false.
+    """
+    global _cache
+    s = decision_cache_settings()
+    if not s.get("enabled", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DecisionCache(
+                max_entries=int(s.get("max_entries", 200_000)),
+                max_age=float(s.get("max_age_seconds", 3600)),
+            )
+            cfg.subscribe(_on_config, DECISION_SECTIONS + ("decision_cache",))
+        return _cache
+
+
+def _on_config(changed: set[str]) -> None:
+    if _cache is None:
+        return
+    if changed & set(DECISION_SECTIONS):
+        _cache.invalidate()
+    if "decision_cache" in changed:
+        s = decision_cache_settings()
+        _cache.max_entries = int(s.get("max_entries", 200_000))
+        _cache.max_age = float(s.get("max_age_seconds", 3600))
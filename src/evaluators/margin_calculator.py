@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -15,6 +17,34 @@ class MarginResult:
     margin_percent: float  # 0..100
 
 
+@dataclass(frozen=True)
+class MarginBatch:
+    """
+    Columnar MarginResult; every field is a float64 array.
+    """
+    sell_price: np.ndarray
+    cost_basis: np.ndarray
+    fees_amount: np.ndarray
+    shipping_cost: np.ndarray
+    total_cost: np.ndarray
+    margin_amount: np.ndarray
+    margin_percent: np.ndarray
+
+    def row(self, i: int) -> MarginResult:
+        return MarginResult(
+            sell_price=float(self.sell_price[i]),
+            cost_basis=float(self.cost_basis[i]),
+            fees_amount=float(self.fees_amount[i]),
+            shipping_cost=float(self.shipping_cost[i]),
+            total_cost=float(self.total_cost[i]),
+            margin_amount=float(self.margin_amount[i]),
+            margin_percent=float(self.margin_percent[i]),
+        )
+
+
+ArrayOrScalar = Union[np.ndarray, float]
+
+
 def _to_float(x: Optional[float], default: float = 0.0) -> float:
     try:
         if x is None:
@@ -57,3 +87,38 @@ def calculate_margin(
         margin_amount=margin_amount,
         margin_percent=margin_percent,
     )
+
+
+def calculate_margin_batch(
+    sell_price: ArrayOrScalar,
+    cost_basis: ArrayOrScalar,
+    fees_percent: ArrayOrScalar = 10.0,
+    shipping_cost: ArrayOrScalar = 0.0,
+) -> MarginBatch:
+    """
+    Vectorized calculate_margin(). NaN inputs are treated like None (0.0).
+    Scalars broadcast against the array arguments.
+    """
+    sp, cb, fp, ship = np.broadcast_arrays(
+        *(np.nan_to_num(np.asarray(x, dtype=np.float64), nan=0.0) for x in (sell_price, cost_basis, fees_percent, shipping_cost))
+    )
+    fp = np.maximum(0.0, fp)
+    ship = np.maximum(0.0, ship)
+
+    fees_amount = sp * (fp / 100.0)
+    total_cost = cb + fees_amount + ship
+    margin_amount = sp - total_cost
+    positive = sp > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.maximum(0.0, (margin_amount / np.where(positive, sp, 1.0)) * 100.0)
+    margin_percent = np.where(positive, pct, 0.0)
+
+    return MarginBatch(
+        sell_price=sp,
+        cost_basis=cb,
+        fees_amount=fees_amount,
+        shipping_cost=ship,
+        total_cost=total_cost,
+        margin_amount=margin_amount,
+        margin_percent=margin_percent,
+    )
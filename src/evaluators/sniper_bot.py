@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING, Union
+
+import numpy as np
 
 from ..core.config import cfg
-from .deal_scorer import DealScorer, DealScoreOutput
+from ..analyzers.price_sketch import PricePosition, PriceSketchStore, get_price_sketches, market_settings
+from .deal_scorer import BatchScoreOutput, DealScorer, DealScoreOutput
 
 if TYPE_CHECKING:
     from ..models.listing import Listing
@@ -15,6 +19,73 @@ class SniperDecision:
     should_alert: bool
     reason: str
     scores: DealScoreOutput
+    discount_percent: Optional[float] = None  # vs market median; None without market data
+    price_percentile: Optional[float] = None  # 0..100 within the market
+
+
+@dataclass(frozen=True)
+class BatchDecision:
+    """
+    Columnar SniperDecision for evaluate_many(). Reasons are built on demand.
+    """
+    should_alert: np.ndarray
+    demand_ok: np.ndarray
+    margin_ok: np.ndarray
+    composite_ok: np.ndarray
+    discount_ok: np.ndarray
+    discount_percent: np.ndarray  # NaN without market data
+    scores: BatchScoreOutput
+    thresholds: tuple[float, float, float, float]  # (min_demand, min_margin, min_composite, min_discount)
+
+    def __len__(self) -> int:
+        return int(self.should_alert.shape[0])
+
+    def reason(self, i: int) -> str:
+        min_demand, min_margin, min_composite, min_discount = self.thresholds
+        return _reason(
+            float(self.scores.demand_score[i]),
+            float(self.scores.margin.margin_percent[i]),
+            float(self.scores.composite_score[i]),
+            min_demand,
+            min_margin,
+            min_composite,
+            self._discount(i),
+            min_discount,
+        )
+
+    def _discount(self, i: int) -> Optional[float]:
+        d = float(self.discount_percent[i])
+        return None if np.isnan(d) else d
+
+    def row(self, i: int) -> SniperDecision:
+        return SniperDecision(
+            should_alert=bool(self.should_alert[i]),
+            reason=self.reason(i),
+            scores=self.scores.row(i),
+            discount_percent=self._discount(i),
+        )
+
+
+def _reason(
+    demand: float,
+    margin_percent: float,
+    composite: float,
+    min_demand: float,
+    min_margin: float,
+    min_composite: float,
+    discount_percent: Optional[float] = None,
+    min_discount: float = 0.0,
+) -> str:
+    reasons: list[str] = []
+    if demand < min_demand:
+        reasons.append(f"demand_score {demand:.2f} < min_demand {min_demand:.2f}")
+    if margin_percent < min_margin:
+        reasons.append(f"margin {margin_percent:.1f}% < min_margin {min_margin:.1f}%")
+    if composite < min_composite:
+        reasons.append(f"composite {composite:.2f} < min_composite {min_composite:.2f}")
+    if discount_percent is not None and discount_percent < min_discount:
+        reasons.append(f"discount {discount_percent:.1f}% < min_discount {min_discount:.1f}%")
+    return " & ".join(reasons) if reasons else "meets or exceeds all thresholds"
 
 
 class SniperBot:
@@ -24,6 +95,7 @@ class SniperBot:
 
     thresholds in config/config.yaml (example):
       thresholds:
+        min_discount_percent: 20   # vs the market median; only applied when market data exists
         min_margin_percent: 15
         min_composite_score: 0.75
         min_demand_score: 0.7
@@ -31,12 +103,34 @@ class SniperBot:
         shipping_cost: 0
     """
 
-    def __init__(self) -> None:
+    def __init__(self, market: Optional[PriceSketchStore] = None) -> None:
+        self._load_config()
+        cfg.subscribe(self._on_config, ("thresholds",))
+        self.scorer = DealScorer()
+        if market is None and market_settings().get("enabled", True):
+            market = get_price_sketches()
+        self.market = market
+
+    def _load_config(self) -> None:
         t = cfg.thresholds() or {}
         self.min_margin_percent: float = float(t.get("min_margin_percent", 15.0))
         self.min_composite_score: float = float(t.get("min_composite_score", 0.75))
         self.min_demand_score: float = float(t.get("min_demand_score", 0.7))
-        self.scorer = DealScorer()
+        self.min_discount_percent: float = float(t.get("min_discount_percent", 0.0))
+
+    def _on_config(self, changed: set[str]) -> None:
+        self._load_config()
+
+    def market_position(self, listing: "Listing", keyword: Optional[str] = None) -> Optional[PricePosition]:
+        """
+        Price percentile and discount vs the keyword market (the search keyword
+        the listing was scraped under, metadata.keyword), else the listing's
+        category. The keyword is passed in because the fast path scores a
+        transient Listing built without its metadata.
+        """
+        if self.market is None:
+            return None
+        return self.market.position(listing.price, getattr(listing, "category", None), keyword)
 
     def evaluate(
         self,
@@ -46,6 +140,8 @@ class SniperBot:
         shipping_cost: Optional[float] = None,
         trend_keyword: Optional[str] = None,
         trend_location: Optional[str] = None,
+        now: Optional[datetime] = None,
+        keyword: Optional[str] = None,
     ) -> SniperDecision:
         scores = self.scorer.score_listing(
             listing=listing,
@@ -54,28 +150,76 @@ class SniperBot:
             shipping_cost=shipping_cost,
             trend_keyword=trend_keyword,
             trend_location=trend_location,
+            now=now,
+        )
+
+        position = self.market_position(listing, keyword)
+        discount = position.discount_percent if position is not None else None
+
+        ok = (
+            scores.demand_score >= self.min_demand_score
+            and scores.margin.margin_percent >= self.min_margin_percent
+            and scores.composite.composite_score >= self.min_composite_score
+            and (discount is None or discount >= self.min_discount_percent)
+        )
+        reason = _reason(
+            scores.demand_score,
+            scores.margin.margin_percent,
+            scores.composite.composite_score,
+            self.min_demand_score,
+            self.min_margin_percent,
+            self.min_composite_score,
+            discount,
+            self.min_discount_percent,
+        )
+        return SniperDecision(
+            should_alert=ok,
+            reason=reason,
+            scores=scores,
+            discount_percent=discount,
+            price_percentile=position.percentile if position is not None else None,
         )
 
-        reasons: list[str] = []
-        ok = True
-
-        if scores.demand_score < self.min_demand_score:
-            ok = False
-            reasons.append(
-                f"demand_score {scores.demand_score:.2f} < min_demand {self.min_demand_score:.2f}"
-            )
-
-        if scores.margin.margin_percent < self.min_margin_percent:
-            ok = False
-            reasons.append(
-                f"margin {scores.margin.margin_percent:.1f}% < min_margin {self.min_margin_percent:.1f}%"
-            )
-
-        if scores.composite.composite_score < self.min_composite_score:
-            ok = False
-            reasons.append(
-                f"composite {scores.composite.composite_score:.2f} < min_composite {self.min_composite_score:.2f}"
-            )
-
-        reason = " & ".join(reasons) if reasons else "meets or exceeds all thresholds"
-        return SniperDecision(should_alert=ok, reason=reason, scores=scores)
+    def evaluate_many(
+        self,
+        prices: np.ndarray,
+        posted_at: np.ndarray,
+        trend_scores: Optional[np.ndarray] = None,
+        assumed_sell_prices: Optional[np.ndarray] = None,
+        fees_percent: Optional[float] = None,
+        shipping_cost: Optional[float] = None,
+        now: Optional[Union[float, np.ndarray]] = None,
+        discount_percents: Optional[np.ndarray] = None,
+    ) -> BatchDecision:
+        """
+        Vectorized evaluate() over columns (see DealScorer.score_batch for inputs).
+        discount_percents: per-row discount vs market (see PriceSketchStore.discounts);
+        NaN/None = no market data, which does not block an alert.
+        """
+        scores = self.scorer.score_batch(
+            prices=prices,
+            posted_at=posted_at,
+            trend_scores=trend_scores,
+            assumed_sell_prices=assumed_sell_prices,
+            fees_percent=fees_percent,
+            shipping_cost=shipping_cost,
+            now=now,
+        )
+        demand_ok = scores.demand_score >= self.min_demand_score
+        margin_ok = scores.margin.margin_percent >= self.min_margin_percent
+        composite_ok = scores.composite_score >= self.min_composite_score
+        if discount_percents is None:
+            discount = np.full(len(scores), np.nan)
+        else:
+            discount = np.asarray(discount_percents, dtype=np.float64)
+        discount_ok = np.isnan(discount) | (discount >= self.min_discount_percent)
+        return BatchDecision(
+            should_alert=demand_ok & margin_ok & composite_ok & discount_ok,
+            demand_ok=demand_ok,
+            margin_ok=margin_ok,
+            composite_ok=composite_ok,
+            discount_ok=discount_ok,
+            discount_percent=discount,
+            scores=scores,
+            thresholds=(self.min_demand_score, self.min_margin_percent, self.min_composite_score, self.min_discount_percent),
+        )
@@ -29,14 +29,15 @@ class Alert(Base, TimestampMixin):
     status: Mapped[str] = mapped_column(String(30), default="pending", index=True)  # pending, sent, failed
     message: Mapped[Optional[str]] = mapped_column(String)
     sent_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
-    metadata: Mapped[Optional[dict]] = mapped_column(JSONB, default=dict)
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, default=dict)
 
     # Relationships
     deal: Mapped["Deal"] = relationship("Deal", back_populates="alerts")
 
     __table_args__ = (
-        Index("ix_alerts_channel", "channel"),
-        Index("ix_alerts_status", "status"),
+        Index("ix_alerts_created_at_id", "created_at", "id"),
+        Index("ix_alerts_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_alerts_channel_created_at_id", "channel", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -31,7 +31,7 @@ class Deal(Base, TimestampMixin):
     estimated_margin: Mapped[Optional[float]] = mapped_column(Numeric(12, 2))
     currency: Mapped[Optional[str]] = mapped_column(String(10))
     notes: Mapped[Optional[str]] = mapped_column(String)
-    metadata: Mapped[Optional[dict]] = mapped_column(JSONB, default=dict)
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, default=dict)
 
     # Relationships
     listing: Mapped["Listing"] = relationship("Listing", back_populates="deals")
@@ -40,7 +40,10 @@ class Deal(Base, TimestampMixin):
     )
 
     __table_args__ = (
-        Index("ix_deals_status", "status"),
+        Index("ix_deals_created_at_id", "created_at", "id"),
+        Index("ix_deals_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_deals_score_id", "score", "id"),
+        Index("ix_deals_status_score_id", "status", "score", "id"),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import (
+    String,
+    Integer,
+    DateTime,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+
+
+class ListingLatency(Base):
+    """
+    Compact per-listing pipeline timeline (first occurrence of each stage).
+    """
+
+    __tablename__ = "listing_latency"
+
+    listing_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True
+    )
+    source: Mapped[str] = mapped_column(String(50), nullable=False)
+    keyword: Mapped[Optional[str]] = mapped_column(String(200))
+    posted_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    fetched_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    parsed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    persisted_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    analyzed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    alert_created_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+    alert_sent_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_listing_latency_fetched_at", "fetched_at"),
+        Index("ix_listing_latency_source_keyword", "source", "keyword"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ListingLatency listing_id={self.listing_id} source={self.source} keyword={self.keyword}>"
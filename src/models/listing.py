@@ -3,15 +3,17 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 
 from sqlalchemy import (
+    Computed,
     String,
     Integer,
     Boolean,
     Numeric,
     DateTime,
     Index,
+    ForeignKey,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from . import Base, TimestampMixin
@@ -20,6 +22,15 @@ if TYPE_CHECKING:
     from .deal import Deal
 
 
+# Title weighs more than description in ranking; the text search config is
+# part of the generated column, so queries must use the same one
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+
 class Listing(Base, TimestampMixin):
     __tablename__ = "listings"
 
@@ -37,7 +48,17 @@ class Listing(Base, TimestampMixin):
     seller_contact: Mapped[Optional[str]] = mapped_column(String(200))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
     last_seen_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
-    metadata: Mapped[Optional[dict]] = mapped_column(JSONB, default=dict)
+    # "metadata" is reserved on declarative classes; the column keeps its name
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, default=dict)
+    # Canonical listing of a cross-post cluster (NULL = this listing is canonical)
+    duplicate_of_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("listings.id", ondelete="SET NULL")
+    )
+
+    # Full-text search document, maintained by Postgres; deferred so normal loads skip it
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
 
     # Relationships
     deals: Mapped[list["Deal"]] = relationship(
@@ -49,7 +70,11 @@ class Listing(Base, TimestampMixin):
             "source", "external_id", name="uq_listing_source_external_id"
         ),
         Index("ix_listings_source", "source"),
-        Index("ix_listings_is_active", "is_active"),
+        Index("ix_listings_duplicate_of_id", "duplicate_of_id"),
+        Index("ix_listings_created_at_id", "created_at", "id"),
+        Index("ix_listings_category", "category"),
+        Index("ix_listings_posted_at", "posted_at"),
+        Index("ix_listings_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     def __repr__(self) -> str:
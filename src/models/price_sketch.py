@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from sqlalchemy import (
+    String,
+    BigInteger,
+    LargeBinary,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base, TimestampMixin
+
+
+class PriceSketch(Base, TimestampMixin):
+    """
+    Serialized KLL price sketch per market key (e.g. "cat:electronics", "kw:iphone").
+    """
+
+    __tablename__ = "price_sketches"
+
+    key: Mapped[str] = mapped_column(String(250), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PriceSketch key={self.key} count={self.count}>"
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import (
+    String,
+    Integer,
+    Numeric,
+    Boolean,
+    Index,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base, TimestampMixin
+
+
+class SavedSearch(Base, TimestampMixin):
+    """
+    A user's watchlist entry: every query token must appear in the title,
+    optionally within a price range and category.
+    """
+
+    __tablename__ = "saved_searches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    owner: Mapped[str] = mapped_column(String(100), nullable=False)  # user id / handle
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    query: Mapped[str] = mapped_column(String(300), nullable=False, default="")
+    category: Mapped[Optional[str]] = mapped_column(String(100))
+    min_price: Mapped[Optional[float]] = mapped_column(Numeric(12, 2))
+    max_price: Mapped[Optional[float]] = mapped_column(Numeric(12, 2))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    __table_args__ = (
+        Index("ix_saved_searches_owner", "owner"),
+        Index("ix_saved_searches_active_updated", "is_active", "updated_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SavedSearch id={self.id} owner={self.owner} query={self.query!r}>"
@@ -26,7 +26,7 @@ class Trend(Base, TimestampMixin):
     score: Mapped[Optional[float]] = mapped_column(Numeric(10, 4))  # normalized interest score
     timeframe_start: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
     timeframe_end: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True))
-    metadata: Mapped[Optional[dict]] = mapped_column(JSONB, default=dict)
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, default=dict)
 
     __table_args__ = (
         UniqueConstraint(
@@ -32,10 +32,19 @@ class ProxyManager:
     """
 
     def __init__(self, proxies: Optional[Iterable[str]] = None) -> None:
-        discovered = list(self._discover_proxies(proxies))
+        self._provided: List[str] = list(proxies or [])
+        self._load()
+        cfg.subscribe(self._on_config, ("scraping",))
+
+    def _load(self) -> None:
+        discovered = list(self._discover_proxies(self._provided))
         self._proxies: List[Proxy] = [Proxy(p) for p in discovered if p]
         self._cycle: Optional[Iterator[Proxy]] = itertools.cycle(self._proxies) if self._proxies else None
 
+    def _on_config(self, changed: set[str]) -> None:
+        # scraping.proxies may have changed; explicit and added proxies are kept
+        self._load()
+
     def _discover_proxies(self, provided: Optional[Iterable[str]]) -> Iterable[str]:
         if provided:
             yield from provided
@@ -62,6 +71,7 @@ class ProxyManager:
         if not url:
             return
         p = Proxy(url)
+        self._provided.append(url)
         self._proxies.append(p)
         # re-create the cycle to include the new proxy
         self._cycle = itertools.cycle(self._proxies)
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
+from ..core.cache_versions import bump
 from ..core.config import cfg
+from ..core.latency import mark_stage
 from ..utils.logger import get_logger
 from ..models.alert import Alert
 from ..models.deal import Deal
+from ..models.listing import Listing
+
+if TYPE_CHECKING:
+    from ..evaluators.sniper_bot import SniperDecision
 
 log = get_logger()
 
@@ -88,6 +95,54 @@ def _build_message_for_deal(deal: Deal) -> str:
     return " | ".join(parts)
 
 
+def _build_message_for_listing(data: Dict[str, Any], decision: "SniperDecision") -> str:
+    scores = decision.scores
+    parts = [
+        f"Snipe - score={scores.composite.composite_score:.4f}",
+        f"margin=${scores.margin.margin_amount:.2f} ({data.get('currency') or ''})",
+        f"title={data.get('title') or ''}",
+        f"url={data.get('url') or ''}",
+        f"price={data.get('price')} {data.get('currency') or ''}",
+    ]
+    return " | ".join(parts)
+
+
+def listing_already_alerted(db: Session, source: str, external_id: str) -> bool:
+    """
+    True if any alert was already sent for the listing's deal.
+    """
+    stmt = (
+        select(Alert.id)
+        .join(Deal, Deal.id == Alert.deal_id)
+        .join(Listing, Listing.id == Deal.listing_id)
+        .where(Listing.source == source, Listing.external_id == external_id, Alert.status == "sent")
+        .limit(1)
+    )
+    return db.execute(stmt).first() is not None
+
+
+def send_listing_alerts(data: Dict[str, Any], decision: "SniperDecision") -> List[Alert]:
+    """
+    Fast path: deliver alerts for a scraped listing dict before it is persisted.
+    Returns transient Alert objects (no deal_id yet) with status/sent_at set;
+    the caller attaches them to the deal once the listing has been written.
+    """
+    message = _build_message_for_listing(data, decision)
+    alerts: List[Alert] = []
+    for ch in _enabled_channels():
+        alert = Alert(channel=ch, status="pending", message=message)
+        try:
+            ok = _send_alert(alert)
+        except Exception as e:
+            log.warning("Fast alert failed for %s channel=%s: %s", data.get("external_id"), ch, e)
+            ok = False
+        alert.status = "sent" if ok else "failed"
+        if ok:
+            alert.sent_at = datetime.now(timezone.utc)
+        alerts.append(alert)
+    return alerts
+
+
 def process_alerts(db: Session) -> Dict[str, int]:
     """
     Create and send alerts for deals that meet thresholds.
@@ -101,7 +156,13 @@ def process_alerts(db: Session) -> Dict[str, int]:
     failed = 0
 
     # Load eligible deals and joined listing relationship (lazy load is fine)
-    stmt = select(Deal).where(Deal.status == "eligible").order_by(Deal.created_at.desc())
+    # Deals on cross-posted duplicates are skipped; the canonical listing's deal alerts
+    stmt = (
+        select(Deal)
+        .join(Listing, Listing.id == Deal.listing_id)
+        .where(Deal.status == "eligible", Listing.duplicate_of_id.is_(None))
+        .order_by(Deal.created_at.desc())
+    )
     deals = db.execute(stmt).scalars().all()
 
     for deal in deals:
@@ -114,11 +175,14 @@ def process_alerts(db: Session) -> Dict[str, int]:
                 alert = Alert(deal_id=deal.id, channel=ch, status="pending", message=message)
                 db.add(alert)
                 db.flush()  # assign id
+                mark_stage(db, deal.listing_id, "alert_created")
                 created += 1
 
                 ok = _send_alert(alert)
                 if ok:
                     alert.status = "sent"
+                    alert.sent_at = datetime.now(timezone.utc)
+                    mark_stage(db, deal.listing_id, "alert_sent", alert.sent_at)
                     sent += 1
                 else:
                     alert.status = "failed"
@@ -128,5 +192,7 @@ def process_alerts(db: Session) -> Dict[str, int]:
                 failed += 1
 
     db.commit()
+    if created:
+        bump("alerts")
     log.info("Alert worker: created=%d, sent=%d, failed=%d", created, sent, failed)
     return {"created": created, "sent": sent, "failed": failed}
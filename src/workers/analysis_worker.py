@@ -1,15 +1,22 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..core.cache_versions import bump
 from ..core.config import cfg
+from ..core.events import notify_deal_change
+from ..core.latency import mark_stage
+from ..analyzers.comparables import comparables_settings
 from ..models.listing import Listing
 from ..models.deal import Deal
 from ..utils.logger import get_logger
-from ..evaluators.sniper_bot import SniperBot
+from ..evaluators.decision_cache import DealState, get_decision_cache, listing_fingerprint
+from ..evaluators.sniper_bot import SniperBot, SniperDecision
 
 log = get_logger()
 
@@ -18,33 +25,87 @@ def _get_thresholds() -> dict:
     return cfg.thresholds() or {}
 
 
+def _deal_state(deal: Deal) -> Tuple[Optional[str], Optional[float], Optional[float]]:
+    """
+    Comparable snapshot at column precision (score Numeric(10,4), margin Numeric(12,2)).
+    """
+    score = round(float(deal.score), 4) if deal.score is not None else None
+    margin = round(float(deal.estimated_margin), 2) if deal.estimated_margin is not None else None
+    return deal.status, score, margin
+
+
+def _written_state(status: Optional[str], score: Any, margin: Any, currency: Optional[str], notes: Optional[str]) -> DealState:
+    """
+    Every Deal column upsert_deal() writes, rounded half away from zero like
+    Postgres does on the way into Numeric(10,4)/Numeric(12,2).
+    """
+    return (
+        status,
+        _numeric(score, "0.0001"),
+        _numeric(margin, "0.01"),
+        currency,
+        notes,
+    )
+
+
+def _numeric(value: Any, quantum: str) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(repr(float(value))).quantize(Decimal(quantum), rounding=ROUND_HALF_UP)
+
+
+def _current_states(db: Session, listing_ids: Sequence[int], chunk_size: int = 5000) -> Dict[int, DealState]:
+    out: Dict[int, DealState] = {}
+    for start in range(0, len(listing_ids), chunk_size):
+        stmt = select(
+            Deal.listing_id, Deal.status, Deal.score, Deal.estimated_margin, Deal.currency, Deal.notes
+        ).where(Deal.listing_id.in_(listing_ids[start : start + chunk_size]))
+        for listing_id, *cols in db.execute(stmt):
+            out[listing_id] = _written_state(*cols)
+    return out
+
+
 def _upsert_deal_from_listing(db: Session, listing: Listing, bot: SniperBot) -> Tuple[Deal, bool]:
     """
     Create or update a Deal row derived from a Listing + SniperBot decision.
     Returns (deal, created_flag)
     """
+    decision = bot.evaluate(listing)
+    return upsert_deal(db, listing, decision)
+
+
+def upsert_deal(db: Session, listing: Listing, decision: SniperDecision) -> Tuple[Deal, bool]:
+    """
+    Create or update the Deal row for a listing from an already-made decision.
+    The listing must be flushed (have an id). Returns (deal, created_flag)
+    """
     # Try to find an existing deal for this listing
     stmt = select(Deal).where(Deal.listing_id == listing.id)
     deal = db.execute(stmt).scalars().first()
     created = False
 
-    # Evaluate listing
-    decision = bot.evaluate(listing)
-
     if deal is None:
         deal = Deal(listing_id=listing.id, status="new")
         created = True
 
+    before = _deal_state(deal)
+
     # Update fields
     deal.status = "eligible" if decision.should_alert else "ignored"
-    deal.score = decision.composite.composite_score
-    deal.estimated_margin = decision.margin.margin_amount
+    deal.score = decision.scores.composite.composite_score
+    deal.estimated_margin = decision.scores.margin.margin_amount
     deal.currency = listing.currency or deal.currency
     # Optionally store reason in notes for visibility
     deal.notes = decision.reason
 
     if created:
         db.add(deal)
+    mark_stage(db, listing.id, "analyzed")
+
+    # Stream only real changes; NOTIFY is delivered when analyze_all commits
+    if created or before != _deal_state(deal):
+        db.flush()
+        notify_deal_change(db, deal, op="insert" if created else "update")
 
     return deal, created
 
@@ -52,26 +113,84 @@ def _upsert_deal_from_listing(db: Session, listing: Listing, bot: SniperBot) ->
 def analyze_all(db: Session) -> Dict[str, int]:
     """
     Evaluate all active listings and upsert Deals accordingly.
-    Returns counts: {"created": X, "updated": Y}
+    Listings whose decision is cached (same content, trend score and config epoch)
+    and whose deal row is unchanged since it was written are skipped.
+    Returns counts: {"created": X, "updated": Y, "cached": Z}
     """
     log.info("Analysis worker: evaluating listings into deals")
     bot = SniperBot()
 
-    stmt = select(Listing).where(Listing.is_active.is_(True))
-    listings = db.execute(stmt).scalars().all()
+    # Cross-posts are evaluated once, through their canonical listing
+    stmt = select(Listing, Listing.meta["keyword"].astext).where(Listing.is_active.is_(True), Listing.duplicate_of_id.is_(None))
+    rows = db.execute(stmt).all()
+    listings = [lst for lst, _ in rows]
+    keywords: Dict[int, Optional[str]] = {lst.id: kw for lst, kw in rows}
+
+    # Comparable prices drive the assumed resale price (built once per process);
+    # market sketches give the discount gate
+    comps = comparables_settings()
+    if bot.scorer.comparables is not None:
+        bot.scorer.comparables.ensure_built(db, max_age_days=comps.get("max_age_days", 180))
+    if bot.market is not None:
+        bot.market.ensure_loaded(db)
+
+    # Load trend scores for this batch up front so scoring never waits on a refresh
+    trend_cache = bot.scorer.trend_analyzer.cache
+    trend_cache.warm(trend_cache.key(bot.scorer.trend_keyword(lst.title)) for lst in listings if lst.title)
+
+    # Cached decisions only count when the deal row still holds what was written
+    cache = get_decision_cache()
+    fingerprints: Dict[int, bytes] = {}
+    todo: List[Listing] = list(listings)
+    cached = 0
+    if cache is not None:
+        # The trend score a listing will be scored with is part of its fingerprint,
+        # so a new or changed trend only re-scores the listings it applies to
+        scorer = bot.scorer
+        fingerprints = {
+            lst.id: listing_fingerprint(
+                lst, scorer.trend_analyzer.score_keyword(scorer.trend_keyword(lst.title)), keywords[lst.id]
+            )
+            for lst in listings
+        }
+        expected: Dict[int, DealState] = {}
+        for lst in listings:
+            hit = cache.lookup(lst, fingerprints[lst.id])
+            if hit is not None:
+                expected[lst.id] = hit[1]
+        current = _current_states(db, list(expected))
+        todo = [lst for lst in listings if lst.id not in expected or current.get(lst.id) != expected[lst.id]]
+        cached = len(listings) - len(todo)
 
     created = 0
     updated = 0
-    for lst in listings:
+    t0 = time.perf_counter()
+    for lst in todo:
         try:
-            deal, was_created = _upsert_deal_from_listing(db, lst, bot)
+            epoch = cache.epoch() if cache is not None else None
+            decision = bot.evaluate(lst, keyword=keywords[lst.id])
+            deal, was_created = upsert_deal(db, lst, decision)
             if was_created:
                 created += 1
             else:
                 updated += 1
+            if cache is not None:
+                state = _written_state(deal.status, deal.score, deal.estimated_margin, deal.currency, deal.notes)
+                cache.store(
+                    lst,
+                    decision,
+                    state,
+                    fresh_hours=bot.scorer.demand_analyzer.fresh_hours,
+                    fingerprint=fingerprints.get(lst.id),
+                    epoch=epoch,
+                )
         except Exception as e:
             log.warning("analyze failed for listing id=%s: %s", getattr(lst, "id", None), e)
+    if cache is not None:
+        cache.record(hits=cached, misses=len(todo), miss_seconds=time.perf_counter() - t0)
 
     db.commit()
-    log.info("Analysis worker: finished (created=%d, updated=%d)", created, updated)
-    return {"created": created, "updated": updated}
+    if created or updated:
+        bump("deals")
+    log.info("Analysis worker: finished (created=%d, updated=%d, cached=%d)", created, updated, cached)
+    return {"created": created, "updated": updated, "cached": cached}
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
+from ..core.cache_versions import bump
 from ..core.config import cfg
+from ..core.database import async_session_scope, dispose_async_engine, session_scope
+from ..core.latency import record_ingest
+from ..analyzers.category_classifier import category_settings, get_category_classifier
+from ..analyzers.comparables import comparables_settings, get_comparables_index
+from ..analyzers.price_sketch import get_price_sketches, market_settings
+from ..analyzers.saved_search_index import get_saved_search_index, watchlist_settings
+from ..analyzers.dedup import dedup_settings, get_duplicate_index
+from ..analyzers.similarity_index import get_similarity_index, similarity_settings
+from ..models.alert import Alert
 from ..models.listing import Listing
 from ..utils.logger import get_logger
+from ..evaluators.sniper_bot import SniperBot, SniperDecision
+from .alert_worker import listing_already_alerted, send_listing_alerts
+from .analysis_worker import upsert_deal
 from ..scrapers.base_scraper import BaseScraper
 from ..scrapers.craigslist_scraper import CraigslistScraper
 from ..scrapers.offerup_scraper import OfferUpScraper
@@ -35,12 +50,64 @@ def _get_location() -> Optional[str]:
     return str(zip_code)
 
 
+def _stamp(data: Dict[str, Any], stage: str, ts: Optional[float] = None) -> None:
+    """
+    Record a wall-clock stage timestamp (epoch seconds) under metadata.stage_ts.
+    """
+    meta = data.get("metadata")
+    if not isinstance(meta, dict):
+        meta = {}
+        data["metadata"] = meta
+    meta.setdefault("stage_ts", {})[stage] = ts if ts is not None else time.time()
+
+
+def _ensure_watchlists() -> None:
+    w = watchlist_settings()
+    if w.get("enabled", True):
+        with session_scope() as db:
+            get_saved_search_index().ensure_loaded(db, refresh_seconds=float(w.get("refresh_seconds", 60)))
+
+
+def _match_watchlists(items: List[Dict[str, Any]]) -> None:
+    """
+    Tag parsed listings with the saved searches they satisfy (metadata.watchlist_matches).
+    """
+    if not items or not watchlist_settings().get("enabled", True):
+        return
+    index = get_saved_search_index()
+    if not len(index):
+        return
+    for data in items:
+        matches = index.match(data.get("title"), data.get("price"), data.get("category"))
+        if matches:
+            data["metadata"]["watchlist_matches"] = matches
+
+
+def _fill_categories(items: List[Dict[str, Any]]) -> None:
+    """
+    Classify parsed listings the scrapers left without a category, one batch per page.
+    """
+    if items and category_settings().get("enabled", True):
+        get_category_classifier().fill(items)
+
+
 async def _scrape_keyword_with_scraper(scraper: BaseScraper, keyword: str, location: Optional[str]) -> List[Dict[str, Any]]:
     try:
-        return await scraper.search(keyword, location)
+        html = await scraper.fetch_text(scraper.build_search_url(keyword, location))
+        fetched_at = time.time()
+        items = scraper.parse_listings(html)
     except Exception as e:
         log.warning("scrape failed (scraper=%s, keyword=%s): %s", scraper.__class__.__name__, keyword, e)
         return []
+    parsed_at = time.time()
+    for data in items:
+        _stamp(data, "fetched", fetched_at)
+        _stamp(data, "parsed", parsed_at)
+        data["metadata"]["keyword"] = keyword
+    # Saved searches can filter on category, so classify before matching
+    _fill_categories(items)
+    _match_watchlists(items)
+    return items
 
 
 async def scrape_all_keywords() -> Dict[str, List[Dict[str, Any]]]:
@@ -50,6 +117,7 @@ async def scrape_all_keywords() -> Dict[str, List[Dict[str, Any]]]:
     """
     keywords = _get_keywords()
     location = _get_location()
+    await asyncio.to_thread(_ensure_watchlists)
 
     # Instantiate scrapers (tune base_url/rates as needed)
     scrapers: List[BaseScraper] = [
@@ -90,7 +158,7 @@ def _upsert_listing(db: Session, data: Dict[str, Any]) -> Tuple[Listing, bool]:
         )
         created = True
 
-    # Update allowed fields
+    # Update allowed fields (the metadata dict goes to the meta attribute)
     for field in [
         "title",
         "description",
@@ -105,7 +173,7 @@ def _upsert_listing(db: Session, data: Dict[str, Any]) -> Tuple[Listing, bool]:
         "metadata",
     ]:
         if field in data and data[field] is not None:
-            setattr(obj, field, data[field])
+            setattr(obj, "meta" if field == "metadata" else field, data[field])
 
     obj.last_seen_at = datetime.now(timezone.utc)
     if created:
@@ -113,6 +181,85 @@ def _upsert_listing(db: Session, data: Dict[str, Any]) -> Tuple[Listing, bool]:
     return obj, created
 
 
+def _record_ingest_latency(db: Session, obj: Listing, data: Dict[str, Any]) -> None:
+    """
+    Write the scrape-side stage timestamps for a flushed listing.
+    """
+    meta = data.get("metadata") or {}
+    record_ingest(
+        db,
+        listing_id=obj.id,
+        source=obj.source,
+        keyword=meta.get("keyword"),
+        posted_at=data.get("posted_at"),
+        stage_ts=meta.get("stage_ts"),
+    )
+
+
+def _add_market_data(data: Dict[str, Any]) -> None:
+    """
+    Feed a newly created listing's asking price into the comparables index and
+    the market price sketches (flushed with the batch).
+    """
+    if comparables_settings().get("enabled", True):
+        get_comparables_index().add(data.get("title"), data.get("category"), data.get("price"))
+    if market_settings().get("enabled", True):
+        meta = data.get("metadata") or {}
+        get_price_sketches().add(data.get("price"), data.get("category"), meta.get("keyword"))
+
+
+def _flush_market_data(db: Session) -> None:
+    if market_settings().get("enabled", True):
+        get_price_sketches().flush(db)
+
+
+def _ensure_dedup(db: Session) -> None:
+    d = dedup_settings()
+    if d.get("enabled", True):
+        get_duplicate_index().ensure_loaded(db, window_days=float(d.get("window_days", 14)))
+
+
+def _find_duplicate(data: Dict[str, Any]) -> Optional[int]:
+    """
+    Canonical listing id this scraped listing duplicates, if any.
+    """
+    if not dedup_settings().get("enabled", True):
+        return None
+    return get_duplicate_index().find(data.get("title"), data.get("description"), data.get("price"))
+
+
+def _index_duplicate(listing: Listing, canonical_id: Optional[int]) -> None:
+    """
+    Add a committed-to-be listing to the duplicate index (after its savepoint succeeded).
+    """
+    if dedup_settings().get("enabled", True):
+        get_duplicate_index().add(
+            listing.id, listing.title, listing.description, listing.price, canonical_id=canonical_id or listing.id
+        )
+
+
+def _index_similar(rows: List[Tuple[int, Optional[str], Optional[str]]]) -> None:
+    """
+    Append committed listings (id, title, description) to the similarity index files.
+    """
+    if not rows or not similarity_settings().get("enabled", True):
+        return
+    try:
+        get_similarity_index().append(rows)
+    except OSError as e:
+        log.warning("similarity index append failed: %s", e)
+
+
+def _ensure_indexes() -> None:
+    c = comparables_settings()
+    with session_scope() as db:
+        if c.get("enabled", True) and not get_comparables_index().built:
+            get_comparables_index().ensure_built(db, max_age_days=c.get("max_age_days", 180))
+        if market_settings().get("enabled", True):
+            get_price_sketches().ensure_loaded(db)
+        _ensure_dedup(db)
+
+
 def persist_scrape_results(db: Session, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
     """
     Save scraped listings to DB with upsert logic.
@@ -120,17 +267,35 @@ def persist_scrape_results(db: Session, results: Dict[str, List[Dict[str, Any]]]
     """
     created = 0
     updated = 0
+    similar_rows: List[Tuple[int, Optional[str], Optional[str]]] = []
+    _ensure_dedup(db)
     for scraper_name, items in results.items():
+        # Usually already filled at scrape time; covers results from other callers
+        _fill_categories(items)
         for data in items:
             try:
-                obj, was_created = _upsert_listing(db, data)
+                duplicate_of: Optional[int] = None
+                with db.begin_nested():
+                    obj, was_created = _upsert_listing(db, data)
+                    if was_created:
+                        duplicate_of = _find_duplicate(data)
+                        obj.duplicate_of_id = duplicate_of
+                    db.flush()
+                    _record_ingest_latency(db, obj, data)
                 if was_created:
                     created += 1
+                    _index_duplicate(obj, duplicate_of)
+                    if duplicate_of is None:
+                        _add_market_data(data)
+                        similar_rows.append((obj.id, obj.title, obj.description))
                 else:
                     updated += 1
             except Exception as e:
                 log.warning("persist failed (scraper=%s): %s", scraper_name, e)
+    _flush_market_data(db)
     db.commit()
+    bump("listings")
+    _index_similar(similar_rows)
     return {"created": created, "updated": updated}
 
 
@@ -145,3 +310,235 @@ def run_once(db: Session) -> Dict[str, int]:
     counts = persist_scrape_results(db, results)
     log.info("Scraping worker: finished (created=%d, updated=%d)", counts["created"], counts["updated"])
     return counts
+
+
+# Fast path: evaluate listings as they come off the parser, alert first, persist after.
+
+_SCORING_FIELDS = ("source", "external_id", "title", "description", "price", "currency", "url", "category", "posted_at")
+_alerted_keys: set[Tuple[str, str]] = set()
+
+FastPathItem = Tuple[Dict[str, Any], Optional[SniperDecision], List[Alert]]
+
+
+def _log_time_to_alert(data: Dict[str, Any]) -> None:
+    ts = (data.get("metadata") or {}).get("stage_ts", {})
+    try:
+        log.info(
+            "Fast path alert %s/%s: total=%.0fms (parse=%.0fms, evaluate=%.0fms, send=%.0fms)",
+            data.get("source"),
+            data.get("external_id"),
+            (ts["alert_sent"] - ts["fetched"]) * 1000.0,
+            (ts["parsed"] - ts["fetched"]) * 1000.0,
+            (ts["evaluated"] - ts["parsed"]) * 1000.0,
+            (ts["alert_sent"] - ts["evaluated"]) * 1000.0,
+        )
+    except KeyError:
+        pass
+
+
+def _any_sent(alerts: List[Alert]) -> bool:
+    return any(alert.status == "sent" for alert in alerts)
+
+
+async def _already_alerted(source: str, external_id: str) -> bool:
+    key = (source, external_id)
+    if key in _alerted_keys:
+        return True
+    async with async_session_scope() as db:
+        seen = await db.run_sync(listing_already_alerted, source, external_id)
+    if seen:
+        _alerted_keys.add(key)
+    return seen
+
+
+async def _stored_duplicates(items: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Optional[int]]:
+    """
+    (source, external_id) -> duplicate_of_id for the page's listings that are
+    already stored; one query per page.
+    """
+    keys = {(str(d.get("source")), str(d.get("external_id"))) for d in items}
+    if not keys:
+        return {}
+    stmt = select(Listing.source, Listing.external_id, Listing.duplicate_of_id).where(
+        tuple_(Listing.source, Listing.external_id).in_(keys)
+    )
+    async with async_session_scope() as db:
+        return {(source, external_id): dup for source, external_id, dup in await db.execute(stmt)}
+
+
+async def _snipe_keyword_with_scraper(
+    scraper: BaseScraper, keyword: str, location: Optional[str], bot: SniperBot
+) -> List[FastPathItem]:
+    """
+    Fetch + parse one search page, evaluate each listing inline and alert on the
+    ones that pass. Nothing is written to the DB here.
+    """
+    try:
+        html = await scraper.fetch_text(scraper.build_search_url(keyword, location))
+    except Exception as e:
+        log.warning("fast path fetch failed (scraper=%s, keyword=%s): %s", scraper.__class__.__name__, keyword, e)
+        return []
+    fetched_at = time.time()
+    items = scraper.parse_listings(html)
+    parsed_at = time.time()
+
+    for data in items:
+        _stamp(data, "fetched", fetched_at)
+        _stamp(data, "parsed", parsed_at)
+        data["metadata"]["keyword"] = keyword
+    # Categories feed scoring (comparables, market sketches), so fill them before evaluating
+    _fill_categories(items)
+    _match_watchlists(items)
+    # Re-scraped listings keep their stored cluster; only new ones go through the
+    # duplicate index, which would otherwise match a listing against itself
+    try:
+        stored = await _stored_duplicates(items)
+    except Exception as e:
+        log.warning("fast path lookup failed (scraper=%s, keyword=%s): %s", scraper.__class__.__name__, keyword, e)
+        stored = {}
+
+    out: List[FastPathItem] = []
+    for data in items:
+        decision: Optional[SniperDecision] = None
+        alerts: List[Alert] = []
+        try:
+            key = (str(data.get("source")), str(data.get("external_id")))
+            duplicate_of = stored[key] if key in stored else _find_duplicate(data)
+            if duplicate_of is not None:
+                # Cross-post of a listing already evaluated/alerted: persist only
+                data["metadata"]["duplicate_of"] = duplicate_of
+                out.append((data, None, alerts))
+                continue
+            decision = bot.evaluate(
+                Listing(**{k: data.get(k) for k in _SCORING_FIELDS}), keyword=data["metadata"].get("keyword")
+            )
+            _stamp(data, "evaluated")
+            source, external_id = str(data.get("source")), str(data.get("external_id"))
+            if decision.should_alert and not await _already_alerted(source, external_id):
+                _stamp(data, "alert_created")
+                alerts = await asyncio.to_thread(send_listing_alerts, data, decision)
+                # Failed sends are persisted as such and retried on the next run
+                if _any_sent(alerts):
+                    _stamp(data, "alert_sent")
+                    _alerted_keys.add((source, external_id))
+                    _log_time_to_alert(data)
+        except Exception as e:
+            log.warning("fast path evaluate failed (external_id=%s): %s", data.get("external_id"), e)
+        out.append((data, decision, alerts))
+    return out
+
+
+def _write_fast_path_batch(
+    db: Session, batch: List[FastPathItem]
+) -> Tuple[int, int, List[Tuple[int, Optional[str], Optional[str]]]]:
+    """
+    Write listings, deals and already-sent alerts for one evaluated page.
+    Returns (created, updated, rows for the similarity index).
+    """
+    created = 0
+    updated = 0
+    similar_rows: List[Tuple[int, Optional[str], Optional[str]]] = []
+    for data, decision, alerts in batch:
+        try:
+            duplicate_of: Optional[int] = None
+            with db.begin_nested():
+                _stamp(data, "persisted")
+                listing, was_created = _upsert_listing(db, data)
+                if was_created:
+                    duplicate_of = _find_duplicate(data)
+                    listing.duplicate_of_id = duplicate_of
+                db.flush()
+                _record_ingest_latency(db, listing, data)
+                if decision is not None:
+                    deal, _ = upsert_deal(db, listing, decision)
+                    db.flush()
+                    for alert in alerts:
+                        alert.deal_id = deal.id
+                        db.add(alert)
+            created += int(was_created)
+            updated += int(not was_created)
+            if was_created:
+                _index_duplicate(listing, duplicate_of)
+                if duplicate_of is None:
+                    _add_market_data(data)
+                    similar_rows.append((listing.id, listing.title, listing.description))
+        except Exception as e:
+            log.warning("fast path persist failed (external_id=%s): %s", data.get("external_id"), e)
+    _flush_market_data(db)
+    return created, updated, similar_rows
+
+
+def _persist_fast_path_batch(batch: List[FastPathItem]) -> Dict[str, int]:
+    """
+    Persist one page. Runs in the writer thread with its own session: besides
+    the DB round trips the batch is CPU work (ORM flushes, MinHash lookups,
+    market sketches, embeddings), which would stall scraping and alerting if
+    it ran on the event loop.
+    """
+    with session_scope() as db:
+        created, updated, similar_rows = _write_fast_path_batch(db, batch)
+    bump("listings", "deals", "alerts")
+    _index_similar(similar_rows)
+    return {"created": created, "updated": updated}
+
+
+async def snipe_all_keywords() -> Dict[str, int]:
+    """
+    Low-latency variant of scrape_all_keywords + persist + analyze + alert.
+    Each page is evaluated and alerted as soon as it is parsed; DB writes are
+    handed to a writer thread and awaited only at the end of the run. The
+    per-listing lookups on the loop use the async engine.
+    """
+    keywords = _get_keywords()
+    location = _get_location()
+    bot = SniperBot()
+    # Inline evaluation uses comparables, market sketches and the duplicate index, so load them first
+    await asyncio.to_thread(_ensure_indexes)
+    await asyncio.to_thread(_ensure_watchlists)
+    scrapers: List[BaseScraper] = [
+        CraigslistScraper(),
+        OfferUpScraper(),
+        FacebookMarketplaceScraper(),
+    ]
+
+    loop = asyncio.get_running_loop()
+    alerted = 0
+    pending: List[asyncio.Future] = []
+    # One writer thread: batches are persisted in order and never race on the same listing
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fast-path-persist") as writer:
+        for kw in keywords:
+            for s in scrapers:
+                batch = await _snipe_keyword_with_scraper(s, kw, location, bot)
+                alerted += sum(1 for _, _, alerts in batch if _any_sent(alerts))
+                if batch:
+                    pending.append(loop.run_in_executor(writer, _persist_fast_path_batch, batch))
+        results = await asyncio.gather(*pending)
+
+    counts = {"alerted": alerted, "created": 0, "updated": 0}
+    for res in results:
+        counts["created"] += res["created"]
+        counts["updated"] += res["updated"]
+    return counts
+
+
+async def _snipe_once() -> Dict[str, int]:
+    try:
+        return await snipe_all_keywords()
+    finally:
+        # The asyncpg pool is bound to this run's event loop
+        await dispose_async_engine()
+
+
+def run_fast_path() -> Dict[str, int]:
+    """
+    Single-run entrypoint for the inline snipe path. Opens its own sessions.
+    """
+    log.info("Scraping worker: starting run_fast_path()")
+    counts = asyncio.run(_snipe_once())
+    log.info(
+        "Scraping worker: fast path finished (alerted=%d, created=%d, updated=%d)",
+        counts["alerted"],
+        counts["created"],
+        counts["updated"],
+    )
+    return counts
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import cfg
+from ..core.exceptions import AnalysisError
+from ..models.trend import Trend
+from ..analyzers.trend_cache import get_trend_cache
+from ..utils.helpers import chunked, jitter
+from ..utils.logger import get_logger
+
+log = get_logger()
+
+# Google Trends compares at most 5 terms per request; one slot holds the anchor
+MAX_TERMS_PER_REQUEST = 5
+
+_Window = Tuple[Optional[datetime], Optional[datetime]]
+
+
+@dataclass(frozen=True)
+class TrendsResponse:
+    """
+    Interest-over-time for one request: ISO dates plus one 0..100 series per term.
+    """
+    dates: List[str]
+    series: Dict[str, List[float]]
+
+
+class TrendsTransport(Protocol):
+    def interest_over_time(self, terms: List[str], timeframe: str, geo: str) -> TrendsResponse:
+        ...
+
+
+class PytrendsTransport:
+    """
+    Live transport backed by pytrends (imported lazily).
+    """
+
+    def __init__(self, hl: str = "en-US", tz: int = 360, retries: int = 2, backoff_factor: float = 1.0) -> None:
+        from pytrends.request import TrendReq  # type: ignore[import-not-found]
+
+        self._client = TrendReq(hl=hl, tz=tz, retries=retries, backoff_factor=backoff_factor)
+
+    def interest_over_time(self, terms: List[str], timeframe: str, geo: str) -> TrendsResponse:
+        self._client.build_payload(terms, timeframe=timeframe, geo=geo)
+        df = self._client.interest_over_time()
+        if df is None or df.empty:
+            return TrendsResponse(dates=[], series={t: [] for t in terms})
+        return TrendsResponse(
+            dates=[ts.isoformat() for ts in df.index],
+            series={t: [float(v) for v in df[t].tolist()] if t in df else [] for t in terms},
+        )
+
+
+class CachingTransport:
+    """
+    File cache of responses keyed by (terms, timeframe, geo).
+    With inner=None it replays recorded responses only, which lets ingestion run
+    offline (missing recordings raise AnalysisError).
+    """
+
+    def __init__(self, inner: Optional[TrendsTransport], cache_dir: str | Path, max_age_seconds: Optional[float] = None) -> None:
+        self.inner = inner
+        self.cache_dir = Path(cache_dir)
+        self.max_age_seconds = max_age_seconds
+
+    @staticmethod
+    def request_key(terms: List[str], timeframe: str, geo: str) -> str:
+        raw = json.dumps({"terms": terms, "timeframe": timeframe, "geo": geo}, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def interest_over_time(self, terms: List[str], timeframe: str, geo: str) -> TrendsResponse:
+        path = self.cache_dir / f"{self.request_key(terms, timeframe, geo)}.json"
+        fresh = path.exists() and (
+            self.inner is None
+            or self.max_age_seconds is None
+            or time.time() - path.stat().st_mtime <= self.max_age_seconds
+        )
+        if fresh:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return TrendsResponse(dates=data["dates"], series=data["series"])
+        if self.inner is None:
+            raise AnalysisError(f"no recorded trends response for terms={terms} timeframe={timeframe} geo={geo}")
+
+        resp = self.inner.interest_over_time(terms, timeframe, geo)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"terms": terms, "timeframe": timeframe, "geo": geo, **asdict(resp)}), encoding="utf-8")
+        tmp.replace(path)
+        return resp
+
+
+def _trends_settings() -> Dict[str, Any]:
+    """
+    trends:
+      keywords: [...]            # defaults to scraping.keywords + catalog keys
+      anchor_term: "ebay"        # common reference term in every request
+      score_cap_ratio: 1.0       # interest ratio to the anchor that scores 1.0
+      timeframe: "today 3-m"
+      geo: "US"
+      request_interval_seconds: 2
+      response_cache_dir: "data/trends_cache"
+    """
+    return cfg.get("trends", {}) or {}
+
+
+def _ingest_keywords() -> List[str]:
+    t = _trends_settings()
+    kws = t.get("keywords")
+    if not isinstance(kws, list):
+        # Canonical catalog keys: what DealScorer looks trends up by
+        kws = (cfg.get("scraping", {}) or {}).get("keywords", []) or []
+        kws = list(kws) + list((cfg.get("catalog", {}) or {}).keys())
+    return list(dict.fromkeys(str(k).strip().lower() for k in kws if str(k).strip()))
+
+
+def default_transport() -> TrendsTransport:
+    t = _trends_settings()
+    return CachingTransport(
+        PytrendsTransport(),
+        t.get("response_cache_dir", "data/trends_cache"),
+        max_age_seconds=float(t.get("update_frequency_hours", 6)) * 3600.0,
+    )
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def momentum(series: List[float]) -> float:
+    """
+    Relative change of the most recent quarter of the series vs the rest.
+    """
+    if len(series) < 4:
+        return 0.0
+    split = len(series) - max(1, len(series) // 4)
+    prior = _mean(series[:split])
+    recent = _mean(series[split:])
+    if prior <= 0:
+        return 0.0
+    return (recent - prior) / prior
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def ingest_trends(
+    db: Session,
+    keywords: Optional[List[str]] = None,
+    transport: Optional[TrendsTransport] = None,
+) -> Dict[str, int]:
+    """
+    Query keywords in batches of four plus a shared anchor term, normalize every
+    keyword against the anchor so scores are comparable across requests, then
+    bulk-upsert one row per keyword into trends and publish to the trend cache.
+
+    score = (mean interest / mean anchor interest) / trends.score_cap_ratio,
+    clipped to [0, 1]: a fixed scale, so scores stay comparable across runs
+    and keyword sets. Momentum (recent quarter vs the rest of the window) and
+    the rising flag (momentum >= trends.momentum_threshold) are kept in
+    metadata.
+    """
+    t = _trends_settings()
+    if transport is None and not t.get("google_trends_enabled", True):
+        log.info("Trends worker: google_trends_enabled is false, skipping")
+        return {"requests": 0, "keywords": 0, "upserted": 0, "rising": 0}
+
+    keywords = [k.strip().lower() for k in (keywords if keywords is not None else _ingest_keywords()) if k.strip()]
+    anchor = str(t.get("anchor_term", "ebay")).strip().lower()
+    keywords = [k for k in dict.fromkeys(keywords) if k != anchor]
+    timeframe = str(t.get("timeframe", "today 3-m"))
+    geo = str(t.get("geo", "US"))
+    interval = float(t.get("request_interval_seconds", 2.0))
+    threshold = float(t.get("momentum_threshold", 0.05))
+    cap = float(t.get("score_cap_ratio", 1.0))
+    if cap <= 0:
+        raise AnalysisError("trends.score_cap_ratio must be positive")
+    transport = transport or default_transport()
+
+    relative: Dict[str, Tuple[float, float, int, _Window]] = {}  # keyword -> (ratio to anchor, momentum, points, window)
+    requests = 0
+    for i, batch in enumerate(chunked(keywords, MAX_TERMS_PER_REQUEST - 1)):
+        if i and interval > 0:
+            time.sleep(jitter(interval))
+        try:
+            resp = transport.interest_over_time(batch + [anchor], timeframe, geo)
+        except Exception as e:
+            log.warning("Trends worker: request failed for %s: %s", batch, e)
+            continue
+        requests += 1
+        anchor_mean = _mean(resp.series.get(anchor, []))
+        if anchor_mean <= 0:
+            log.warning("Trends worker: anchor %r has no interest in batch %s; skipping", anchor, batch)
+            continue
+        window = (_parse_date(resp.dates[0]), _parse_date(resp.dates[-1])) if resp.dates else (None, None)
+        for kw in batch:
+            series = resp.series.get(kw, [])
+            relative[kw] = (_mean(series) / anchor_mean, momentum(series), len(series), window)
+
+    if not relative:
+        log.info("Trends worker: nothing to upsert (requests=%d)", requests)
+        return {"requests": requests, "keywords": len(keywords), "upserted": 0, "rising": 0}
+
+    rows: List[Dict[str, Any]] = []
+    for kw, (ratio, mom, points, window) in relative.items():
+        rows.append(
+            {
+                "keyword": kw[:200],
+                "location": geo,
+                "source": "google_trends",
+                "score": round(max(0.0, min(1.0, ratio / cap)), 4),
+                "timeframe_start": window[0],
+                "timeframe_end": window[1],
+                "metadata": {
+                    "anchor": anchor,
+                    "ratio_to_anchor": round(ratio, 6),
+                    "momentum": round(mom, 6),
+                    "rising": mom >= threshold,
+                    "points": points,
+                    "timeframe": timeframe,
+                },
+            }
+        )
+
+    # Core table insert: rows are keyed by column name ("metadata", mapped as Trend.meta)
+    stmt = insert(Trend.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_trends_keyword_loc_timeframe",
+        set_={
+            "score": stmt.excluded.score,
+            "source": stmt.excluded.source,
+            "metadata": stmt.excluded["metadata"],
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+
+    cache = get_trend_cache()
+    published: Dict[Tuple[str, str], Optional[float]] = {}
+    for row in rows:
+        published[(row["keyword"], "")] = row["score"]
+        published[(row["keyword"], geo)] = row["score"]
+    cache.publish(published)
+
+    rising = sum(1 for row in rows if row["metadata"]["rising"])
+    log.info("Trends worker: requests=%d, upserted=%d, rising=%d", requests, len(rows), rising)
+    return {"requests": requests, "keywords": len(keywords), "upserted": len(rows), "rising": rising}